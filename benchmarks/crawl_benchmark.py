@@ -0,0 +1,253 @@
+"""Crawl a synthetic tenant served by the mock Graph server and measure throughput.
+
+Drives ``OneNoteImageFetcher`` end to end against ``benchmarks.mock_graph``
+(running in a child process) and reports pages/sec, images/sec, request
+latency percentiles and peak RSS. Results are written as JSON, tagged with
+the git commit, so two commits can be compared. Run from the repository root:
+
+    python -m benchmarks.crawl_benchmark --scenario throttled --output results/throttled.json
+    python -m benchmarks.crawl_benchmark --scenario throttled --compare results/throttled.json
+
+``--mode previews`` runs ``start()`` (listing, preview lookup, download);
+``--mode images`` runs ``harvest_notebook`` (page content and every image).
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from benchmarks.mock_graph import (
+    FaultProfile, TenantShape, add_arguments, faults_from_arguments, shape_from_arguments, start_in_subprocess
+)
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Fault profiles selectable with --scenario; individual fault options override them
+SCENARIOS = {
+    "baseline": FaultProfile(),
+    "latency": FaultProfile(latency_ms=40, jitter_ms=20),
+    "throttled": FaultProfile(latency_ms=20, throttle_rate=0.05, retry_after=0.5),
+    "flaky": FaultProfile(latency_ms=20, error_rate=0.02),
+    "slow-bodies": FaultProfile(latency_ms=10, slow_body_rate=0.1, slow_body_kbps=512),
+}
+
+# Result fields compared by --compare, and whether higher values are better
+COMPARED = {
+    "pages_per_second": True,
+    "images_per_second": True,
+    "latency_p50_ms": False,
+    "latency_p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+LATENCY_METRIC = "onenote_http_request_duration_seconds"
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def git_commit() -> Dict[str, Any]:
+    """Commit of the working tree and whether it has uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+def parse_setting(value: str) -> Any:
+    """Configuration value from ``--set``: JSON if it parses, else the string."""
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+def latency_percentiles(metrics: Any) -> Dict[str, float]:
+    """p50/p99 over every request, merging the per-endpoint histograms."""
+    histogram = metrics.histogram(LATENCY_METRIC)
+    merged = histogram.merged_counts()
+    return {
+        "latency_p50_ms": histogram.quantile(merged, 0.5) * 1000,
+        "latency_p99_ms": histogram.quantile(merged, 0.99) * 1000,
+        "requests": sum(merged)
+    }
+
+def counter_total(metrics: Any, name: str) -> float:
+    return sum(metrics.counter(name).values().values())
+
+def run_once(base_url: str, shape: TenantShape, mode: str, settings: Dict[str, Any], work_dir: str) -> Dict[str, Any]:
+    """Crawl the first notebook of the tenant once with a fresh client and output directory."""
+    from src.auth.graph_client import GraphAPIClient, load_config
+    from src.onenote.fetcher import OneNoteImageFetcher
+
+    config = load_config()
+    config.update({
+        "graph_base_url": base_url,
+        "token_cache_file": os.path.join(work_dir, "token_cache.json"),
+        "output_dir": os.path.join(work_dir, "images"),
+        "notebook_name": "Notebook 0",
+        "site_id": "benchmark-site",
+        "openai_api_key": None,
+        "response_cache": False,
+        "crawl_journal": False,
+        "rate_limit_rps": 1000.0,
+        "rate_limit_burst": 1000.0,
+        "download_rate_limit_rps": 1000.0,
+    })
+    config.update(settings)
+
+    client = GraphAPIClient(config)
+    client.token_cache.set_token({"token": "benchmark", "expires_at": time.time() + 86400, "refresh_token": None})
+    fetcher = OneNoteImageFetcher(client)
+
+    started = time.perf_counter()
+    if mode == "previews":
+        completed = fetcher.start()
+        pages, images = fetcher.stats["pages"], fetcher.stats["images"]
+    else:
+        notebook = fetcher.load_hierarchy().find_notebook(config["notebook_name"])
+        harvested = fetcher.harvest_notebook(notebook)
+        completed = True
+        pages, images = len(harvested), sum(len(paths) for paths in harvested.values())
+    seconds = time.perf_counter() - started
+    client.transport.close()
+
+    expected_images = shape.page_count() * (1 if mode == "previews" else shape.images)
+    return {
+        "completed": completed,
+        "seconds": seconds,
+        "pages": pages,
+        "images": images,
+        "missing_images": max(0, expected_images - images),
+        "pages_per_second": pages / seconds,
+        "images_per_second": images / seconds,
+        **latency_percentiles(client.metrics),
+        "throttled": counter_total(client.metrics, "onenote_http_throttled_total"),
+        "retries": counter_total(client.metrics, "onenote_http_retries_total"),
+        "errors": fetcher.stats["errors"],
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median of every numeric field over the runs; peak RSS is the maximum."""
+    result = {}
+    for key, value in runs[0].items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            result[key] = all(run[key] for run in runs) if isinstance(value, bool) else value
+        else:
+            result[key] = statistics.median(run[key] for run in runs)
+    if runs[0]["peak_rss_mb"] is not None:
+        result["peak_rss_mb"] = max(run["peak_rss_mb"] for run in runs)
+    return result
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> bool:
+    """Print the change of every compared field; returns False if one regressed beyond ``tolerance``."""
+    for key in ("scenario", "mode", "shape", "faults", "settings"):
+        if current.get(key) != baseline.get(key):
+            print(f"warning: {key} differs from the baseline, the comparison may not be meaningful")
+
+    ok = True
+    print(f"\n{'metric':<20} {'baseline':>12} {'current':>12} {'change':>9}")
+    for key, higher_is_better in COMPARED.items():
+        old, new = baseline["result"].get(key), current["result"].get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        regressed = (-change if higher_is_better else change) > tolerance
+        ok = ok and not regressed
+        print(f"{key:<20} {old:>12.1f} {new:>12.1f} {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+    print(f"\nbaseline: {baseline.get('commit') or 'unknown'}")
+    return ok
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="baseline", help="fault profile")
+    parser.add_argument("--mode", choices=("previews", "images"), default="previews")
+    parser.add_argument("--repeat", type=int, default=3, help="crawls to run; medians are reported")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="configuration override, e.g. download_workers=16 (repeatable)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare with the results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="relative change counted as a regression by --compare")
+    parser.add_argument("--keep", action="store_true", help="keep the downloaded images")
+    parser.add_argument("--log-level", default="ERROR", help="logging level of the application")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+    shape = shape_from_arguments(args)
+    faults = faults_from_arguments(args, SCENARIOS[args.scenario])
+    settings = dict(setting.split("=", 1) for setting in args.set)
+    settings = {key: parse_setting(value) for key, value in settings.items()}
+
+    process, base_url = start_in_subprocess(shape, faults)
+    work_root = tempfile.mkdtemp(prefix="crawl-benchmark-")
+    runs = []
+    baseline_rss = peak_rss_mb()
+    try:
+        for index in range(args.repeat):
+            run = run_once(base_url, shape, args.mode, settings, os.path.join(work_root, f"run{index}"))
+            runs.append(run)
+            print(f"run {index + 1}: {run['pages']} pages, {run['images']} images in {run['seconds']:.2f}s "
+                  f"({run['pages_per_second']:.1f} pages/s, p99 {run['latency_p99_ms']:.1f} ms)")
+    finally:
+        process.terminate()
+        if args.keep:
+            print(f"Images kept in {work_root}")
+        else:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    report = {
+        "benchmark": "crawl",
+        **git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenario": args.scenario,
+        "mode": args.mode,
+        "shape": asdict(shape),
+        "faults": {**asdict(faults), "error_statuses": list(faults.error_statuses)},
+        "settings": settings,
+        "baseline_rss_mb": baseline_rss,
+        "result": summarize(runs),
+        "runs": runs
+    }
+
+    result = report["result"]
+    print(f"\n{args.scenario}/{args.mode}: {result['pages_per_second']:.1f} pages/s, "
+          f"{result['images_per_second']:.1f} images/s, p50 {result['latency_p50_ms']:.1f} ms, "
+          f"p99 {result['latency_p99_ms']:.1f} ms, peak RSS {result['peak_rss_mb'] or 0:.0f} MB, "
+          f"{result['throttled']:.0f} throttled, {result['errors']:.0f} errors, "
+          f"{result['missing_images']:.0f} missing images")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.tolerance):
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
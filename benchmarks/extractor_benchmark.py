@@ -0,0 +1,106 @@
+"""Compare the streaming image-reference extractor with BeautifulSoup.
+
+Generates synthetic OneNote pages of increasing size (paragraphs, tables,
+inline ink and images) and times both ways of finding the images. Run
+from the repository root:
+
+    python -m benchmarks.extractor_benchmark [--repeat N] [--chunk-size BYTES]
+"""
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from src.onenote.extractor import ImageSource
+from src.onenote.resources import extract_image_sources
+
+# Approximate page sizes to test, in bytes
+PAGE_SIZES = (50_000, 500_000, 2_000_000, 8_000_000)
+
+def extract_with_beautifulsoup(content: str) -> List[ImageSource]:
+    """The previous implementation: build a DOM and walk every <img>."""
+    soup = BeautifulSoup(content, 'html.parser')
+    sources = []
+    for img in soup.find_all('img'):
+        url = img.get('data-fullres-src') or img.get('src')
+        if not url:
+            continue
+        content_type = img.get('data-fullres-src-type') if img.get('data-fullres-src') else None
+        sources.append(ImageSource(url=url, content_type=content_type or img.get('data-src-type')))
+    return sources
+
+def synthetic_page(target_size: int, seed: int = 0) -> str:
+    """Build a page of roughly ``target_size`` bytes resembling OneNote output."""
+    rng = random.Random(seed)
+    base = "https://graph.microsoft.com/v1.0/users('u')/onenote/resources"
+    parts = ['<html lang="en-US"><head><title>Synthetic page</title>'
+             '<meta name="created" content="2024-01-01T00:00:00.0000000" /></head>'
+             '<body data-absolute-enabled="true" style="font-family:Calibri;font-size:11pt">']
+    size = sum(len(part) for part in parts)
+    index = 0
+
+    while size < target_size:
+        kind = rng.random()
+        if kind < 0.4:
+            words = " ".join(rng.choice(("alpha", "beta", "gamma", "delta", "&amp;", "<b>bold</b>"))
+                             for _ in range(rng.randint(20, 80)))
+            part = f'<div style="position:absolute;left:48px;top:{index}px"><p>{words}</p></div>'
+        elif kind < 0.6:
+            rows = "".join(
+                "<tr>" + "".join(f'<td style="border:1px solid">{rng.randint(0, 10**6)}</td>' for _ in range(6)) + "</tr>"
+                for _ in range(rng.randint(5, 20))
+            )
+            part = f'<table style="border-collapse:collapse">{rows}</table>'
+        elif kind < 0.85:
+            points = " ".join(f"{rng.randint(0, 999)},{rng.randint(0, 999)}" for _ in range(rng.randint(100, 400)))
+            part = f'<div data-ink="true"><svg><polyline points="{points}" /></svg></div>'
+        else:
+            part = (
+                f'<img width="{rng.randint(100, 1600)}" height="{rng.randint(100, 1200)}" '
+                f'src="{base}/0-{index}!1-x/$value?a=1&amp;b=2" data-src-type="image/png" '
+                f'data-fullres-src="{base}/0-{index}!1-y/$value" data-fullres-src-type="image/jpeg" />'
+            )
+        parts.append(part)
+        size += len(part)
+        index += 1
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+def best_of(function: Callable[[], List[ImageSource]], repeat: int) -> Tuple[float, List[ImageSource]]:
+    """Fastest wall-clock time of ``repeat`` runs and the result of the last one."""
+    best = float("inf")
+    result = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is reported)")
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024, help="chunk size of the streamed variant")
+    args = parser.parse_args()
+
+    print(f"{'page size':>12} {'images':>7} {'bs4 ms':>9} {'extractor ms':>13} {'streamed ms':>12} {'speedup':>8}")
+    for target_size in PAGE_SIZES:
+        page = synthetic_page(target_size)
+        encoded = page.encode("utf-8")
+        chunks = [encoded[i:i + args.chunk_size] for i in range(0, len(encoded), args.chunk_size)]
+
+        bs4_time, expected = best_of(lambda: extract_with_beautifulsoup(page), args.repeat)
+        fast_time, found = best_of(lambda: extract_image_sources(page), args.repeat)
+        stream_time, streamed = best_of(lambda: extract_image_sources(iter(chunks)), args.repeat)
+
+        for name, result in (("extractor", found), ("streamed", streamed)):
+            if [(s.url, s.content_type) for s in result] != [(s.url, s.content_type) for s in expected]:
+                raise SystemExit(f"{name} result differs from BeautifulSoup for a {target_size} byte page")
+
+        print(f"{len(encoded):>12,} {len(found):>7} {bs4_time * 1000:>9.1f} {fast_time * 1000:>13.1f} "
+              f"{stream_time * 1000:>12.1f} {bs4_time / fast_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Measure what the OneNote listings transfer and cost to decode, with and without projection.
+
+Loads the hierarchy, every notebook's sections and every section's pages of a
+synthetic tenant served by ``benchmarks.mock_graph``, once asking Graph for
+its full default representations (``LISTING_PROJECTION=false``) and once with
+``$select``/``$top`` projection. Reports the calls, response bytes and
+``json.loads`` time per endpoint. Run from the repository root:
+
+    python -m benchmarks.listing_benchmark --sections 20 --pages 500
+"""
+import argparse
+import json
+import logging
+import shutil
+import tempfile
+import time
+from collections import Counter
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from benchmarks.crawl_benchmark import git_commit
+from benchmarks.mock_graph import FaultProfile, add_arguments, shape_from_arguments, start_in_subprocess
+
+class RecordingClient:
+    """Minimal Graph client recording the size and decode time of every response."""
+
+    def __init__(self, base_url: str, decode_repeat: int = 5):
+        self.base_url = base_url
+        self.config: Dict[str, Any] = {"graph_base_url": base_url}
+        self.decode_repeat = decode_repeat
+        self.session = requests.Session()
+        self.calls: Counter = Counter()
+        self.bytes: Counter = Counter()
+        self.decode_seconds: Counter = Counter()
+
+    def call_graph_api(self, endpoint: str, method: str = "GET", response_type: str = "json", **kwargs) -> Any:
+        from src.utils.metrics import endpoint_template
+
+        url = endpoint if endpoint.startswith(("http://", "https://")) else f"{self.base_url}/{endpoint}"
+        response = self.session.get(url, headers={"Authorization": "Bearer benchmark"})
+        response.raise_for_status()
+        body = response.content
+
+        # Decoded several times; a single json.loads of a small body is too short to time
+        started = time.perf_counter()
+        for _ in range(self.decode_repeat):
+            decoded = json.loads(body)
+        decode = (time.perf_counter() - started) / self.decode_repeat
+
+        key = endpoint_template(url, self.base_url)
+        self.calls[key] += 1
+        self.bytes[key] += len(body)
+        self.decode_seconds[key] += decode
+        return decoded
+
+    def add_progress(self, message: str, coalesce_key: Optional[str] = None) -> None:
+        pass
+
+    def handle_error(self, error: Exception, context: Dict[str, Any]) -> None:
+        pass
+
+    def add_user_prompt(self, message: str, options: List[str]) -> None:
+        pass
+
+def list_everything(base_url: str, projection: bool, decode_repeat: int) -> Dict[str, Dict[str, float]]:
+    """Run every listing once; returns calls, bytes and decode milliseconds per endpoint."""
+    from src.onenote.fetcher import OneNoteImageFetcher
+
+    client = RecordingClient(base_url, decode_repeat)
+    output_dir = tempfile.mkdtemp(prefix="listing-benchmark-")
+    try:
+        fetcher = OneNoteImageFetcher(client, overrides={
+            "output_dir": output_dir,
+            "listing_projection": projection,
+            "blob_store": False
+        })
+        tree = fetcher.load_hierarchy()
+        for notebook_id in tree.notebooks:
+            for _ in fetcher.iter_sections(notebook_id):
+                pass
+        for section_id in tree.sections:
+            for _ in fetcher.iter_pages(section_id):
+                pass
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        key: {
+            "calls": client.calls[key],
+            "bytes": client.bytes[key],
+            "decode_ms": client.decode_seconds[key] * 1000
+        }
+        for key in client.calls
+    }
+
+def totals(endpoints: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    return {field: sum(values[field] for values in endpoints.values()) for field in ("calls", "bytes", "decode_ms")}
+
+def print_table(full: Dict[str, Dict[str, float]], projected: Dict[str, Dict[str, float]]) -> None:
+    rows = sorted(set(full) | set(projected)) + ["total"]
+    full = {**full, "total": totals(full)}
+    projected = {**projected, "total": totals(projected)}
+    empty = {"calls": 0, "bytes": 0, "decode_ms": 0.0}
+
+    print(f"\n{'endpoint':<40} {'calls':>13} {'KiB':>19} {'saved':>7} {'decode ms':>17} {'saved':>7}")
+    for row in rows:
+        before, after = full.get(row, empty), projected.get(row, empty)
+        saved_bytes = 1 - after["bytes"] / before["bytes"] if before["bytes"] else 0.0
+        saved_decode = 1 - after["decode_ms"] / before["decode_ms"] if before["decode_ms"] else 0.0
+        print(f"{row:<40} {before['calls']:>6.0f} {after['calls']:>6.0f} "
+              f"{before['bytes'] / 1024:>9.1f} {after['bytes'] / 1024:>9.1f} {saved_bytes:>7.1%} "
+              f"{before['decode_ms']:>8.2f} {after['decode_ms']:>8.2f} {saved_decode:>7.1%}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decode-repeat", type=int, default=5, help="json.loads runs per response")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    shape = shape_from_arguments(args)
+    process, base_url = start_in_subprocess(shape, FaultProfile())
+    try:
+        full = list_everything(base_url, projection=False, decode_repeat=args.decode_repeat)
+        projected = list_everything(base_url, projection=True, decode_repeat=args.decode_repeat)
+    finally:
+        process.terminate()
+
+    print_table(full, projected)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "benchmark": "listing",
+                **git_commit(),
+                "timestamp": time.time(),
+                "shape": asdict(shape),
+                "full": full,
+                "projected": projected
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
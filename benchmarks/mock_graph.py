@@ -0,0 +1,571 @@
+"""Local stand-in for the Graph OneNote endpoints, with fault injection.
+
+Serves a synthetic tenant of configurable size: notebooks, nested section
+groups, sections, paged page listings, page content HTML, image resources,
+page previews and ``$batch``. Items have Graph's full default representation
+and honour ``$select``, ``$expand`` (with nested options), ``$top`` and
+``$orderby``, so response sizes reflect the queries the client sends. Faults (latency, 429 with ``Retry-After``,
+5xx errors and slow bodies) are injected at configurable rates with a
+seeded random generator, so runs are repeatable.
+
+Graph is served at ``http://127.0.0.1:<port>/v1.0``; preview images are
+served from ``http://localhost:<port>`` so the client treats them as a
+separate download host, like SharePoint. Point the application at the
+server with ``GRAPH_BASE_URL``. To run it on its own:
+
+    python -m benchmarks.mock_graph --port 8000 --sections 8 --pages 100
+"""
+import argparse
+import base64
+import json
+import multiprocessing
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Graph returns 20 items per listing response unless $top asks for more
+DEFAULT_PAGE_SIZE = 20
+
+# Characters left unescaped in the query options of ``@odata.nextLink``
+QUERY_SAFE = "$,()=;/'"
+
+# Bytes written per chunk when a body is slowed down
+SLOW_CHUNK_SIZE = 16 * 1024
+
+# Owner of every item, and the prefix of the ``self`` links Graph returns
+_USER_ID = "2f1e7c4a-93b1-4d2e-8a6f-0c5d3b9e1a77"
+_AUTHOR = {"user": {"id": _USER_ID, "displayName": "Benchmark User"}}
+_SELF = f"https://graph.microsoft.com/v1.0/users/{_USER_ID}/onenote"
+_CREATED = "2024-01-01T08:00:00.000Z"
+_MODIFIED = "2024-01-02T17:30:00.000Z"
+
+def _links(item_id: str) -> Dict[str, Any]:
+    return {
+        "oneNoteClientUrl": {"href": f"onenote:https://contoso.sharepoint.com/personal/benchmark/Documents/{item_id}"},
+        "oneNoteWebUrl": {"href": f"https://onenote.example/{item_id}"}
+    }
+
+def _split_options(text: str, separator: str) -> List[str]:
+    """Split OData options at ``separator``, ignoring separators inside parentheses."""
+    parts, current, depth = [], [], 0
+    for char in text:
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if char == separator and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+def parse_expand(text: str) -> Dict[str, Dict[str, str]]:
+    """Relations of an ``$expand`` value with their nested options, e.g. ``sections($select=id)``."""
+    relations = {}
+    for part in _split_options(text, ","):
+        name, _, nested = part.partition("(")
+        options = _split_options(nested[:-1], ";") if nested else []
+        relations[name.strip()] = dict(option.split("=", 1) for option in options)
+    return relations
+
+def expand_depth(options: Dict[str, str]) -> int:
+    """Levels of sections and section groups an ``$expand`` asks for."""
+    relations = parse_expand(options.get("$expand", ""))
+    if "sections" not in relations:
+        return 0
+    return 1 + expand_depth(relations.get("sectionGroups", {}))
+
+def project(item: Dict[str, Any], options: Dict[str, str]) -> Dict[str, Any]:
+    """Apply ``$select`` and the nested options of ``$expand`` to an item, as Graph does."""
+    relations = parse_expand(options.get("$expand", ""))
+    if options.get("$select"):
+        keep = set(options["$select"].split(",")) | {"id"} | set(relations)
+        item = {key: value for key, value in item.items() if key in keep}
+    else:
+        item = dict(item)
+    for name, nested in relations.items():
+        value = item.get(name)
+        if isinstance(value, list):
+            item[name] = [project(child, nested) for child in value]
+        elif isinstance(value, dict):
+            item[name] = project(value, nested)
+    return item
+
+@dataclass
+class TenantShape:
+    """Size of the synthetic tenant."""
+    notebooks: int = 1
+    sections: int = 4
+    section_groups: int = 1
+    group_depth: int = 1
+    group_sections: int = 2
+    pages: int = 25
+    images: int = 2
+    image_bytes: int = 32 * 1024
+    page_size: int = DEFAULT_PAGE_SIZE
+
+    def page_count(self) -> int:
+        """Pages in one notebook."""
+        return self.section_count() * self.pages
+
+    def section_count(self) -> int:
+        """Sections in one notebook, including those in section groups."""
+        groups = sum(self.section_groups ** level for level in range(1, self.group_depth + 1))
+        return self.sections + groups * self.group_sections
+
+@dataclass
+class FaultProfile:
+    """Faults injected into responses; rates are probabilities per request."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (500, 502, 503)
+    slow_body_rate: float = 0.0
+    slow_body_kbps: float = 256.0
+    seed: int = 0
+
+@dataclass
+class _Container:
+    """A notebook or section group with its children."""
+    id: str
+    name: str
+    notebook_id: str
+    parent_group_id: Optional[str] = None
+    sections: List[Dict[str, Any]] = field(default_factory=list)
+    groups: List["_Container"] = field(default_factory=list)
+
+class SyntheticTenant:
+    """Deterministic OneNote content generated from a ``TenantShape``."""
+
+    def __init__(self, shape: TenantShape):
+        self.shape = shape
+        self.notebooks: List[_Container] = []
+        self.containers: Dict[str, _Container] = {}
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        self._filler = bytes(range(256)) * (shape.image_bytes // 256 + 1)
+
+        for n in range(shape.notebooks):
+            notebook = _Container(id=f"0-nb{n}", name=f"Notebook {n}", notebook_id=f"0-nb{n}")
+            self.notebooks.append(notebook)
+            self.containers[notebook.id] = notebook
+            self._fill(notebook, shape.sections, depth=0)
+
+    def _fill(self, container: _Container, section_count: int, depth: int) -> None:
+        group_id = container.id if container.id != container.notebook_id else None
+        for s in range(section_count):
+            section_id = f"{container.id}-s{s}"
+            section = {
+                "id": section_id,
+                "self": f"{_SELF}/sections/{section_id}",
+                "createdDateTime": _CREATED,
+                "displayName": f"{container.name} Section {s}",
+                "lastModifiedDateTime": _MODIFIED,
+                "isDefault": False,
+                "pagesUrl": f"{_SELF}/sections/{section_id}/pages",
+                "createdBy": _AUTHOR,
+                "lastModifiedBy": _AUTHOR,
+                "links": _links(section_id),
+                "parentNotebook": self._parent(self.containers[container.notebook_id], "notebooks"),
+                "parentSectionGroup": self._parent(container, "sectionGroups") if group_id else None
+            }
+            container.sections.append(section)
+            self.sections[section["id"]] = section
+
+        if depth < self.shape.group_depth:
+            for g in range(self.shape.section_groups):
+                group = _Container(
+                    id=f"{container.id}-g{g}",
+                    name=f"Group {depth}.{g}",
+                    notebook_id=container.notebook_id,
+                    parent_group_id=group_id
+                )
+                container.groups.append(group)
+                self.containers[group.id] = group
+                self._fill(group, self.shape.group_sections, depth + 1)
+
+    @staticmethod
+    def _parent(container: _Container, collection: str) -> Dict[str, Any]:
+        """Reference to a parent, as Graph expands it by default."""
+        return {"id": container.id, "displayName": container.name, "self": f"{_SELF}/{collection}/{container.id}"}
+
+    def notebook_json(self, notebook: _Container, expand: int) -> Dict[str, Any]:
+        item = {
+            "id": notebook.id,
+            "self": f"{_SELF}/notebooks/{notebook.id}",
+            "createdDateTime": _CREATED,
+            "displayName": notebook.name,
+            "lastModifiedDateTime": _MODIFIED,
+            "isDefault": False,
+            "userRole": "Owner",
+            "isShared": False,
+            "sectionsUrl": f"{_SELF}/notebooks/{notebook.id}/sections",
+            "sectionGroupsUrl": f"{_SELF}/notebooks/{notebook.id}/sectionGroups",
+            "createdBy": _AUTHOR,
+            "lastModifiedBy": _AUTHOR,
+            "links": _links(notebook.id)
+        }
+        return self._expand(item, notebook, expand)
+
+    def group_json(self, group: _Container, expand: int) -> Dict[str, Any]:
+        item = {
+            "id": group.id,
+            "self": f"{_SELF}/sectionGroups/{group.id}",
+            "createdDateTime": _CREATED,
+            "displayName": group.name,
+            "lastModifiedDateTime": _MODIFIED,
+            "sectionsUrl": f"{_SELF}/sectionGroups/{group.id}/sections",
+            "sectionGroupsUrl": f"{_SELF}/sectionGroups/{group.id}/sectionGroups",
+            "createdBy": _AUTHOR,
+            "lastModifiedBy": _AUTHOR,
+            "parentNotebook": self._parent(self.containers[group.notebook_id], "notebooks"),
+            "parentSectionGroup": (
+                self._parent(self.containers[group.parent_group_id], "sectionGroups") if group.parent_group_id else None
+            )
+        }
+        return self._expand(item, group, expand)
+
+    def _expand(self, item: Dict[str, Any], container: _Container, expand: int) -> Dict[str, Any]:
+        """Add ``expand`` levels of children, as ``$expand`` does."""
+        if expand > 0:
+            item["sections"] = list(container.sections)
+            item["sectionGroups"] = [self.group_json(group, expand - 1) for group in container.groups]
+        return item
+
+    def pages(self, section_id: str, base_url: str, root: str) -> List[Dict[str, Any]]:
+        section = self.sections[section_id]
+        parent = {"id": section_id, "displayName": section["displayName"], "self": section["self"]}
+        return [
+            {
+                "id": f"{section_id}-p{p}",
+                "self": f"{_SELF}/pages/{section_id}-p{p}",
+                "createdDateTime": _CREATED,
+                "title": f"Page {p}",
+                "createdByAppId": "WLID-000000004C12AE6F",
+                "contentUrl": f"{base_url}/{root}/pages/{section_id}-p{p}/content",
+                "lastModifiedDateTime": _MODIFIED,
+                "level": 0,
+                "order": p,
+                "links": _links(f"{section_id}-p{p}"),
+                "parentSection": parent
+            }
+            for p in range(self.shape.pages)
+        ]
+
+    def page_content(self, page_id: str, base_url: str, root: str) -> str:
+        """HTML of a page with ``images`` full-resolution image references."""
+        parts = [f"<html><head><title>{page_id}</title></head><body>"]
+        for i in range(self.shape.images):
+            resources = f"{base_url}/{root}/resources"
+            parts.append(
+                f'<div><p>Paragraph {i} of {page_id}</p>'
+                f'<img width="640" height="480" src="{resources}/{page_id}-r{i}-t/$value" data-src-type="image/png" '
+                f'data-fullres-src="{resources}/{page_id}-r{i}/$value" data-fullres-src-type="image/png" /></div>'
+            )
+        parts.append("</body></html>")
+        return "".join(parts)
+
+    def image(self, name: str) -> bytes:
+        """A distinct PNG-signed blob of ``image_bytes`` bytes."""
+        head = PNG_SIGNATURE + name.encode("utf-8")[:56].ljust(56, b"\0")
+        return head + self._filler[:max(0, self.shape.image_bytes - len(head))]
+
+class MockGraphServer(ThreadingHTTPServer):
+    """HTTP server answering Graph OneNote requests from a ``SyntheticTenant``."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, shape: TenantShape, faults: FaultProfile, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.tenant = SyntheticTenant(shape)
+        self.faults = faults
+        self.stats: Counter = Counter()
+        self._random = random.Random(faults.seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Graph base URL to configure as ``GRAPH_BASE_URL``."""
+        return f"http://127.0.0.1:{self.server_address[1]}/v1.0"
+
+    @property
+    def download_root(self) -> str:
+        """Host that preview images are served from."""
+        return f"http://localhost:{self.server_address[1]}"
+
+    def start(self) -> "MockGraphServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-graph", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def draw_fault(self) -> Tuple[Optional[str], float]:
+        """Decide the fault of one request: ``throttle``, ``error``, ``slow`` or None, and its delay."""
+        faults = self.faults
+        with self._lock:
+            roll = self._random.random()
+            delay = (faults.latency_ms + self._random.uniform(0, faults.jitter_ms)) / 1000
+        if roll < faults.throttle_rate:
+            return "throttle", delay
+        roll -= faults.throttle_rate
+        if roll < faults.error_rate:
+            return "error", delay
+        roll -= faults.error_rate
+        if roll < faults.slow_body_rate:
+            return "slow", delay
+        return None, delay
+
+    def error_status(self) -> int:
+        with self._lock:
+            return self._random.choice(self.faults.error_statuses)
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+def _json(status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    return status, {"Content-Type": "application/json", **(headers or {})}, json.dumps(body).encode("utf-8")
+
+def _error(status: int, code: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    return _json(status, {"error": {"code": code, "message": code}}, headers)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: MockGraphServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._respond("GET")
+
+    def do_POST(self) -> None:
+        self._respond("POST")
+
+    def _respond(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        fault, delay = self.server.draw_fault()
+        if delay:
+            time.sleep(delay)
+
+        split = urlsplit(self.path)
+        if split.path.startswith("/v1.0/") and not self.headers.get("Authorization", "").startswith("Bearer "):
+            status, headers, payload = _error(401, "InvalidAuthenticationToken")
+        elif split.path == "/v1.0/$batch" and method == "POST":
+            # Faults are drawn per sub-request, like Graph throttles them
+            status, headers, payload = self._batch(body)
+        elif fault == "throttle":
+            status, headers, payload = _error(429, "TooManyRequests", {"Retry-After": f"{self.server.faults.retry_after:g}"})
+        elif fault == "error":
+            status, headers, payload = _error(self.server.error_status(), "ServiceUnavailable")
+        else:
+            status, headers, payload = self._route(method, split.path, parse_qs(split.query))
+
+        self.server.count(str(status))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+
+        if fault == "slow" and status == 200:
+            self.server.count("slow")
+            pause = SLOW_CHUNK_SIZE / (self.server.faults.slow_body_kbps * 1024)
+            for offset in range(0, len(payload), SLOW_CHUNK_SIZE):
+                self.wfile.write(payload[offset:offset + SLOW_CHUNK_SIZE])
+                self.wfile.flush()
+                time.sleep(pause)
+        else:
+            self.wfile.write(payload)
+
+    def _route(self, method: str, path: str, query: Dict[str, List[str]]) -> Response:
+        """Answer one (non-batch) request."""
+        server = self.server
+        tenant = server.tenant
+
+        if path.startswith("/previews/"):
+            return 200, {"Content-Type": "image/png"}, tenant.image(path[len("/previews/"):])
+        if not path.startswith("/v1.0/") or method != "GET":
+            return _error(404, "NotFound")
+
+        segments = path[len("/v1.0/"):].strip("/").split("/")
+        if len(segments) == 5 and segments[0] == "sites" and segments[2] == "pages" and segments[4] == "preview":
+            return _json(200, {"previewImageUrl": f"{server.download_root}/previews/{segments[3]}.png"})
+        if "onenote" not in segments:
+            return _error(404, "NotFound")
+
+        split = segments.index("onenote") + 1
+        root, rest = "/".join(segments[:split]), segments[split:]
+        options = {name: query[name][0] for name in ("$select", "$expand") if name in query}
+        expand = expand_depth(options)
+
+        if rest == ["notebooks"]:
+            return self._listing(path, query, [tenant.notebook_json(nb, expand) for nb in tenant.notebooks])
+        if len(rest) >= 2 and rest[0] in ("notebooks", "sectionGroups"):
+            container = tenant.containers.get(rest[1])
+            if container is None:
+                return _error(404, "NotFound")
+            if len(rest) == 2:
+                if rest[0] == "notebooks":
+                    return _json(200, project(tenant.notebook_json(container, expand), options))
+                return _json(200, project(tenant.group_json(container, expand), options))
+            if rest[2:] == ["sections"]:
+                return self._listing(path, query, container.sections)
+            if rest[2:] == ["sectionGroups"]:
+                return self._listing(path, query, [tenant.group_json(group, expand) for group in container.groups])
+        if len(rest) >= 2 and rest[0] == "sections" and rest[1] in tenant.sections:
+            if len(rest) == 2:
+                return _json(200, project(tenant.sections[rest[1]], options))
+            if rest[2:] == ["pages"]:
+                return self._listing(path, query, tenant.pages(rest[1], server.base_url, root))
+        if len(rest) == 3 and rest[0] == "pages" and rest[2] == "content":
+            content = tenant.page_content(rest[1], server.base_url, root)
+            return 200, {"Content-Type": "text/html"}, content.encode("utf-8")
+        if len(rest) == 3 and rest[0] == "resources" and rest[2] == "$value":
+            return 200, {"Content-Type": "image/png"}, tenant.image(rest[1])
+        return _error(404, "NotFound")
+
+    def _listing(self, path: str, query: Dict[str, List[str]], items: List[Dict[str, Any]]) -> Response:
+        """One response of a paged collection, with ``@odata.nextLink`` if more follow."""
+        top = int(query.get("$top", [self.server.tenant.shape.page_size])[0])
+        skip = int(query.get("$skip", ["0"])[0])
+        if "$orderby" in query:
+            field_name, _, direction = query["$orderby"][0].partition(" ")
+            items = sorted(items, key=lambda item: str(item.get(field_name, "")),
+                           reverse=direction.strip().lower() == "desc")
+        options = {name: query[name][0] for name in ("$select", "$expand") if name in query}
+        body: Dict[str, Any] = {
+            "@odata.context": f"{self.server.base_url}/$metadata#{path[len('/v1.0/'):]}",
+            "value": [project(item, options) for item in items[skip:skip + top]]
+        }
+        if skip + top < len(items):
+            kept = "".join(
+                f"&{name}={quote(values[0], safe=QUERY_SAFE)}"
+                for name, values in query.items() if name not in ("$top", "$skip")
+            )
+            body["@odata.nextLink"] = (
+                f"{self.server.base_url}{path[len('/v1.0'):]}?$top={top}&$skip={skip + top}{kept}"
+            )
+        return _json(200, body)
+
+    def _batch(self, body: bytes) -> Response:
+        """Answer a ``$batch`` POST, drawing faults for every sub-request."""
+        server = self.server
+        responses = []
+        for request in json.loads(body or b"{}").get("requests", []):
+            fault, _ = server.draw_fault()
+            if fault == "throttle":
+                status, headers, payload = _error(429, "TooManyRequests", {"Retry-After": f"{server.faults.retry_after:g}"})
+            elif fault == "error":
+                status, headers, payload = _error(server.error_status(), "ServiceUnavailable")
+            else:
+                split = urlsplit(request["url"])
+                status, headers, payload = self._route(
+                    request.get("method", "GET"), "/v1.0/" + split.path.lstrip("/"), parse_qs(split.query)
+                )
+            server.count(f"batch:{status}")
+
+            if headers.get("Content-Type") == "application/json":
+                decoded: Any = json.loads(payload)
+            else:
+                # Graph base64-encodes non-JSON sub-response bodies
+                decoded = base64.b64encode(payload).decode("ascii")
+            responses.append({"id": request["id"], "status": status, "headers": headers, "body": decoded})
+        return _json(200, {"responses": responses})
+
+def _serve(shape: TenantShape, faults: FaultProfile, ports: "multiprocessing.Queue") -> None:
+    server = MockGraphServer(shape, faults)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+def start_in_subprocess(shape: TenantShape, faults: FaultProfile) -> Tuple[multiprocessing.Process, str]:
+    """Run a server in a child process, so it does not share the measured process.
+
+    Returns:
+        The process (terminate it when done) and the Graph base URL
+    """
+    ports: "multiprocessing.Queue" = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(shape, faults, ports), name="mock-graph", daemon=True)
+    process.start()
+    port = ports.get(timeout=30)
+    return process, f"http://127.0.0.1:{port}/v1.0"
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options describing the tenant and the faults, shared with the crawl benchmark."""
+    shape, faults = TenantShape(), FaultProfile()
+    group = parser.add_argument_group("synthetic tenant")
+    group.add_argument("--notebooks", type=int, default=shape.notebooks)
+    group.add_argument("--sections", type=int, default=shape.sections, help="sections directly in each notebook")
+    group.add_argument("--section-groups", type=int, default=shape.section_groups, help="section groups per container")
+    group.add_argument("--group-depth", type=int, default=shape.group_depth, help="levels of nested section groups")
+    group.add_argument("--group-sections", type=int, default=shape.group_sections, help="sections in each section group")
+    group.add_argument("--pages", type=int, default=shape.pages, help="pages per section")
+    group.add_argument("--images", type=int, default=shape.images, help="images per page")
+    group.add_argument("--image-kb", type=float, default=shape.image_bytes / 1024, help="size of each image")
+    group.add_argument("--page-size", type=int, default=shape.page_size, help="items per listing response")
+
+    group = parser.add_argument_group("faults")
+    group.add_argument("--latency-ms", type=float, help=f"added to every response (default {faults.latency_ms:g})")
+    group.add_argument("--jitter-ms", type=float, help="random extra latency, up to this much")
+    group.add_argument("--throttle-rate", type=float, help="share of requests answered with 429")
+    group.add_argument("--retry-after", type=float, help="Retry-After of the 429 responses, in seconds")
+    group.add_argument("--error-rate", type=float, help="share of requests answered with 500/502/503")
+    group.add_argument("--slow-body-rate", type=float, help="share of responses whose body is sent slowly")
+    group.add_argument("--slow-body-kbps", type=float, help="throughput of slow bodies")
+    group.add_argument("--seed", type=int, help="seed of the fault generator")
+
+def shape_from_arguments(args: argparse.Namespace) -> TenantShape:
+    return TenantShape(
+        notebooks=args.notebooks,
+        sections=args.sections,
+        section_groups=args.section_groups,
+        group_depth=args.group_depth,
+        group_sections=args.group_sections,
+        pages=args.pages,
+        images=args.images,
+        image_bytes=int(args.image_kb * 1024),
+        page_size=args.page_size
+    )
+
+def faults_from_arguments(args: argparse.Namespace, base: Optional[FaultProfile] = None) -> FaultProfile:
+    """``base`` with the fault options given on the command line applied."""
+    values = asdict(base or FaultProfile())
+    for name in ("latency_ms", "jitter_ms", "throttle_rate", "retry_after", "error_rate",
+                 "slow_body_rate", "slow_body_kbps", "seed"):
+        if getattr(args, name) is not None:
+            values[name] = getattr(args, name)
+    values["error_statuses"] = tuple(values["error_statuses"])
+    return FaultProfile(**values)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockGraphServer(shape_from_arguments(args), faults_from_arguments(args), args.host, args.port)
+    print(f"Serving {server.tenant.shape.page_count()} pages per notebook; GRAPH_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ setup(
         "requests",
         "beautifulsoup4",
     ],
+    extras_require={
+        "async": ["httpx[http2]"],
+    },
     python_requires=">=3.6",
     author="Your Name",
     author_email="your.email@example.com",
@@ -1,5 +1,6 @@
 import logging
-from .auth.graph_client import GraphAPIClient, load_config
+import sys
+from .cli import main as cli_main
 
 # Configure logging
 logging.basicConfig(
@@ -10,16 +11,10 @@ logging.basicConfig(
 def main():
     """Main entry point for the application."""
     try:
-        # Load configuration
-        config = load_config()
-        
-        # Initialize and run the Graph API client
-        client = GraphAPIClient(config)
-        client.run()
-        
+        return cli_main()
     except Exception as e:
         logging.error(f"Application error: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
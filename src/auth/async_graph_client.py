@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, List, Optional
+
+from ..utils.http_session import GRAPH_BASE_URL, RESPONSE_TYPES
+from ..utils.metrics import endpoint_template, observe_request, observe_retry, observe_wait
+from ..utils.rate_limiter import THROTTLE_STATUSES, endpoint_family, parse_retry_after
+from ..utils.tracing import trace_span
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def _unlimited() -> AsyncIterator[None]:
+    """Stand-in for ``RateLimiter.aslot`` when the client has no rate limiter."""
+    yield
+
+class AsyncGraphAPIClient:
+    """Asyncio Graph API client that multiplexes requests over HTTP/2 connections.
+
+    Authentication, progress reporting and error handling are delegated to
+    the synchronous ``GraphAPIClient`` that owns the token cache, so both
+    backends share one login.
+    """
+
+    def __init__(self, graph_client: Any, max_connections: int = 10, timeout: float = 30.0):
+        """Initialize the async client.
+
+        Args:
+            graph_client: The synchronous client holding the token cache
+            max_connections: Maximum number of connections per host; with
+                HTTP/2 each connection carries many concurrent streams
+            timeout: Request timeout in seconds
+        """
+        if httpx is None:
+            raise ImportError("The async backend requires httpx: pip install 'httpx[http2]'")
+
+        self.graph_client = graph_client
+        self.config = getattr(graph_client, "config", {})
+        self.base_url = getattr(graph_client, "base_url", GRAPH_BASE_URL)
+        # Requests of both backends are recorded in the sync client's registry
+        self.metrics = getattr(graph_client, "metrics", None)
+        self.tracer = getattr(graph_client, "tracer", None)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+
+        if not HTTP2_AVAILABLE:
+            logger.warning("h2 is not installed, the async backend will use HTTP/1.1")
+
+    async def __aenter__(self) -> "AsyncGraphAPIClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Open the underlying HTTP client."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections if self.config.get("http_keep_alive", True) else 0
+                )
+            )
+            self._refresh_lock = asyncio.Lock()
+
+    async def close(self) -> None:
+        """Close the underlying HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def add_progress(self, message: str, coalesce_key: Optional[str] = None) -> None:
+        """Add a progress message."""
+        self.graph_client.add_progress(message, coalesce_key)
+
+    def add_user_prompt(self, message: str, options: List[str]) -> None:
+        """Add a user prompt message."""
+        self.graph_client.add_user_prompt(message, options)
+
+    def handle_error(self, error: Exception, context: Dict[str, Any]) -> None:
+        """Handle errors using the self-healing mechanism."""
+        self.graph_client.handle_error(error, context)
+
+    async def _access_token(self) -> str:
+        """Current access token; waits off the event loop if it must be renewed first."""
+        provider = self.graph_client.token_provider
+        token = self.graph_client.token_cache.get_token()
+        if token and self.graph_client.token_cache.expires_in() > provider.refresh_skew:
+            return token['token']
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, provider.get_access_token)
+
+    async def _refresh_access_token(self, rejected: str, endpoint: str, method: str) -> str:
+        """Refresh the token once, even when many requests are rejected together."""
+        async with self._refresh_lock:
+            current = self.graph_client.token_cache.get_token()
+            if current and current['token'] != rejected:
+                # Another request already refreshed it
+                return current['token']
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self.graph_client.refresh_access_token, rejected, endpoint, method
+            )
+
+    async def _send(self, method: str, url: str, stream: bool = False, **kwargs) -> "httpx.Response":
+        """Send a request through the shared rate limiter, retrying throttled responses.
+
+        Uses the token buckets, AIMD concurrency limit and ``Retry-After``
+        pauses of the sync client's limiter; waiting happens with
+        ``asyncio.sleep`` so the event loop keeps running. With ``stream`` the
+        body is left unread.
+        """
+        rate_limiter = getattr(self.graph_client, "rate_limiter", None)
+        max_retries = self.config.get("throttle_max_retries", 5)
+
+        for attempt in range(max_retries + 1):
+            with trace_span(self.tracer, "http.request", "http", attempt=attempt) as span:
+                queued = time.monotonic()
+                async with rate_limiter.aslot(url) if rate_limiter is not None else _unlimited():
+                    started = time.monotonic()
+                    observe_wait(self.metrics, url, started - queued)
+                    request = self._client.build_request(method, url, **kwargs)
+                    response = await self._client.send(request, stream=stream)
+                    elapsed = time.monotonic() - started
+                    retry_after = response.headers.get("Retry-After")
+                    if rate_limiter is not None:
+                        rate_limiter.record(url, response.status_code, elapsed, retry_after)
+                span.set(status=response.status_code, wait_ms=round((started - queued) * 1000, 3))
+            observe_request(self.metrics, method, url, response.status_code, elapsed,
+                            self._response_size(response, stream), self.base_url)
+
+            if response.status_code not in THROTTLE_STATUSES or attempt == max_retries:
+                return response
+
+            observe_retry(self.metrics, url, "throttled", self.base_url)
+            self.add_progress(f"Throttled by Graph (status {response.status_code}), retrying...")
+            await response.aclose()
+            if parse_retry_after(retry_after) is None and rate_limiter is not None:
+                await asyncio.sleep(rate_limiter.backoff(attempt))
+
+        return response
+
+    @staticmethod
+    def _response_size(response: "httpx.Response", stream: bool) -> Optional[int]:
+        """Body size from ``Content-Length``, or of the read body; unknown for chunked streams."""
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit():
+            return int(length)
+        if stream:
+            return None
+        return len(response.content)
+
+    async def call_graph_api(self, endpoint: str, method: str = "GET", response_type: str = "json", **kwargs) -> Any:
+        """Make a call to the Microsoft Graph API.
+
+        Args:
+            endpoint: The API endpoint to call, relative to the Graph base URL
+                or an absolute URL such as an ``@odata.nextLink``
+            method: HTTP method to use
+            response_type: ``json`` (default), ``text``, ``bytes`` or
+                ``stream``
+            **kwargs: Additional arguments to pass to httpx
+
+        Returns:
+            For ``json`` the response as a dictionary, or as text for non-JSON
+            responses; for ``text`` and ``bytes`` the body as is; for
+            ``stream`` the open ``httpx.Response``, to be read with
+            ``aiter_bytes`` and closed with ``aclose``
+        """
+        if response_type not in RESPONSE_TYPES:
+            raise ValueError(f"Unknown response type: {response_type}")
+
+        if self.tracer is None or not self.tracer.enabled:
+            return await self._call_graph_api(endpoint, method, response_type, **kwargs)
+        url = endpoint if endpoint.startswith(("http://", "https://")) else f"{self.base_url}/{endpoint}"
+        with self.tracer.span(f"graph.{endpoint_family(url)}", "graph", method=method,
+                              endpoint=endpoint_template(url, self.base_url), response_type=response_type):
+            return await self._call_graph_api(endpoint, method, response_type, **kwargs)
+
+    async def _call_graph_api(self, endpoint: str, method: str, response_type: str, **kwargs) -> Any:
+        """``call_graph_api`` without the tracing span."""
+        await self.open()
+        access_token = await self._access_token()
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        url = endpoint if endpoint.startswith(("http://", "https://")) else f"{self.base_url}/{endpoint}"
+        stream = response_type == "stream"
+
+        # Shares the synchronous client's response cache
+        cache = getattr(self.graph_client, "response_cache", None)
+        cached = None
+        cacheable = cache is not None and method == "GET" and not kwargs and response_type in ("json", "text")
+        if cacheable:
+            cached = cache.lookup(url, response_type)
+            if cached and cache.is_fresh(cached):
+                return cached.body
+            if cached:
+                headers.update(cached.conditional_headers())
+
+        response = None
+        try:
+            self.add_progress(f"Making API call to: {endpoint}", coalesce_key="api_call")
+            response = await self._send(method, url, stream=stream, headers=headers, **kwargs)
+
+            if response.status_code == 401:
+                await response.aclose()
+                access_token = await self._refresh_access_token(access_token, endpoint, method)
+                observe_retry(self.metrics, url, "unauthorized", self.base_url)
+                headers["Authorization"] = f"Bearer {access_token}"
+                response = await self._send(method, url, stream=stream, headers=headers, **kwargs)
+
+            if cached and response.status_code == 304:
+                return cache.revalidated(cached)
+
+            if stream and response.is_error:
+                # Read the (small) error body so it can be reported
+                await response.aread()
+            response.raise_for_status()
+            if stream:
+                return response
+            if response_type == "bytes":
+                return response.content
+            if response_type == "text" or "json" not in response.headers.get("Content-Type", "application/json"):
+                body = response.text
+            else:
+                body = response.json()
+
+            if cacheable and response.status_code == 200:
+                cache.store(url, body, response.headers, response_type)
+            return body
+
+        except httpx.HTTPError as e:
+            response = getattr(e, 'response', None)
+            self.handle_error(e, {
+                'endpoint': endpoint,
+                'method': method,
+                'status_code': response.status_code if response is not None else None,
+                'response_text': response.text if response is not None else None
+            })
+            if stream and response is not None:
+                await response.aclose()
+            raise
+
+    async def download(self, url: str, **kwargs) -> "httpx.Response":
+        """Download a resource over the shared connections.
+
+        Args:
+            url: Absolute URL of the resource
+            **kwargs: Additional arguments to pass to httpx
+
+        Returns:
+            The raw HTTP response
+        """
+        await self.open()
+        with trace_span(self.tracer, "download", "download"):
+            return await self._send("GET", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, url: str, **kwargs) -> AsyncIterator["httpx.Response"]:
+        """Open a streamed download; the body is read with ``aiter_bytes``.
+
+        Args:
+            url: Absolute URL of the resource
+            **kwargs: Additional arguments to pass to httpx
+        """
+        await self.open()
+        with trace_span(self.tracer, "download", "download", streamed=True) as span:
+            response = await self._send("GET", url, stream=True, **kwargs)
+            span.set(status=response.status_code)
+            try:
+                yield response
+            finally:
+                await response.aclose()
@@ -0,0 +1,299 @@
+import base64
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from ..utils.http_session import GRAPH_BASE_URL
+from ..utils.metrics import observe_retry, observe_throttle
+from ..utils.rate_limiter import THROTTLE_STATUSES, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Graph accepts at most 20 sub-requests per $batch POST
+MAX_BATCH_SIZE = 20
+
+# Sub-request statuses worth sending again
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class GraphBatchError(Exception):
+    """A sub-request of a $batch call failed."""
+
+    def __init__(self, endpoint: str, status_code: int, body: Any):
+        super().__init__(f"Batched request to {endpoint} failed with status {status_code}")
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.body = body
+        self.response = None
+
+@dataclass
+class BatchRequest:
+    """A single request to send inside a $batch call."""
+    endpoint: str
+    method: str = "GET"
+    depends_on: List[int] = field(default_factory=list)
+    body: Optional[Dict] = None
+    headers: Optional[Dict[str, str]] = None
+
+@dataclass
+class _PendingItem:
+    """A submitted request waiting for its batch to be sent."""
+    request: BatchRequest
+    future: Future
+    depends_on: List["_PendingItem"] = field(default_factory=list)
+    attempts: int = 0
+
+def _relative_url(endpoint: str, base_url: str = GRAPH_BASE_URL) -> str:
+    """Convert an endpoint or absolute Graph URL to the form $batch expects."""
+    if endpoint.startswith(base_url):
+        endpoint = endpoint[len(base_url):]
+    return endpoint if endpoint.startswith("/") else f"/{endpoint}"
+
+def _decode_body(response: Dict) -> Any:
+    """Decode a sub-response body; non-JSON bodies arrive base64-encoded."""
+    body = response.get("body")
+    headers = {k.lower(): v for k, v in (response.get("headers") or {}).items()}
+    content_type = headers.get("content-type", "")
+
+    if body is None or isinstance(body, (dict, list)) or "json" in content_type:
+        return body
+
+    try:
+        raw = base64.b64decode(body, validate=True)
+    except (ValueError, TypeError):
+        return body
+
+    if content_type.startswith("text/") or "html" in content_type:
+        return raw.decode("utf-8", errors="replace")
+    return raw
+
+class GraphBatcher:
+    """Groups independent Graph requests into $batch POSTs.
+
+    Requests submitted from many threads are collected for up to ``linger``
+    seconds, or until ``max_batch_size`` are waiting, and then sent together.
+    Every submitted request gets a future that resolves to its own decoded
+    body or fails with ``GraphBatchError``. Throttled or failed sub-requests
+    are retried in a later batch, honoring ``Retry-After``.
+    """
+
+    def __init__(self, graph_client: Any, max_batch_size: int = MAX_BATCH_SIZE,
+                 linger: float = 0.005, max_retries: int = 3,
+                 response_hook: Optional[Callable[[BatchRequest, int, Dict[str, str], Any], Any]] = None):
+        """Initialize the batcher.
+
+        Args:
+            graph_client: Client used to POST the $batch requests
+            max_batch_size: Sub-requests per $batch call (at most 20)
+            linger: Seconds to wait for more requests before sending a partial batch
+            max_retries: Times a failed sub-request is sent again
+            response_hook: Called with the request, status, lower-cased headers
+                and body of every successful sub-response; its return value
+                becomes the future's result
+        """
+        self.graph_client = graph_client
+        self.response_hook = response_hook
+        self.max_batch_size = min(max_batch_size, MAX_BATCH_SIZE)
+        self.linger = linger
+        self.max_retries = max_retries
+        self._pending: List[_PendingItem] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of requests waiting to be sent."""
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, endpoint: str, method: str = "GET", **kwargs) -> Future:
+        """Queue a request and return a future for its body.
+
+        Args:
+            endpoint: The API endpoint to call
+            method: HTTP method to use
+            **kwargs: ``body`` and ``headers`` of the sub-request
+
+        Returns:
+            A future resolving to the decoded response body
+        """
+        item = _PendingItem(BatchRequest(endpoint, method, **kwargs), Future())
+
+        with self._lock:
+            self._pending.append(item)
+            ready = len(self._pending) >= self.max_batch_size
+            if ready:
+                batch = self._take_batch()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.linger, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if ready:
+            self._send(batch)
+        return item.future
+
+    def submit_many(self, requests: List[BatchRequest]) -> List[Future]:
+        """Send a list of requests, keeping dependent requests in the same batch.
+
+        ``depends_on`` holds indexes into ``requests``; a request is only
+        run after the requests it depends on succeeded.
+
+        Args:
+            requests: The requests to send
+
+        Returns:
+            One future per request, in order
+        """
+        items = [_PendingItem(request, Future()) for request in requests]
+        for item in items:
+            item.depends_on = [items[index] for index in item.request.depends_on]
+
+        for group in self._group(items):
+            self._send(group)
+        return [item.future for item in items]
+
+    def flush(self) -> None:
+        """Send everything that is waiting."""
+        while True:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._send(batch)
+
+    def _take_batch(self) -> List[_PendingItem]:
+        """Remove up to one batch worth of pending items. Caller holds the lock."""
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _group(self, items: List[_PendingItem]) -> List[List[_PendingItem]]:
+        """Split items into batches without separating dependency chains."""
+        # Union items with their dependencies
+        parent = {id(item): id(item) for item in items}
+
+        def find(key: int) -> int:
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for item in items:
+            for dependency in item.depends_on:
+                parent[find(id(item))] = find(id(dependency))
+
+        chains: Dict[int, List[_PendingItem]] = {}
+        for item in items:
+            chains.setdefault(find(id(item)), []).append(item)
+
+        batches: List[List[_PendingItem]] = [[]]
+        for chain in chains.values():
+            if len(chain) > self.max_batch_size:
+                raise ValueError(f"A dependency chain of {len(chain)} requests does not fit in one batch")
+            if len(batches[-1]) + len(chain) > self.max_batch_size:
+                batches.append([])
+            batches[-1].extend(chain)
+        return [batch for batch in batches if batch]
+
+    def _send(self, items: List[_PendingItem]) -> None:
+        """POST a batch and resolve its futures, retrying failed sub-requests."""
+        base_url = getattr(self.graph_client, "base_url", GRAPH_BASE_URL)
+        while items:
+            ids = {id(item): str(index) for index, item in enumerate(items)}
+            payload = {"requests": []}
+            for item in items:
+                sub_request = {
+                    "id": ids[id(item)],
+                    "method": item.request.method,
+                    "url": _relative_url(item.request.endpoint, base_url)
+                }
+                depends_on = [ids[id(dep)] for dep in item.depends_on if id(dep) in ids]
+                if depends_on:
+                    sub_request["dependsOn"] = depends_on
+                if item.request.body is not None:
+                    sub_request["body"] = item.request.body
+                    sub_request["headers"] = {"Content-Type": "application/json"}
+                if item.request.headers:
+                    sub_request.setdefault("headers", {}).update(item.request.headers)
+                payload["requests"].append(sub_request)
+                item.attempts += 1
+
+            try:
+                result = self.graph_client.call_graph_api("$batch", method="POST", data=json.dumps(payload))
+            except Exception as e:
+                for item in items:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+                return
+
+            responses = {response["id"]: response for response in result.get("responses", [])}
+            retry: List[_PendingItem] = []
+            retry_after = 0.0
+
+            for item in items:
+                response = responses.get(ids[id(item)])
+                status = response.get("status", 500) if response else 500
+                body = _decode_body(response) if response else None
+
+                if status < 400:
+                    if self.response_hook is not None:
+                        headers = {k.lower(): v for k, v in (response.get("headers") or {}).items()}
+                        try:
+                            body = self.response_hook(item.request, status, headers, body)
+                        except Exception as e:
+                            item.future.set_exception(e)
+                            continue
+                    item.future.set_result(body)
+                elif (status in RETRYABLE_STATUSES or status == 424) and item.attempts <= self.max_retries:
+                    # 424 means a dependency failed; it is retried alongside it
+                    retry.append(item)
+                    headers = {k.lower(): v for k, v in (response.get("headers") or {}).items()} if response else {}
+                    item_retry_after = parse_retry_after(headers.get("retry-after"))
+                    retry_after = max(retry_after, item_retry_after or 0.0)
+                    
+                    metrics = getattr(self.graph_client, "metrics", None)
+                    observe_retry(metrics, item.request.endpoint, "batch", base_url)
+                    
+                    # Let direct calls to the same endpoint family back off too
+                    rate_limiter = getattr(self.graph_client, "rate_limiter", None)
+                    if status in THROTTLE_STATUSES:
+                        observe_throttle(metrics, item.request.endpoint, status, base_url)
+                        if rate_limiter is not None:
+                            rate_limiter.record_throttle(item.request.endpoint, item_retry_after)
+                else:
+                    error = GraphBatchError(item.request.endpoint, status, body)
+                    self.graph_client.handle_error(error, {
+                        'endpoint': item.request.endpoint,
+                        'method': item.request.method,
+                        'status_code': status,
+                        'response_text': json.dumps(body) if isinstance(body, (dict, list)) else body
+                    })
+                    item.future.set_exception(error)
+
+            # Only retry dependents whose dependencies are retried as well
+            retry_ids = {id(item) for item in retry}
+            items = []
+            for item in retry:
+                if all(dep.future.done() and dep.future.exception() is None or id(dep) in retry_ids
+                       for dep in item.depends_on):
+                    items.append(item)
+                else:
+                    item.future.set_exception(GraphBatchError(item.request.endpoint, 424, None))
+
+            if items:
+                attempt = max(item.attempts for item in items)
+                delay = retry_after or min(2 ** attempt, 30)
+                delay += random.uniform(0, delay / 4)
+                logger.info(f"Retrying {len(items)} batched request(s) in {delay:.1f}s")
+                time.sleep(delay)
@@ -1,10 +1,10 @@
 import os
 import logging
-from typing import Dict, Any, Optional, List
-import msal
-from flask import Flask, request, redirect, Response, stream_with_context
+from typing import TYPE_CHECKING, Callable, Dict, Any, Optional, List, Union
+from urllib.parse import urlparse
+from concurrent.futures import Future
+from dataclasses import replace
 from dotenv import load_dotenv
-import webbrowser
 import threading
 import requests
 import time
@@ -12,6 +12,20 @@ import json
 
 from ..utils.token_cache import TokenCache
 from ..utils.self_healer import SelfHealer
+from ..utils.http_session import HTTPTransport, GRAPH_BASE_URL, RESPONSE_TYPES
+from ..utils.rate_limiter import RateLimiter, THROTTLE_STATUSES, endpoint_family, parse_retry_after
+from ..utils.response_cache import ResponseCache, parse_ttls
+from ..utils.progress_bus import ProgressBus
+from ..utils.metrics import (
+    MetricsRegistry, PROMETHEUS_CONTENT_TYPE, endpoint_template, observe_request, observe_retry, observe_wait
+)
+from ..utils.tracing import DEFAULT_MAX_EVENTS, Tracer
+from ..utils.profiling import create_profiler, profile_path
+from .batch import GraphBatcher, GraphBatchError, BatchRequest
+from .token_provider import APP_SCOPES, TokenProvider, TokenRefreshError
+
+if TYPE_CHECKING:
+    from flask import Flask, Response
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +39,62 @@ def load_config() -> Dict[str, Any]:
         "tenant_id": os.getenv("TENANT_ID", "your_tenant_id"),
         "redirect_uri": os.getenv("REDIRECT_URI", "http://localhost:5000/getToken"),
         "scopes": ["Notes.Read", "Notes.Read.All"],
-        "openai_api_key": os.getenv("OPENAI_API_KEY")
+        "openai_api_key": os.getenv("OPENAI_API_KEY"),
+        "http_pool_size": int(os.getenv("HTTP_POOL_SIZE", "20")),
+        "http_keep_alive": os.getenv("HTTP_KEEP_ALIVE", "true").lower() == "true",
+        "http_prewarm_connections": int(os.getenv("HTTP_PREWARM_CONNECTIONS", "4")),
+        "http_timeout": float(os.getenv("HTTP_TIMEOUT", "30")),
+        "listing_workers": int(os.getenv("LISTING_WORKERS", "2")),
+        "preview_workers": int(os.getenv("PREVIEW_WORKERS", "4")),
+        "download_workers": int(os.getenv("DOWNLOAD_WORKERS", "8")),
+        "write_workers": int(os.getenv("WRITE_WORKERS", "2")),
+        "pipeline_queue_size": int(os.getenv("PIPELINE_QUEUE_SIZE", "64")),
+        "fetch_backend": os.getenv("FETCH_BACKEND", "sync").lower(),
+        "async_max_connections": int(os.getenv("ASYNC_MAX_CONNECTIONS", "10")),
+        "async_concurrency": int(os.getenv("ASYNC_CONCURRENCY", "100")),
+        "graph_batching": os.getenv("GRAPH_BATCHING", "true").lower() == "true",
+        "batch_linger_ms": float(os.getenv("BATCH_LINGER_MS", "5")),
+        "batch_max_retries": int(os.getenv("BATCH_MAX_RETRIES", "3")),
+        "rate_limit_rps": float(os.getenv("RATE_LIMIT_RPS", "10")),
+        "rate_limit_burst": float(os.getenv("RATE_LIMIT_BURST", "20")),
+        "download_rate_limit_rps": float(os.getenv("DOWNLOAD_RATE_LIMIT_RPS", "50")),
+        "initial_concurrency": int(os.getenv("INITIAL_CONCURRENCY", "8")),
+        "max_concurrency": int(os.getenv("MAX_CONCURRENCY", "64")),
+        "throttle_max_retries": int(os.getenv("THROTTLE_MAX_RETRIES", "5")),
+        "fsync_policy": os.getenv("FSYNC_POLICY", "file").lower(),
+        "download_chunk_size": int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(64 * 1024))),
+        "page_image_fanout": int(os.getenv("PAGE_IMAGE_FANOUT", "16")),
+        "sync_mode": os.getenv("SYNC_MODE", "full").lower(),
+        "blob_store": os.getenv("BLOB_STORE", "true").lower() == "true",
+        "blob_link_mode": os.getenv("BLOB_LINK_MODE", "hardlink").lower(),
+        "response_cache": os.getenv("RESPONSE_CACHE", "false").lower() == "true",
+        "response_cache_dir": os.getenv("RESPONSE_CACHE_DIR", ".graph_cache"),
+        "response_cache_max_mb": int(os.getenv("RESPONSE_CACHE_MAX_MB", "256")),
+        "response_cache_ttls": parse_ttls(os.getenv("RESPONSE_CACHE_TTL", "")),
+        "metadata_cache_ttl": float(os.getenv("METADATA_CACHE_TTL", "300")),
+        "progress_buffer_size": int(os.getenv("PROGRESS_BUFFER_SIZE", "1000")),
+        "token_cache_file": os.getenv("TOKEN_CACHE_FILE", "token_cache.json"),
+        "token_refresh_skew": float(os.getenv("TOKEN_REFRESH_SKEW", "300")),
+        "auth_mode": os.getenv("AUTH_MODE", "delegated").lower(),
+        "onenote_root": os.getenv("ONENOTE_ROOT", "me/onenote").strip("/"),
+        "notebook_name": os.getenv("NOTEBOOK_NAME"),
+        "site_id": os.getenv("SITE_ID"),
+        "output_dir": os.getenv("OUTPUT_DIR", "downloaded_images"),
+        "crawl_workers": int(os.getenv("CRAWL_WORKERS", "4")),
+        "crawl_shard_size": int(os.getenv("CRAWL_SHARD_SIZE", "4")),
+        "crawl_rate_share": float(os.getenv("CRAWL_RATE_SHARE", "1")),
+        "crawl_journal": os.getenv("CRAWL_JOURNAL", "true").lower() == "true",
+        "journal_commit_interval": float(os.getenv("JOURNAL_COMMIT_INTERVAL", "1")),
+        "metrics_file": os.getenv("METRICS_FILE"),
+        "graph_base_url": os.getenv("GRAPH_BASE_URL", GRAPH_BASE_URL).rstrip("/"),
+        "trace": os.getenv("TRACE", "false").lower() == "true",
+        "trace_file": os.getenv("TRACE_FILE"),
+        "trace_max_events": int(os.getenv("TRACE_MAX_EVENTS", str(DEFAULT_MAX_EVENTS))),
+        "profile": os.getenv("PROFILE", "").lower() or None,
+        "profile_file": os.getenv("PROFILE_FILE"),
+        "profile_interval_ms": float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+        "listing_projection": os.getenv("LISTING_PROJECTION", "true").lower() == "true",
+        "page_orderby": os.getenv("PAGE_ORDERBY") or None
     }
     
     # Set authority based on tenant_id
@@ -51,44 +120,183 @@ class GraphAPIClient:
                 - redirect_uri: Redirect URI for OAuth flow
                 - scopes: List of API scopes
                 - authority: Authority URL
+                - http_pool_size: Connections kept open per host (optional)
+                - http_keep_alive: Keep connections open between requests (optional)
+                - http_prewarm_connections: Connections opened ahead of the first call (optional)
+                - http_timeout: Request timeout in seconds (optional)
+                - graph_batching: Group independent GETs into $batch calls (optional)
+                - batch_linger_ms: Time to wait for more requests before sending a batch (optional)
+                - batch_max_retries: Retries for throttled or failed sub-requests (optional)
+                - rate_limit_rps: Graph requests per second per endpoint family (optional)
+                - rate_limit_burst: Requests allowed in a burst per family (optional)
+                - download_rate_limit_rps: Requests per second to download hosts (optional)
+                - initial_concurrency: Starting AIMD concurrency limit (optional)
+                - max_concurrency: Upper bound of the AIMD concurrency limit (optional)
+                - throttle_max_retries: Retries for 429/503/504 responses (optional)
+                - response_cache: Cache GET responses on disk and revalidate them (optional)
+                - response_cache_dir: Directory of the response cache (optional)
+                - response_cache_max_mb: Size bound of the response cache (optional)
+                - response_cache_ttls: Seconds responses are reused without
+                  revalidation, per endpoint family (optional)
+                - progress_buffer_size: Progress messages kept for the browser (optional)
+                - token_cache_file: File holding the tokens and the MSAL cache (optional)
+                - token_refresh_skew: Seconds before expiry at which the access
+                  token is renewed (optional)
+                - auth_mode: ``delegated`` (browser sign-in or cached refresh
+                  token) or ``client_credentials`` (app-only) (optional)
+                - graph_base_url: Graph endpoint, e.g. a mock server for
+                  benchmarks (optional)
+                - trace: Record spans of the crawl as a Chrome trace (optional)
+                - trace_max_events: Spans kept per run (optional)
+                - profile: Profile runs with ``cprofile`` or ``sample`` (optional)
         """
         self.config = config
-        self.token_cache = TokenCache()
-        self.app = Flask(__name__)
-        self.app.secret_key = os.urandom(24)
-        self.progress_messages = []
-        
-        # Initialize MSAL client
-        self.msal_app = msal.ConfidentialClientApplication(
-            config["client_id"],
-            authority=config["authority"],
-            client_credential=config["client_secret"]
+        self.base_url = config.get("graph_base_url", GRAPH_BASE_URL).rstrip("/")
+        parsed = urlparse(self.base_url)
+        self.graph_root = f"{parsed.scheme}://{parsed.netloc}"
+        self.token_cache = TokenCache(config.get("token_cache_file", "token_cache.json"))
+        self._app: Optional["Flask"] = None
+        self._msal_app = None
+        self._msal_lock = threading.Lock()
+        self.progress_bus = ProgressBus(capacity=config.get("progress_buffer_size", 1000))
+        
+        # Request, throttling, token and crawl metrics, served on /metrics
+        self.metrics = MetricsRegistry()
+        
+        # Spans of the crawl's hot path; a no-op unless tracing is enabled
+        self.tracer = Tracer(
+            enabled=config.get("trace", False),
+            max_events=config.get("trace_max_events", DEFAULT_MAX_EVENTS)
+        )
+        
+        # Shared connection pool for Graph calls and image downloads
+        self.transport = HTTPTransport(
+            pool_size=config.get("http_pool_size", 20),
+            keep_alive=config.get("http_keep_alive", True),
+            timeout=config.get("http_timeout", 30.0)
+        )
+        
+        # Shared throttling for Graph calls and downloads
+        self.rate_limiter = RateLimiter(
+            rates={
+                "default": config.get("rate_limit_rps", 10.0),
+                "download": config.get("download_rate_limit_rps", 50.0)
+            },
+            burst=config.get("rate_limit_burst", 20.0),
+            initial_concurrency=config.get("initial_concurrency", 8),
+            max_concurrency=config.get("max_concurrency", 64)
+        )
+        
+        # Conditional GETs against an on-disk copy of earlier responses
+        self.response_cache = (
+            ResponseCache(
+                config.get("response_cache_dir", ".graph_cache"),
+                max_bytes=config.get("response_cache_max_mb", 256) * 1024 * 1024,
+                ttls=config.get("response_cache_ttls")
+            )
+            if config.get("response_cache", False) else None
+        )
+        
+        # Groups independent GETs into $batch calls
+        self.batcher = GraphBatcher(
+            self,
+            linger=config.get("batch_linger_ms", 5) / 1000,
+            max_retries=config.get("batch_max_retries", 3),
+            response_hook=self._on_batch_response if self.response_cache else None
         )
         
+        # Renews the access token ahead of expiry, once for all threads; the
+        # MSAL client is only created once a token has to be acquired
+        client_credentials = config.get("auth_mode") == "client_credentials"
+        self.token_provider = TokenProvider(
+            lambda: self.msal_app,
+            self.token_cache,
+            APP_SCOPES if client_credentials else config["scopes"],
+            refresh_skew=config.get("token_refresh_skew", 300.0),
+            client_credentials=client_credentials
+        )
+        self._register_gauges()
+        
         # Initialize self-healer if OpenAI API key is available
         if config["openai_api_key"]:
-            self.self_healer = SelfHealer(config["openai_api_key"])
+            self.self_healer = SelfHealer(config["openai_api_key"], tracer=self.tracer)
         else:
             self.self_healer = None
             logger.warning("Self-healing disabled: OpenAI API key not configured")
-        
-        # Set up routes
-        self.app.route('/')(self.index)
-        self.app.route('/getToken')(self.get_token)
-        self.app.route('/progress')(self.progress)
-        self.app.route('/handle_option')(self.handle_option)
     
-    def add_progress(self, message: str) -> None:
-        """Add a progress message."""
-        self.progress_messages.append({
+    @property
+    def app(self) -> "Flask":
+        """The Flask app of the browser sign-in flow, created on first use."""
+        if self._app is None:
+            from flask import Flask
+            
+            app = Flask(__name__)
+            app.secret_key = os.urandom(24)
+            
+            # Set up routes
+            app.route('/')(self.index)
+            app.route('/getToken')(self.get_token)
+            app.route('/progress')(self.progress)
+            app.route('/handle_option')(self.handle_option)
+            app.route('/metrics')(self.serve_metrics)
+            self._app = app
+        return self._app
+    
+    def _register_gauges(self) -> None:
+        """Metrics read from the client's components whenever they are collected."""
+        self.metrics.counter("onenote_token_refreshes_total", "Access tokens renewed").set_function(
+            lambda: self.token_provider.refreshes
+        )
+        self.metrics.gauge("onenote_http_in_flight", "Requests holding a concurrency slot").set_function(
+            lambda: self.rate_limiter.concurrency.in_flight
+        )
+        self.metrics.gauge("onenote_http_concurrency_limit", "Current AIMD concurrency limit").set_function(
+            lambda: self.rate_limiter.concurrency.limit
+        )
+        self.metrics.gauge("onenote_batch_queue_depth", "Requests waiting for the next $batch call").set_function(
+            lambda: self.batcher.pending
+        )
+    
+    @property
+    def msal_app(self) -> Any:
+        """The MSAL client, created with the persisted account cache on first use."""
+        with self._msal_lock:
+            if self._msal_app is None:
+                import msal
+                
+                self._msal_app = msal.ConfidentialClientApplication(
+                    self.config["client_id"],
+                    authority=self.config["authority"],
+                    client_credential=self.config["client_secret"],
+                    token_cache=TokenProvider.load_msal_cache(self.token_cache)
+                )
+            return self._msal_app
+    
+    @property
+    def progress_messages(self) -> List[Dict[str, Any]]:
+        """The buffered progress messages, oldest first (read-only snapshot)."""
+        return self.progress_bus.snapshot()
+    
+    def add_progress(self, message: str, coalesce_key: Optional[str] = None) -> None:
+        """Add a progress message.
+        
+        Args:
+            message: Text shown to the user
+            coalesce_key: Consecutive messages with the same key are shown
+                as one line holding the latest message
+        """
+        data = {
             'timestamp': time.time(),
             'message': message
-        })
+        }
+        if coalesce_key:
+            data['key'] = coalesce_key
+        self.progress_bus.publish(data, coalesce_key)
         logger.info(message)
     
     def add_user_prompt(self, message: str, options: List[str]) -> None:
         """Add a user prompt message."""
-        self.progress_messages.append({
+        self.progress_bus.publish({
             'timestamp': time.time(),
             'type': 'prompt',
             'message': message,
@@ -99,27 +307,75 @@ class GraphAPIClient:
     
     def run(self, host: str = 'localhost', port: int = 5000) -> None:
         """Run the Flask application."""
+        import webbrowser
+        
         # Open browser for authentication
         threading.Timer(1.25, lambda: webbrowser.open(f'http://{host}:{port}')).start()
         self.app.run(host=host, port=port)
     
+    def start_fetcher(self) -> bool:
+        """Run the image fetcher with the configured backend.
+        
+        With ``profile`` set the run is profiled, and with ``trace`` its
+        spans are exported; both files are written to the output directory.
+        
+        Returns:
+            Whether the crawl completed
+        """
+        self.tracer.reset()
+        profiler = create_profiler(self.config)
+        if profiler:
+            profiler.start()
+        try:
+            return self._run_fetcher()
+        finally:
+            if profiler:
+                self._write_diagnostic("profile", profile_path(self.config), profiler.stop)
+            if self.tracer.enabled:
+                self._write_diagnostic("trace", self.trace_path(), self.tracer.export)
+                totals = sorted(self.tracer.totals().items(), key=lambda item: -item[1]["seconds"])
+                for name, total in totals[:10]:
+                    logger.info(f"Span {name}: {total['count']} spans, {total['seconds']:.2f}s in total")
+    
+    def trace_path(self) -> str:
+        """Where the Chrome trace of a run is written."""
+        return self.config.get("trace_file") or os.path.join(
+            self.config.get("output_dir") or "downloaded_images", "trace.json"
+        )
+    
+    def _write_diagnostic(self, kind: str, path: str, write: Callable[[str], None]) -> None:
+        """Write a profile or trace file, reporting instead of raising errors."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            write(path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Could not write the {kind} to {path}: {e}")
+            return
+        self.add_progress(f"Wrote the {kind} to: {path}")
+    
+    def _run_fetcher(self) -> bool:
+        """Run the crawl with the configured backend, reporting errors as progress."""
+        try:
+            self.add_progress("Starting image fetcher...")
+            # Import here to avoid circular import
+            if self.config.get("fetch_backend") == "async":
+                from ..onenote.async_fetcher import run_async_fetcher
+                return run_async_fetcher(self)
+            else:
+                from ..onenote.fetcher import OneNoteImageFetcher
+                fetcher = OneNoteImageFetcher(self)
+                return fetcher.start()
+        except Exception as e:
+            self.add_progress(f"Error starting image fetcher: {str(e)}")
+            logger.exception("Full traceback:")
+            return False
+    
     def index(self) -> str:
         """Handle the index route."""
         token = self.token_cache.get_token()
         if token:
             # Start the image fetcher in a separate thread
-            def start_fetcher():
-                try:
-                    self.add_progress("Starting image fetcher...")
-                    # Import here to avoid circular import
-                    from ..onenote.fetcher import OneNoteImageFetcher
-                    fetcher = OneNoteImageFetcher(self)
-                    fetcher.start()
-                except Exception as e:
-                    self.add_progress(f"Error starting image fetcher: {str(e)}")
-                    logger.exception("Full traceback:")
-            
-            threading.Thread(target=start_fetcher).start()
+            threading.Thread(target=self.start_fetcher).start()
             
             return """
             <!DOCTYPE html>
@@ -172,8 +428,12 @@ class GraphAPIClient:
                         
                         eventSource.onmessage = function(e) {
                             const data = JSON.parse(e.data);
+                            const lastDiv = progressDiv.lastElementChild;
                             
-                            if (data.type === 'prompt') {
+                            if (data.key && lastDiv && lastDiv.dataset.key === data.key) {
+                                // A newer state of the previous line
+                                lastDiv.textContent = data.message;
+                            } else if (data.type === 'prompt') {
                                 // Create prompt container
                                 const promptDiv = document.createElement('div');
                                 promptDiv.className = 'prompt';
@@ -221,6 +481,9 @@ class GraphAPIClient:
                                     messageDiv.className += ' success';
                                 }
                                 messageDiv.textContent = data.message;
+                                if (data.key) {
+                                    messageDiv.dataset.key = data.key;
+                                }
                                 progressDiv.appendChild(messageDiv);
                             }
                             
@@ -228,39 +491,68 @@ class GraphAPIClient:
                         };
                         
                         eventSource.onerror = function(e) {
-                            console.error('EventSource failed:', e);
-                            eventSource.close();
+                            // The browser reconnects and resumes from the last event id
+                            console.error('EventSource failed, reconnecting:', e);
                         };
                     </script>
                 </body>
             </html>
             """
         
+        # Open connections to Graph while the user is in the OAuth redirect
+        self.transport.prewarm(self.graph_root, self.config.get("http_prewarm_connections"))
+        
         auth_url = self.msal_app.get_authorization_request_url(
             self.config["scopes"],
             redirect_uri=self.config["redirect_uri"]
         )
         return f'<a href="{auth_url}">Click here to authenticate</a>'
     
-    def progress(self) -> Response:
-        """Stream progress updates to the browser."""
+    def progress(self) -> "Response":
+        """Stream progress updates to the browser.
+        
+        Every event carries an id, so a reconnecting ``EventSource`` resumes
+        after the last message it received via ``Last-Event-ID``.
+        """
+        from flask import Response, request, stream_with_context
+        
+        try:
+            last_id = int(request.headers.get("Last-Event-ID") or request.args.get("lastEventId") or 0)
+        except ValueError:
+            last_id = 0
+        
         def generate():
-            last_index = 0
-            while True:
-                if last_index < len(self.progress_messages):
-                    for message in self.progress_messages[last_index:]:
-                        yield f"data: {json.dumps(message)}\n\n"
-                    last_index = len(self.progress_messages)
-                time.sleep(0.1)
+            yield "retry: 2000\n\n"
+            subscription = self.progress_bus.subscribe(last_id)
+            try:
+                for event in subscription:
+                    if event is None:
+                        # Keep-alive; fails once the browser is gone, which ends the stream
+                        yield ": keep-alive\n\n"
+                    else:
+                        yield f"id: {event.id}\ndata: {json.dumps(event.data)}\n\n"
+            finally:
+                subscription.close()
         
         return Response(stream_with_context(generate()), mimetype='text/event-stream')
     
+    def serve_metrics(self) -> "Response":
+        """Expose the metrics in the Prometheus text format."""
+        from flask import Response
+        
+        return Response(self.metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+    
     def get_token(self) -> str:
         """Handle the OAuth callback and get the access token."""
+        from flask import request
+        
         auth_code = request.args.get('code')
         if not auth_code:
             return "No authorization code received"
         
+        # Warm the pool again in case idle connections were dropped during sign-in
+        self.transport.prewarm(self.graph_root, self.config.get("http_prewarm_connections"))
+        
         try:
             self.add_progress("Acquiring access token...")
             result = self.msal_app.acquire_token_by_authorization_code(
@@ -270,26 +562,11 @@ class GraphAPIClient:
             )
             
             if "access_token" in result:
-                self.token_cache.set_token({
-                    'token': result['access_token'],
-                    'expires_at': result['expires_in'],
-                    'refresh_token': result.get('refresh_token')
-                })
+                self.token_provider.store(result)
                 self.add_progress("Access token acquired successfully!")
                 
                 # Start the image fetcher in a separate thread
-                def start_fetcher():
-                    try:
-                        self.add_progress("Starting image fetcher...")
-                        # Import here to avoid circular import
-                        from ..onenote.fetcher import OneNoteImageFetcher
-                        fetcher = OneNoteImageFetcher(self)
-                        fetcher.start()
-                    except Exception as e:
-                        self.add_progress(f"Error starting image fetcher: {str(e)}")
-                        logger.exception("Full traceback:")
-                
-                threading.Thread(target=start_fetcher).start()
+                threading.Thread(target=self.start_fetcher).start()
                 
                 return """
                 <!DOCTYPE html>
@@ -384,72 +661,170 @@ class GraphAPIClient:
             self.add_progress(f"Error in error handling process: {str(e)}")
             logger.exception("Full traceback:")
     
-    def call_graph_api(self, endpoint: str, method: str = "GET", **kwargs) -> Dict:
+    def refresh_access_token(self, rejected: str, endpoint: str, method: str) -> str:
+        """Renew an access token that Graph rejected.
+        
+        Args:
+            rejected: The access token that was rejected
+            endpoint: Endpoint of the rejected call, for error reporting
+            method: HTTP method of the rejected call, for error reporting
+            
+        Returns:
+            The new access token
+        """
+        self.add_progress("Token rejected, attempting to refresh...")
+        try:
+            access_token = self.token_provider.refresh(rejected)
+        except TokenRefreshError as error:
+            self.handle_error(error, {
+                'endpoint': endpoint,
+                'method': method,
+                'status_code': 401,
+                'response': error.result
+            })
+            raise
+        
+        self.add_progress("Token refresh successful")
+        return access_token
+    
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the rate limiter, retrying throttled responses.
+        
+        A ``Retry-After`` header pauses every request of the same endpoint
+        family; without one the request backs off exponentially with jitter.
+        """
+        max_retries = self.config.get("throttle_max_retries", 5)
+        
+        for attempt in range(max_retries + 1):
+            with self.tracer.span("http.request", "http", attempt=attempt) as span:
+                queued = time.monotonic()
+                with self.rate_limiter.slot(url):
+                    started = time.monotonic()
+                    observe_wait(self.metrics, url, started - queued)
+                    response = self.transport.request(method, url, **kwargs)
+                    elapsed = time.monotonic() - started
+                    retry_after = response.headers.get("Retry-After")
+                    self.rate_limiter.record(url, response.status_code, elapsed, retry_after)
+                span.set(status=response.status_code, wait_ms=round((started - queued) * 1000, 3))
+            observe_request(self.metrics, method, url, response.status_code, elapsed,
+                            self._response_size(response, kwargs.get("stream", False)), self.base_url)
+            
+            if response.status_code not in THROTTLE_STATUSES or attempt == max_retries:
+                return response
+            
+            observe_retry(self.metrics, url, "throttled", self.base_url)
+            self.add_progress(f"Throttled by Graph (status {response.status_code}), retrying...")
+            if parse_retry_after(retry_after) is None:
+                time.sleep(self.rate_limiter.backoff(attempt))
+            response.close()
+        
+        return response
+    
+    @staticmethod
+    def _response_size(response: requests.Response, streamed: bool) -> Optional[int]:
+        """Body size from ``Content-Length``, or of the read body; unknown for chunked streams."""
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit():
+            return int(length)
+        if streamed:
+            return None
+        return len(response.content)
+    
+    def _build_url(self, endpoint: str) -> str:
+        """Resolve an endpoint against the Graph base URL."""
+        if endpoint.startswith(("http://", "https://")):
+            return endpoint
+        return f"{self.base_url}/{endpoint}"
+    
+    def call_graph_api(self, endpoint: str, method: str = "GET", response_type: str = "json", **kwargs) -> Any:
         """Make a call to the Microsoft Graph API.
         
         Args:
-            endpoint: The API endpoint to call
+            endpoint: The API endpoint to call, relative to the Graph base URL
+                or an absolute URL such as an ``@odata.nextLink``
             method: HTTP method to use
+            response_type: ``json`` (default), ``text``, ``bytes`` or
+                ``stream``
             **kwargs: Additional arguments to pass to requests
             
         Returns:
-            The API response as a dictionary
+            For ``json`` the response as a dictionary, or as text for non-JSON
+            responses such as page content; for ``text`` and ``bytes`` the
+            body as is; for ``stream`` the open ``requests.Response``, whose
+            body has not been read yet (use ``iter_content`` or ``raw`` and
+            close it, e.g. with a ``with`` block)
         """
-        token = self.token_cache.get_token()
-        if not token:
-            raise ValueError("No access token available")
+        if response_type not in RESPONSE_TYPES:
+            raise ValueError(f"Unknown response type: {response_type}")
         
+        if not self.tracer.enabled:
+            return self._call_graph_api(endpoint, method, response_type, **kwargs)
+        url = self._build_url(endpoint)
+        with self.tracer.span(f"graph.{endpoint_family(url)}", "graph", method=method,
+                              endpoint=endpoint_template(url, self.base_url), response_type=response_type):
+            return self._call_graph_api(endpoint, method, response_type, **kwargs)
+    
+    def _call_graph_api(self, endpoint: str, method: str, response_type: str, **kwargs) -> Any:
+        """``call_graph_api`` without the tracing span."""
+        access_token = self.token_provider.get_access_token()
         headers = {
-            "Authorization": f"Bearer {token['token']}",
+            "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json"
         }
+        url = self._build_url(endpoint)
+        if response_type == "stream":
+            kwargs["stream"] = True
+        
+        # Plain GETs are served from or revalidated against the response cache
+        cached = None
+        cacheable = (self.response_cache is not None and method == "GET" and not kwargs
+                     and response_type in ("json", "text"))
+        if cacheable:
+            cached = self.response_cache.lookup(url, response_type)
+            if cached and self.response_cache.is_fresh(cached):
+                return cached.body
+            if cached:
+                headers.update(cached.conditional_headers())
         
         try:
             # Make the API call
-            self.add_progress(f"Making API call to: {endpoint}")
-            response = requests.request(
+            self.add_progress(f"Making API call to: {endpoint}", coalesce_key="api_call")
+            response = self._send(
                 method,
-                f"https://graph.microsoft.com/v1.0/{endpoint}",
+                url,
                 headers=headers,
                 **kwargs
             )
             
             if response.status_code == 401:
-                # Token expired, try to refresh
-                self.add_progress("Token expired, attempting to refresh...")
-                result = self.msal_app.acquire_token_by_refresh_token(
-                    token['refresh_token'],
-                    scopes=self.config["scopes"]
+                # Token revoked or expired early, refresh and retry the request with the new token
+                response.close()
+                access_token = self.refresh_access_token(access_token, endpoint, method)
+                observe_retry(self.metrics, url, "unauthorized", self.base_url)
+                headers["Authorization"] = f"Bearer {access_token}"
+                response = self._send(
+                    method,
+                    url,
+                    headers=headers,
+                    **kwargs
                 )
-                
-                if "access_token" in result:
-                    self.add_progress("Token refresh successful")
-                    self.token_cache.set_token({
-                        'token': result['access_token'],
-                        'expires_at': result['expires_in'],
-                        'refresh_token': result.get('refresh_token')
-                    })
-                    
-                    # Retry the request with new token
-                    headers["Authorization"] = f"Bearer {result['access_token']}"
-                    response = requests.request(
-                        method,
-                        f"https://graph.microsoft.com/v1.0/{endpoint}",
-                        headers=headers,
-                        **kwargs
-                    )
-                else:
-                    error = ValueError("Failed to refresh token")
-                    self.handle_error(error, {
-                        'endpoint': endpoint,
-                        'method': method,
-                        'status_code': 401,
-                        'response': result
-                    })
-                    raise error
+            
+            if cached and response.status_code == 304:
+                return self.response_cache.revalidated(cached)
             
             response.raise_for_status()
-            return response.json()
+            if response_type == "stream":
+                return response
+            if response_type == "bytes":
+                return response.content
+            if response_type == "text" or "json" not in response.headers.get("Content-Type", "application/json"):
+                body = response.text
+            else:
+                body = response.json()
+            
+            if cacheable and response.status_code == 200:
+                self.response_cache.store(url, body, response.headers, response_type)
+            return body
             
         except requests.exceptions.RequestException as e:
             self.handle_error(e, {
@@ -458,8 +833,131 @@ class GraphAPIClient:
                 'status_code': getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None,
                 'response_text': getattr(e.response, 'text', None) if hasattr(e, 'response') else None
             })
+            if response_type == "stream" and getattr(e, 'response', None) is not None:
+                e.response.close()
             raise 
     
+    def call_graph_api_batched(self, endpoint: str) -> Any:
+        """Make a GET call that may share a $batch request with concurrent callers.
+        
+        Args:
+            endpoint: The API endpoint to call
+            
+        Returns:
+            The decoded response body
+        """
+        if not self.config.get("graph_batching", True):
+            return self.call_graph_api(endpoint)
+        
+        if not self.tracer.enabled:
+            return self._call_graph_api_batched(endpoint)
+        url = self._build_url(endpoint)
+        with self.tracer.span(f"graph.{endpoint_family(url)}", "graph", method="GET",
+                              endpoint=endpoint_template(url, self.base_url), batched=True):
+            return self._call_graph_api_batched(endpoint)
+    
+    def _call_graph_api_batched(self, endpoint: str) -> Any:
+        """``call_graph_api_batched`` without the tracing span."""
+        headers = None
+        if self.response_cache:
+            cached = self.response_cache.lookup(self._build_url(endpoint))
+            if cached and self.response_cache.is_fresh(cached):
+                return cached.body
+            headers = cached.conditional_headers() if cached else None
+        return self.batcher.submit(endpoint, headers=headers).result()
+    
+    def _on_batch_response(self, request: BatchRequest, status: int, headers: Dict[str, str], body: Any) -> Any:
+        """Keep the response cache in step with batched GETs.
+        
+        A 304 sub-response resolves to the cached body; a 200 is stored.
+        """
+        if request.method != "GET":
+            return body
+        
+        url = self._build_url(request.endpoint)
+        if status == 304:
+            cached = self.response_cache.lookup(url)
+            if cached is None:
+                raise GraphBatchError(request.endpoint, status, body)
+            return self.response_cache.revalidated(cached)
+        if status == 200:
+            self.response_cache.store(url, body, headers)
+        return body
+    
+    def call_graph_api_many(self, requests: List[Union[str, BatchRequest]]) -> List[Future]:
+        """Send several requests in as few $batch calls as possible.
+        
+        Args:
+            requests: Endpoints to GET, or ``BatchRequest`` objects for other
+                methods and dependencies
+            
+        Returns:
+            One future per request, resolving to its decoded response body
+        """
+        batch_requests = [
+            BatchRequest(request) if isinstance(request, str) else request
+            for request in requests
+        ]
+        
+        if self.response_cache and self.config.get("graph_batching", True):
+            # Revalidate GETs we have a copy of; a 304 resolves to the cached body. The
+            # request is copied so the caller's object never carries the validators
+            for index, request in enumerate(batch_requests):
+                if request.method == "GET" and not request.headers:
+                    cached = self.response_cache.lookup(self._build_url(request.endpoint))
+                    if cached:
+                        batch_requests[index] = replace(request, headers=cached.conditional_headers() or None)
+        
+        if self.config.get("graph_batching", True):
+            return self.batcher.submit_many(batch_requests)
+        
+        futures = []
+        for request in batch_requests:
+            future = Future()
+            try:
+                future.set_result(self.call_graph_api(request.endpoint, method=request.method))
+            except Exception as e:
+                future.set_exception(e)
+            futures.append(future)
+        return futures
+    
+    def download(self, url: str, authenticated: bool = False, **kwargs) -> requests.Response:
+        """Download a resource over the shared connection pool.
+        
+        Args:
+            url: Absolute URL of the resource
+            authenticated: Send the Graph access token, e.g. for
+                ``/resources/{id}/$value`` URLs
+            **kwargs: Additional arguments to pass to requests
+            
+        Returns:
+            The raw HTTP response
+        """
+        if not self.tracer.enabled:
+            return self._download(url, authenticated, **kwargs)
+        with self.tracer.span("download", "download", host=endpoint_template(url, self.base_url),
+                              authenticated=authenticated):
+            return self._download(url, authenticated, **kwargs)
+    
+    def _download(self, url: str, authenticated: bool, **kwargs) -> requests.Response:
+        """``download`` without the tracing span."""
+        if not authenticated:
+            return self._send("GET", url, **kwargs)
+        
+        access_token = self.token_provider.get_access_token()
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers["Authorization"] = f"Bearer {access_token}"
+        response = self._send("GET", url, headers=headers, **kwargs)
+        
+        if response.status_code == 401:
+            response.close()
+            access_token = self.refresh_access_token(access_token, url, "GET")
+            observe_retry(self.metrics, url, "unauthorized", self.base_url)
+            headers["Authorization"] = f"Bearer {access_token}"
+            response = self._send("GET", url, headers=headers, **kwargs)
+        
+        return response
+    
     def handle_option(self, option: str) -> None:
         """Handle user option selection."""
         self.add_progress(f"User selected: {option}")
@@ -0,0 +1,231 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from ..utils.token_cache import TokenCache
+
+logger = logging.getLogger(__name__)
+
+# Tokens closer to expiry than this are never sent; callers wait for a new one
+MIN_TOKEN_LIFETIME = 30.0
+
+# Seconds after a failed background refresh before the next one is started
+BACKGROUND_RETRY_INTERVAL = 30.0
+
+# Scopes of app-only (client credentials) tokens: the application permissions granted to the app
+APP_SCOPES = ["https://graph.microsoft.com/.default"]
+
+class TokenRefreshError(ValueError):
+    """Raised when no access token could be acquired."""
+
+    def __init__(self, message: str, result: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.result = result or {}
+
+class TokenProvider:
+    """Hands out access tokens and renews them before they expire.
+
+    A token entering the last ``refresh_skew`` seconds of its lifetime is
+    renewed in the background while callers keep using it; only a token
+    about to expire (``MIN_TOKEN_LIFETIME``) makes callers wait. However many
+    threads ask at once, exactly one refresh runs and the others wait on its
+    result (single-flight). After a failed background refresh the next one
+    starts ``retry_interval`` seconds later at the earliest.
+
+    Renewal goes through MSAL's ``acquire_token_silent`` against a
+    ``SerializableTokenCache`` that is persisted atomically in the
+    ``TokenCache`` file, falling back to the stored refresh token. With
+    ``client_credentials`` tokens are app-only and acquired with the client
+    secret instead.
+    """
+
+    def __init__(self, msal_app_factory: Callable[[], Any], token_cache: TokenCache, scopes: List[str],
+                 refresh_skew: float = 300.0, client_credentials: bool = False,
+                 retry_interval: float = BACKGROUND_RETRY_INTERVAL):
+        """Initialize the provider.
+
+        Args:
+            msal_app_factory: Returns the MSAL client application, created
+                with ``load_msal_cache`` as its ``token_cache``; only called
+                once a token has to be acquired
+            token_cache: Storage of the access token and the MSAL cache
+            scopes: Scopes to request
+            refresh_skew: Seconds before expiry at which tokens are renewed
+            client_credentials: Acquire app-only tokens with the client secret
+            retry_interval: Seconds after a failed background refresh before
+                another one is started
+        """
+        self.msal_app_factory = msal_app_factory
+        self.client_credentials = client_credentials
+        self.token_cache = token_cache
+        self.scopes = scopes
+        self.refresh_skew = refresh_skew
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._in_flight: Optional[Future] = None
+        self._failed_at: Optional[float] = None
+        self.refreshes = 0
+
+    @property
+    def msal_app(self) -> Any:
+        """The MSAL client application."""
+        return self.msal_app_factory()
+
+    @staticmethod
+    def load_msal_cache(token_cache: TokenCache) -> Any:
+        """The MSAL ``SerializableTokenCache`` persisted in ``token_cache``, or an empty one."""
+        import msal
+
+        msal_cache = msal.SerializableTokenCache()
+        serialized = token_cache.get_msal_cache()
+        if serialized:
+            try:
+                msal_cache.deserialize(serialized)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable MSAL token cache: {e}")
+        return msal_cache
+
+    def persist(self) -> None:
+        """Save the MSAL cache if acquiring a token changed it."""
+        msal_cache = getattr(self.msal_app, "token_cache", None)
+        if getattr(msal_cache, "has_state_changed", False):
+            self.token_cache.set_msal_cache(msal_cache.serialize())
+            msal_cache.has_state_changed = False
+
+    def store(self, result: Dict[str, Any]) -> str:
+        """Store the token of an MSAL result and return it.
+
+        Raises:
+            TokenRefreshError: If the result holds no access token
+        """
+        if "access_token" not in result:
+            raise TokenRefreshError(
+                result.get("error_description") or result.get("error") or "Failed to acquire token",
+                result
+            )
+
+        previous = self.token_cache.get_token() or {}
+        self.token_cache.set_token({
+            'token': result['access_token'],
+            'expires_at': time.time() + float(result.get('expires_in', 0)),
+            'refresh_token': result.get('refresh_token') or previous.get('refresh_token')
+        })
+        self.persist()
+        return result['access_token']
+
+    def use_refresh_token(self, refresh_token: str) -> None:
+        """Replace the stored token with a refresh token to redeem on next use."""
+        self.token_cache.set_token({
+            'token': None,
+            'expires_at': 0,
+            'refresh_token': refresh_token
+        })
+
+    def get_access_token(self) -> str:
+        """Return an access token that is valid for at least ``MIN_TOKEN_LIFETIME``.
+
+        Raises:
+            TokenRefreshError: If there is no token and none can be acquired
+        """
+        token = self.token_cache.get_token()
+        remaining = self.token_cache.expires_in()
+
+        if token and token['token'] and remaining > self.refresh_skew:
+            return token['token']
+        if token and token['token'] and remaining > MIN_TOKEN_LIFETIME:
+            # Still usable: renew in the background and keep going
+            if not self._backing_off():
+                self._start_refresh(token['token'], wait=False)
+            return token['token']
+        return self._start_refresh(token['token'] if token else None, wait=True)
+
+    def _backing_off(self) -> bool:
+        """Whether the last refresh failed less than ``retry_interval`` seconds ago."""
+        with self._lock:
+            failed_at = self._failed_at
+        return failed_at is not None and time.monotonic() - failed_at < self.retry_interval
+
+    def refresh(self, rejected: Optional[str] = None) -> str:
+        """Renew the token after Graph rejected ``rejected``.
+
+        If another thread already replaced the rejected token, its
+        replacement is returned without a new refresh.
+        """
+        return self._start_refresh(rejected, wait=True, force=True)
+
+    def _start_refresh(self, stale: Optional[str], wait: bool, force: bool = False) -> Optional[str]:
+        """Join the running refresh or start one, then optionally wait for it."""
+        with self._lock:
+            current = self.token_cache.get_token()
+            if (current and current['token'] and current['token'] != stale
+                    and self.token_cache.expires_in() > MIN_TOKEN_LIFETIME):
+                # Someone else renewed it meanwhile
+                return current['token']
+
+            future = self._in_flight
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight = future
+
+        if owner:
+            if wait:
+                self._run_refresh(future, stale, force)
+            else:
+                threading.Thread(
+                    target=self._run_refresh, args=(future, stale, force),
+                    name="token-refresh", daemon=True
+                ).start()
+
+        if not wait:
+            return None
+        return future.result()
+
+    def _run_refresh(self, future: Future, stale: Optional[str], force: bool) -> None:
+        """Acquire a new token and resolve ``future`` with it."""
+        try:
+            access_token = self._acquire(stale, force)
+        except BaseException as e:
+            logger.warning(f"Token refresh failed: {e}")
+            with self._lock:
+                self._in_flight = None
+                self._failed_at = time.monotonic()
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self.refreshes += 1
+            self._in_flight = None
+            self._failed_at = None
+        future.set_result(access_token)
+
+    def _acquire(self, stale: Optional[str], force: bool) -> str:
+        """Renew silently through MSAL, falling back to the stored refresh token."""
+        if self.client_credentials:
+            # MSAL serves app tokens from its cache until they expire
+            result = self.msal_app.acquire_token_for_client(scopes=self.scopes)
+            return self.store(result)
+
+        result = None
+        accounts = self.msal_app.get_accounts()
+        if accounts:
+            # A stale token may still be the one MSAL has cached; skip it
+            result = self.msal_app.acquire_token_silent(
+                self.scopes,
+                account=accounts[0],
+                force_refresh=force or stale is not None
+            )
+
+        if not result or "access_token" not in result:
+            token = self.token_cache.get_token() or {}
+            if not token.get('refresh_token'):
+                raise TokenRefreshError("No access token available", result)
+            result = self.msal_app.acquire_token_by_refresh_token(
+                token['refresh_token'],
+                scopes=self.scopes
+            )
+
+        logger.debug("Access token renewed")
+        return self.store(result)
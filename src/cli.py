@@ -0,0 +1,174 @@
+import argparse
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Metrics summary of a headless run, in the output directory unless METRICS_FILE is set
+METRICS_FILENAME = "metrics.json"
+
+# Exit codes of headless runs
+EXIT_OK = 0
+EXIT_CRAWL_FAILED = 1
+EXIT_AUTH_FAILED = 2
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command line options; unset options fall back to the environment (see README)."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Fetch images from OneNote notebooks. Without --headless the browser "
+                    "sign-in flow is started."
+    )
+    parser.add_argument("--headless", action="store_true",
+                        help="Crawl without the web server and browser, e.g. from cron or a container")
+    parser.add_argument("--notebook", help="Display name of the notebook to crawl (NOTEBOOK_NAME)")
+    parser.add_argument("--site-id", help="SharePoint site of the page previews (SITE_ID)")
+    parser.add_argument("--onenote-root",
+                        help="Graph path holding the notebooks: me/onenote, users/{id}/onenote or "
+                             "sites/{id}/onenote (ONENOTE_ROOT)")
+    parser.add_argument("--output-dir", help="Directory the images are written to (OUTPUT_DIR)")
+    parser.add_argument("--auth", choices=("refresh-token", "client-credentials"),
+                        help="How headless runs authenticate: a refresh token from --refresh-token, "
+                             "REFRESH_TOKEN or the token cache, or the app's client secret (AUTH_MODE)")
+    parser.add_argument("--refresh-token", help="Refresh token to redeem instead of the cached one")
+    parser.add_argument("--backend", choices=("sync", "async"), help="Crawl backend (FETCH_BACKEND)")
+    parser.add_argument("--targets",
+                        help="JSON file of notebooks and accounts to crawl with a pool of worker processes")
+    parser.add_argument("--queue",
+                        help="Shared queue directory or *.db file; without --targets, join the crawl "
+                             "another node queued")
+    parser.add_argument("--workers", type=int, help="Worker processes of a --targets/--queue crawl (CRAWL_WORKERS)")
+    parser.add_argument("--shard-size", type=int, help="Targets per shard (CRAWL_SHARD_SIZE)")
+    parser.add_argument("--rate-share", type=float,
+                        help="Fraction of each account's request budget this node's workers use together; "
+                             "with N nodes on one --queue, about 1/N (CRAWL_RATE_SHARE)")
+    parser.add_argument("--metrics-file",
+                        help="Where a headless run writes its JSON metrics summary (METRICS_FILE, "
+                             "default: metrics.json in the output directory)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record spans of the crawl and write them as a Chrome trace to trace.json in the "
+                             "output directory (TRACE, TRACE_FILE)")
+    parser.add_argument("--profile", choices=("cprofile", "sample"),
+                        help="Profile the crawl with cProfile or a sampling profiler and write the result to the "
+                             "output directory (PROFILE, PROFILE_FILE)")
+    parser.add_argument("--report", help="Write the merged JSON run report of a --targets/--queue crawl here")
+    parser.add_argument("--host", default="localhost", help="Host of the web server")
+    parser.add_argument("--port", type=int, default=5000, help="Port of the web server")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    return parser
+
+def apply_arguments(config: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Override configuration values with the options given on the command line."""
+    overrides = {
+        "notebook_name": args.notebook,
+        "site_id": args.site_id,
+        "onenote_root": args.onenote_root.strip("/") if args.onenote_root else None,
+        "output_dir": args.output_dir,
+        "auth_mode": args.auth.replace("-", "_") if args.auth else None,
+        "fetch_backend": args.backend,
+        "metrics_file": args.metrics_file,
+        "trace": True if args.trace else None,
+        "profile": args.profile
+    }
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    return config
+
+def run_headless(client: Any, refresh_token: Optional[str] = None) -> int:
+    """Authenticate without a browser and run one crawl.
+
+    Args:
+        client: A ``GraphAPIClient``
+        refresh_token: Refresh token to redeem instead of the cached token
+
+    Returns:
+        The process exit code
+    """
+    config = client.config
+    if config.get("auth_mode") == "client_credentials" and config.get("onenote_root", "").startswith("me/"):
+        logger.error("App-only tokens have no signed-in user; pass --onenote-root "
+                     "users/{id}/onenote or sites/{id}/onenote")
+        return EXIT_AUTH_FAILED
+
+    import requests
+
+    try:
+        if refresh_token:
+            client.token_provider.use_refresh_token(refresh_token)
+        client.token_provider.get_access_token()
+    except ValueError as e:
+        logger.error(f"Authentication failed: {e}")
+        return EXIT_AUTH_FAILED
+    except requests.RequestException as e:
+        logger.error(f"Authentication failed, the token endpoint could not be reached: {e}")
+        return EXIT_AUTH_FAILED
+    except Exception:
+        # MSAL raises its own errors for e.g. a broken authority or token cache
+        logger.exception("Authentication failed")
+        return EXIT_AUTH_FAILED
+
+    try:
+        return EXIT_OK if client.start_fetcher() else EXIT_CRAWL_FAILED
+    finally:
+        write_metrics_summary(client)
+
+def write_metrics_summary(client: Any) -> None:
+    """Write the client's metrics as JSON, for sizing concurrency from real runs."""
+    config = client.config
+    path = config.get("metrics_file") or os.path.join(config.get("output_dir") or "downloaded_images",
+                                                      METRICS_FILENAME)
+    try:
+        client.metrics.write_summary(path)
+    except OSError as e:
+        logger.error(f"Could not write the metrics summary to {path}: {e}")
+        return
+    logger.info(f"Metrics summary written to {path}")
+
+def run_coordinated(config: Dict[str, Any], args: argparse.Namespace) -> int:
+    """Crawl the targets of a plan file, or join a shared queue, with a process pool.
+
+    Returns:
+        The process exit code
+    """
+    from .onenote.coordinator import CrawlCoordinator, CrawlPlan, load_plan
+
+    coordinator = CrawlCoordinator(
+        config,
+        load_plan(args.targets) if args.targets else CrawlPlan(targets=[]),
+        workers=args.workers or config.get("crawl_workers", 4),
+        shard_size=args.shard_size or config.get("crawl_shard_size", 4),
+        queue_location=args.queue,
+        rate_share=args.rate_share or config.get("crawl_rate_share", 1.0)
+    )
+    report = coordinator.run() if args.targets else coordinator.join()
+
+    summary = report.summary()
+    logger.info(f"Crawled {summary['totals'].get('targets', 0)} targets in {summary['seconds']:.1f}s: "
+                f"{summary['totals'].get('images', 0)} images, {summary['totals'].get('failed', 0)} failed targets")
+    for failed in summary["failed_targets"]:
+        logger.error(f"Failed: {failed['target_id']} {failed['error'] or ''}".rstrip())
+    if args.report:
+        report.write(args.report)
+
+    return EXIT_OK if report.ok else EXIT_CRAWL_FAILED
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse the command line and run the web flow or a headless crawl."""
+    args = build_parser().parse_args(argv)
+    logging.getLogger().setLevel(args.log_level.upper())
+
+    # Imported after parsing so --help stays fast
+    from .auth.graph_client import GraphAPIClient, load_config
+
+    config = apply_arguments(load_config(), args)
+    if args.targets or args.queue:
+        # Workers create one client per account themselves
+        return run_coordinated(config, args)
+
+    client = GraphAPIClient(config)
+
+    if not args.headless:
+        client.run(host=args.host, port=args.port)
+        return EXIT_OK
+
+    return run_headless(client, args.refresh_token or os.getenv("REFRESH_TOKEN"))
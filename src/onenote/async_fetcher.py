@@ -0,0 +1,298 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from ..auth.async_graph_client import AsyncGraphAPIClient
+from ..utils.atomic_writer import AtomicFileWriter
+from ..utils.tracing import trace_span
+from .fetcher import AsyncGraphAPIInterface, OneNoteImageFetcher, PageTask
+from .hierarchy import HierarchyLoader, NotebookTree
+from .models import Notebook, Section, Page
+from .pagination import aiter_graph_collection
+
+logger = logging.getLogger(__name__)
+
+class AsyncOneNoteImageFetcher(OneNoteImageFetcher):
+    """Asyncio version of the crawl loop.
+
+    Pages of all sections are processed concurrently, with at most
+    ``max_concurrency`` preview lookups and downloads in flight at once.
+    Output layout and error reporting match ``OneNoteImageFetcher.start``.
+    Disk writes, journal and manifest updates and the error analysis block,
+    so they run in the loop's default executor.
+    """
+
+    def __init__(self, graph_client: AsyncGraphAPIInterface, openai_api_key: Optional[str] = None,
+                 max_concurrency: int = 100, overrides: Optional[Dict[str, Any]] = None):
+        """Initialize the async image fetcher."""
+        super().__init__(graph_client, openai_api_key, overrides=overrides)
+        self.max_concurrency = max_concurrency
+
+    @staticmethod
+    async def _off_loop(function: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking work in the default executor so the event loop keeps serving other pages."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, function, *args)
+
+    async def _handle_error_async(self, error_type: str, error_context: Dict[str, Any]) -> None:
+        """Run the (blocking) error analysis without stalling the event loop."""
+        await self._off_loop(self._handle_error, error_type, error_context)
+
+    async def aiter_notebooks(self) -> AsyncIterator[Notebook]:
+        """Yield OneNote notebooks as each page of the listing arrives."""
+        async for notebook in aiter_graph_collection(self.graph_client, self.notebooks_endpoint()):
+            yield self._notebook_from_api(notebook)
+
+    async def aiter_sections(self, notebook_id: str) -> AsyncIterator[Section]:
+        """Yield the sections of a notebook as each page of the listing arrives."""
+        async for section in aiter_graph_collection(self.graph_client, self.sections_endpoint(notebook_id)):
+            yield self._section_from_api(section, notebook_id)
+
+    async def aiter_pages(self, section_id: str) -> AsyncIterator[Page]:
+        """Yield the pages of a section as each page of the listing arrives."""
+        async for page in aiter_graph_collection(self.graph_client, self.pages_endpoint(section_id)):
+            yield self._page_from_api(page, section_id)
+
+    async def _aiter_section_pages(self, section: Section) -> AsyncIterator[Page]:
+        """Pages of a section, taken from the journal if an interrupted crawl listed it."""
+        if self.journal and await self._off_loop(self.journal.is_listed, section.id):
+            for page in await self._off_loop(self.journal.pages, section.id):
+                yield page
+            return
+
+        async for page in self.aiter_pages(section.id):
+            if self.journal:
+                await self._off_loop(self.journal.record_page, page)
+            yield page
+
+        if self.journal:
+            await self._off_loop(self.journal.mark_listed, section.id)
+
+    async def aload_hierarchy(self, refresh: bool = False) -> NotebookTree:
+        """Return the notebook hierarchy, loading it on first use."""
+        if self.hierarchy is None or refresh:
+            self.graph_client.add_progress("Loading notebook hierarchy...")
+            self.hierarchy = await HierarchyLoader(
+                self.graph_client, root=self.onenote_root, projection=self.projection
+            ).aload()
+            self._seed_metadata(self.hierarchy)
+        return self.hierarchy
+
+    async def start(self) -> bool:
+        """Start the image fetching process.
+
+        Returns:
+            Whether the crawl ran to completion
+        """
+        try:
+            self.graph_client.add_progress(f"Fetching notebook: {self.notebook_name}")
+
+            tree = await self.aload_hierarchy()
+            target_notebook = tree.find_notebook(self.notebook_name)
+
+            if not target_notebook:
+                await self._handle_error_async("notebook_not_found", {
+                    "notebook_name": self.notebook_name,
+                    "available_notebooks": [notebook.name for notebook in tree.notebooks.values()]
+                })
+                return False
+
+            self.graph_client.add_progress(f"Found notebook: {target_notebook.name}")
+            await self._off_loop(self._open_journal, tree.sections_in(target_notebook.id))
+
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            section_jobs = []
+            self._section_ids = []
+
+            for section in tree.sections_in(target_notebook.id):
+                self._section_ids.append(section.id)
+                self._count("sections")
+                section_jobs.append(asyncio.ensure_future(self._process_section(section, semaphore)))
+
+            if not section_jobs:
+                await self._handle_error_async("no_sections", {
+                    "notebook_id": target_notebook.id,
+                    "notebook_name": target_notebook.name
+                })
+                return False
+
+            await asyncio.gather(*section_jobs)
+
+            if self.manifest:
+                await self._off_loop(self._prune_deleted_sections, target_notebook)
+                if self.blob_store:
+                    await self._off_loop(self.blob_store.collect_garbage)
+
+            self.graph_client.add_progress(f"Processed {len(section_jobs)} sections.")
+            self.graph_client.add_progress("Finished processing all sections.")
+            if self.journal:
+                await self._off_loop(self.journal.finish)
+            return True
+
+        except Exception as e:
+            await self._handle_error_async("general_error", {
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "output_dir": self.output_dir
+            })
+            logger.exception("Full traceback:")
+            return False
+        finally:
+            await self._off_loop(self._save_state)
+
+    def _save_state(self) -> None:
+        """Commit the journal, manifest and blob index at the end of a crawl."""
+        self._close_journal()
+        if self.manifest:
+            self.manifest.save()
+        if self.blob_store:
+            self.blob_store.save()
+
+    async def _process_section(self, section: Section, semaphore: asyncio.Semaphore) -> None:
+        """List the pages of a section and schedule each one as soon as it is known."""
+        self.graph_client.add_progress(f"Processing section: {section.name}")
+        page_jobs = []
+        seen_page_ids = []
+        listed = False
+        finished = 0
+
+        try:
+            async for page in self._aiter_section_pages(section):
+                seen_page_ids.append(page.id)
+                self._count("pages")
+                if self.journal and await self._off_loop(self.journal.is_done, page.id):
+                    finished += 1
+                    continue
+                if self.manifest and self.manifest.is_unchanged(page):
+                    continue
+
+                # Waiting here keeps the listing from running far ahead of the downloads
+                await semaphore.acquire()
+                job = asyncio.ensure_future(self._process_page(PageTask(section=section, page=page)))
+                job.add_done_callback(self._page_done(semaphore))
+                page_jobs.append(job)
+            listed = True
+        except Exception as e:
+            await self._handle_error_async("processing_error", {
+                "section_id": section.id,
+                "section_name": section.name,
+                "stage": "listing",
+                "error": str(e),
+                "error_type": type(e).__name__
+            })
+
+        await asyncio.gather(*page_jobs)
+
+        if self.manifest and listed:
+            await self._off_loop(self._prune_deleted_pages, section, seen_page_ids)
+
+        if not seen_page_ids:
+            await self._handle_error_async("no_pages", {
+                "section_id": section.id,
+                "section_name": section.name
+            })
+            return
+
+        self.graph_client.add_progress(f"Found {len(seen_page_ids)} pages in section: {section.name}")
+        unchanged = len(seen_page_ids) - len(page_jobs) - finished
+        if unchanged:
+            self.graph_client.add_progress(f"Skipped {unchanged} unchanged pages in section: {section.name}")
+        if finished:
+            self.graph_client.add_progress(f"Skipped {finished} pages finished before the interruption in section: {section.name}")
+
+    def _page_done(self, semaphore: asyncio.Semaphore) -> Callable[[asyncio.Future], None]:
+        """Done callback of a page job: free its slot; tracks the pages in flight."""
+        depth = self.metrics.gauge("onenote_queue_depth", "Items waiting for a crawl stage") if self.metrics else None
+        if depth:
+            depth.inc(queue="pages")
+
+        def done(_: asyncio.Future) -> None:
+            semaphore.release()
+            if depth:
+                depth.inc(-1, queue="pages")
+        return done
+
+    async def _process_page(self, task: PageTask) -> None:
+        """Resolve, download and write the preview image of one page."""
+        page = task.page
+        self.graph_client.add_progress(f"Processing page: {page.title}")
+
+        try:
+            preview = await self.graph_client.call_graph_api(
+                f"sites/{self.site_id}/pages/{page.id}/preview"
+            )
+
+            if not preview.get('previewImageUrl'):
+                await self._handle_error_async("preview_error", {
+                    "page_id": page.id,
+                    "page_title": page.title,
+                    "api_response": preview
+                })
+                return
+
+            task.preview_url = preview['previewImageUrl']
+            self.graph_client.add_progress("Downloading preview image...")
+
+            async with self.graph_client.stream(task.preview_url) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    await self._handle_error_async("download_error", {
+                        "page_id": page.id,
+                        "page_title": page.title,
+                        "status_code": response.status_code,
+                        "response_text": response.text,
+                        "preview_url": task.preview_url
+                    })
+                    return
+
+                task.writer = await self._off_loop(AtomicFileWriter, self._preview_path(task), self.fsync_policy)
+                with trace_span(self.tracer, "write.preview", "disk") as span:
+                    async for chunk in response.aiter_bytes(self.chunk_size):
+                        await self._off_loop(task.writer.write, chunk)
+                    span.set(bytes=task.writer.size)
+
+            await self._off_loop(self._write_preview, task)
+
+        except Exception as e:
+            await self._off_loop(self._discard_writer, task)
+            await self._handle_error_async("processing_error", {
+                "page_id": page.id,
+                "page_title": page.title,
+                "error": str(e),
+                "error_type": type(e).__name__
+            })
+
+def run_async_fetcher(graph_client: Any, overrides: Optional[Dict[str, Any]] = None,
+                      stats: Optional[Counter] = None) -> bool:
+    """Run the async crawl loop for a synchronous ``GraphAPIClient``.
+
+    Args:
+        graph_client: The client holding the token cache and configuration
+        overrides: Configuration values for this crawl only, see
+            ``OneNoteImageFetcher`` (optional)
+        stats: Counter the crawl's statistics are added to (optional)
+
+    Returns:
+        Whether the crawl ran to completion
+    """
+    config = getattr(graph_client, "config", {})
+
+    async def main():
+        async with AsyncGraphAPIClient(
+            graph_client,
+            max_connections=config.get("async_max_connections", 10),
+            timeout=config.get("http_timeout", 30.0)
+        ) as client:
+            fetcher = AsyncOneNoteImageFetcher(
+                client,
+                max_concurrency=config.get("async_concurrency", 100),
+                overrides=overrides
+            )
+            try:
+                return await fetcher.start()
+            finally:
+                if stats is not None:
+                    stats.update(fetcher.stats)
+
+    return asyncio.run(main())
@@ -0,0 +1,406 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.atomic_writer import AtomicFileWriter
+from ..utils.work_queue import WorkQueue, open_queue, worker_name
+from .hierarchy import DEFAULT_ONENOTE_ROOT
+from .resources import safe_filename
+
+logger = logging.getLogger(__name__)
+
+# Account used by targets that don't name one: the process's own token cache and credentials
+DEFAULT_ACCOUNT = "default"
+
+# Claims older than this are assumed to belong to a crashed worker and handed out again
+STALE_CLAIM_SECONDS = 6 * 60 * 60
+
+@dataclass
+class CrawlTarget:
+    """One notebook to crawl, and the account to crawl it with."""
+    notebook_name: str
+    onenote_root: str = DEFAULT_ONENOTE_ROOT
+    site_id: Optional[str] = None
+    account: str = DEFAULT_ACCOUNT
+    output_dir: Optional[str] = None
+
+    @property
+    def id(self) -> str:
+        return f"{self.account}:{self.onenote_root}:{self.notebook_name}"
+
+    @property
+    def group(self) -> Tuple[str, str]:
+        """Targets of one group share an output directory and must not run concurrently."""
+        return self.account, self.onenote_root
+
+    def overrides(self, output_root: str) -> Dict[str, Any]:
+        """Fetcher configuration for this target.
+
+        Unless the target names one, its output directory is
+        ``output_root/<account>/<onenote root>``, so image dedup and the sync
+        manifest are shared by the notebooks of one root.
+        """
+        overrides = {
+            "notebook_name": self.notebook_name,
+            "onenote_root": self.onenote_root,
+            "output_dir": self.output_dir or os.path.join(
+                output_root, safe_filename(self.account), safe_filename(self.onenote_root.replace("/", "_"))
+            )
+        }
+        if self.site_id:
+            overrides["site_id"] = self.site_id
+        return overrides
+
+@dataclass
+class CrawlShard:
+    """Targets crawled one after another by a single worker."""
+    id: str
+    targets: List[CrawlTarget]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "targets": [asdict(target) for target in self.targets]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CrawlShard":
+        return cls(id=data["id"], targets=[CrawlTarget(**target) for target in data["targets"]])
+
+@dataclass
+class TargetResult:
+    """Outcome of crawling one target."""
+    target_id: str
+    account: str
+    notebook_name: str
+    ok: bool
+    seconds: float
+    worker: str
+    stats: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+@dataclass
+class CrawlPlan:
+    """Targets of a run together with the settings of their accounts."""
+    targets: List[CrawlTarget]
+    accounts: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+def load_plan(path: str) -> CrawlPlan:
+    """Read crawl targets from a JSON file.
+
+    The file holds either a list of targets or an object with ``targets``
+    and ``accounts``. Each account maps configuration keys (``auth_mode``,
+    ``client_id``, ``client_secret``, ``tenant_id``, ``token_cache_file``,
+    ``refresh_token``, ...) to the values used for its targets::
+
+        {
+            "accounts": {"archive": {"auth_mode": "client_credentials"}},
+            "targets": [
+                {"notebook_name": "Ops", "onenote_root": "sites/<id>/onenote", "account": "archive"}
+            ]
+        }
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"targets": data}
+    return CrawlPlan(
+        targets=[CrawlTarget(**target) for target in data.get("targets", [])],
+        accounts=data.get("accounts", {})
+    )
+
+def shard_targets(targets: List[CrawlTarget], shard_size: int) -> List[CrawlShard]:
+    """Split targets into shards of about ``shard_size`` targets.
+
+    Targets of the same account and OneNote root always land in the same
+    shard, since they write to the same output directory; a group larger
+    than ``shard_size`` becomes a shard of its own.
+    """
+    groups: "OrderedDict[Tuple[str, str], List[CrawlTarget]]" = OrderedDict()
+    for target in targets:
+        groups.setdefault(target.group, []).append(target)
+
+    shards = []
+    current: List[CrawlTarget] = []
+    for group in groups.values():
+        if current and len(current) + len(group) > shard_size:
+            shards.append(current)
+            current = []
+        current.extend(group)
+    if current:
+        shards.append(current)
+
+    # Ids depend on the shard's targets, so re-running a plan against a queue skips finished shards
+    return [
+        CrawlShard(id=f"shard-{index:05d}-{_digest(shard)}", targets=shard)
+        for index, shard in enumerate(shards)
+    ]
+
+def _digest(targets: List[CrawlTarget]) -> str:
+    return hashlib.sha1("\n".join(target.id for target in targets).encode("utf-8")).hexdigest()[:12]
+
+def account_config(base: Dict[str, Any], account: str, settings: Dict[str, Any],
+                   rate_share: float = 1.0) -> Dict[str, Any]:
+    """Client configuration of one account in one worker.
+
+    Every account gets its own token cache file and response cache
+    directory, since cached responses of ``me/onenote`` differ per account.
+    Each worker receives ``rate_share`` of the account's Graph request
+    budget so the workers together stay within it.
+    """
+    config = dict(base)
+    if account != DEFAULT_ACCOUNT:
+        config["token_cache_file"] = f"token_cache.{safe_filename(account)}.json"
+        config["response_cache_dir"] = f"{config.get('response_cache_dir', '.graph_cache')}.{safe_filename(account)}"
+    config.update({key: value for key, value in settings.items() if key != "refresh_token"})
+    if "tenant_id" in settings and "authority" not in settings:
+        config["authority"] = f"https://login.microsoftonline.com/{settings['tenant_id']}"
+
+    config["rate_limit_rps"] = config.get("rate_limit_rps", 10.0) * rate_share
+    config["rate_limit_burst"] = max(1.0, config.get("rate_limit_burst", 20.0) * rate_share)
+    return config
+
+class ShardWorker:
+    """Crawls shards inside one process, holding one Graph client per account.
+
+    A client owns the account's token and its rate limiter, so each worker
+    refreshes its own tokens and throttles against its own budget.
+    """
+
+    def __init__(self, config: Dict[str, Any], accounts: Dict[str, Dict[str, Any]], rate_share: float = 1.0):
+        """Initialize the worker.
+
+        Args:
+            config: Base configuration, as returned by ``load_config``
+            accounts: Settings per account, see ``load_plan``
+            rate_share: Fraction of each account's request budget this
+                worker may use
+        """
+        self.config = config
+        self.accounts = accounts
+        self.rate_share = rate_share
+        self.name = worker_name()
+        self._clients: Dict[str, Any] = {}
+
+    def client(self, account: str) -> Any:
+        """The Graph client of an account, created and signed in on first use."""
+        if account not in self._clients:
+            from ..auth.graph_client import GraphAPIClient
+
+            settings = self.accounts.get(account, {})
+            client = GraphAPIClient(account_config(self.config, account, settings, self.rate_share))
+            if settings.get("refresh_token") and not client.token_cache.get_token():
+                client.token_provider.use_refresh_token(settings["refresh_token"])
+            self._clients[account] = client
+        return self._clients[account]
+
+    def run_shard(self, shard: CrawlShard) -> List[TargetResult]:
+        """Crawl every target of a shard."""
+        return [self.run_target(target) for target in shard.targets]
+
+    def run_target(self, target: CrawlTarget) -> TargetResult:
+        """Crawl one target and report how it went."""
+        started = time.monotonic()
+        stats: Counter = Counter()
+        error = None
+        ok = False
+
+        try:
+            client = self.client(target.account)
+            # Fails fast when the account cannot sign in
+            client.token_provider.get_access_token()
+            overrides = target.overrides(self.config.get("output_dir") or "downloaded_images")
+
+            if self.config.get("fetch_backend") == "async":
+                from .async_fetcher import run_async_fetcher
+                ok = run_async_fetcher(client, overrides=overrides, stats=stats)
+            else:
+                from .fetcher import OneNoteImageFetcher
+                fetcher = OneNoteImageFetcher(client, overrides=overrides)
+                ok = fetcher.start()
+                stats.update(fetcher.stats)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception(f"Crawl of {target.id} failed")
+        else:
+            if not ok:
+                error = "Crawl did not complete, see the log for the reported errors"
+
+        return TargetResult(
+            target_id=target.id,
+            account=target.account,
+            notebook_name=target.notebook_name,
+            ok=ok,
+            seconds=round(time.monotonic() - started, 3),
+            worker=self.name,
+            stats=dict(stats),
+            error=error
+        )
+
+    def drain(self, queue: WorkQueue) -> int:
+        """Claim and crawl shards from a shared queue until it is empty.
+
+        Returns:
+            Number of shards this worker crawled
+        """
+        crawled = 0
+        while True:
+            claimed = queue.claim(self.name)
+            if claimed is None:
+                return crawled
+            shard_id, payload = claimed
+            results = self.run_shard(CrawlShard.from_dict(payload))
+            queue.complete(shard_id, {"shard_id": shard_id, "results": [asdict(result) for result in results]})
+            crawled += 1
+
+# One worker per pool process, created by the pool initializer
+_worker: Optional[ShardWorker] = None
+
+def _init_worker(config: Dict[str, Any], accounts: Dict[str, Dict[str, Any]], rate_share: float) -> None:
+    global _worker
+    _worker = ShardWorker(config, accounts, rate_share)
+
+def _run_shard(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [asdict(result) for result in _worker.run_shard(CrawlShard.from_dict(payload))]
+
+def _drain_queue(location: str) -> int:
+    return _worker.drain(open_queue(location))
+
+@dataclass
+class RunReport:
+    """Merged outcome of a coordinated crawl."""
+    started_at: float
+    finished_at: float
+    results: List[TargetResult]
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals for the run and per account."""
+        totals: Counter = Counter()
+        accounts: Dict[str, Counter] = {}
+        for result in self.results:
+            for counter in (totals, accounts.setdefault(result.account, Counter())):
+                counter.update(result.stats)
+                counter["targets"] += 1
+                counter["failed"] += 0 if result.ok else 1
+
+        return {
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "seconds": round(self.finished_at - self.started_at, 3),
+            "totals": dict(totals),
+            "accounts": {account: dict(counter) for account, counter in accounts.items()},
+            "workers": sorted({result.worker for result in self.results}),
+            "failed_targets": [
+                {"target_id": result.target_id, "error": result.error}
+                for result in self.results if not result.ok
+            ]
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), "results": [asdict(result) for result in self.results]}
+
+    def write(self, path: str) -> None:
+        """Save the report as JSON."""
+        with AtomicFileWriter(path, fsync_policy="file") as writer:
+            writer.write(json.dumps(self.to_dict(), indent=2, ensure_ascii=False).encode("utf-8"))
+            writer.commit(fix_extension=False)
+
+class CrawlCoordinator:
+    """Crawls many notebooks across accounts with a pool of worker processes.
+
+    Targets are grouped into shards (see ``shard_targets``). Without a queue
+    the shards are handed to the local process pool directly. With a shared
+    queue (a directory or a SQLite file) they are enqueued first, and the
+    local workers, together with workers started on other machines with
+    ``join``, claim shards until none are left; the report is then merged
+    from the results stored in the queue.
+    """
+
+    def __init__(self, config: Dict[str, Any], plan: CrawlPlan, workers: int = 4, shard_size: int = 4,
+                 queue_location: Optional[str] = None, rate_share: float = 1.0):
+        """Initialize the coordinator.
+
+        Args:
+            config: Base configuration, as returned by ``load_config``
+            plan: Targets and account settings
+            workers: Number of worker processes on this machine
+            shard_size: Targets per shard, see ``shard_targets``
+            queue_location: Shared queue directory or ``*.db`` file (optional)
+            rate_share: Fraction of each account's request budget this node
+                uses, split evenly among its worker processes. Nodes sharing
+                a queue don't know about each other, so with N nodes pass
+                about ``1 / N`` on each
+
+        Raises:
+            ValueError: If ``rate_share`` is not in (0, 1]
+        """
+        if not 0 < rate_share <= 1:
+            raise ValueError(f"rate_share must be in (0, 1], got {rate_share}")
+        self.config = config
+        self.plan = plan
+        self.workers = max(1, workers)
+        self.shard_size = max(1, shard_size)
+        self.queue_location = queue_location
+        self.rate_share = rate_share
+
+    def _pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.config, self.plan.accounts, self.rate_share / self.workers)
+        )
+
+    def run(self) -> RunReport:
+        """Crawl every target and return the merged report."""
+        started_at = time.time()
+        shards = shard_targets(self.plan.targets, self.shard_size)
+        logger.info(f"Crawling {len(self.plan.targets)} targets in {len(shards)} shards "
+                    f"with {self.workers} workers")
+
+        if self.queue_location:
+            queue = open_queue(self.queue_location)
+            for shard in shards:
+                queue.put(shard.id, shard.to_dict())
+            self._drain()
+            return RunReport(started_at, time.time(), self.collect(queue))
+
+        results = []
+        with self._pool() as pool:
+            for shard_results in pool.map(_run_shard, [shard.to_dict() for shard in shards]):
+                results.extend(TargetResult(**result) for result in shard_results)
+        return RunReport(started_at, time.time(), results)
+
+    def join(self) -> RunReport:
+        """Help crawl the shards of a shared queue someone else filled."""
+        started_at = time.time()
+        self._drain()
+        return RunReport(started_at, time.time(), self.collect(open_queue(self.queue_location)))
+
+    def _drain(self) -> None:
+        """Let every local worker claim shards until the queue is empty."""
+        queue = open_queue(self.queue_location)
+        requeued = queue.requeue_stale(STALE_CLAIM_SECONDS)
+        if requeued:
+            logger.warning(f"Re-queued {requeued} shards of workers that stopped responding")
+
+        with self._pool() as pool:
+            crawled = sum(pool.map(_drain_queue, [self.queue_location] * self.workers))
+        counts = queue.counts()
+        logger.info(f"Crawled {crawled} shards here; queue: {counts['done']} done, "
+                    f"{counts['claimed']} still claimed, {counts['pending']} pending")
+
+    @staticmethod
+    def collect(queue: WorkQueue) -> List[TargetResult]:
+        """Results of every shard completed so far, by any worker."""
+        return [
+            TargetResult(**result)
+            for shard in queue.results()
+            for result in shard["results"]
+        ]
@@ -0,0 +1,166 @@
+import codecs
+import html
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# As in HTML, an unquoted attribute value ends at whitespace and cannot contain any of "'=<>`;
+# the lookahead stops a failed match from backtracking through every split of the value
+_UNQUOTED_VALUE = r"""[^\s"'=<>`]+(?![^\s"'=<>`])"""
+
+# A complete <img> or <object> start tag. Quotes only delimit a value right after '=';
+# quoted values may contain '>'
+_TAG = re.compile(
+    r"""<(img|object)\b((?:[^>=]|=\s*(?:"[^"]*"|'[^']*'|""" + _UNQUOTED_VALUE + r"""|(?=>)))*)/?>""",
+    re.IGNORECASE
+)
+
+# Where a (possibly incomplete) <img or <object tag starts
+_TAG_START = re.compile(r"<(?:img|object)\b", re.IGNORECASE)
+
+_ATTRIBUTE = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+
+# Characters kept at the end of a chunk so a tag name split across chunks is still found
+_PREFIX_KEEP = len("<object")
+
+# Unterminated tags longer than this are given up on instead of buffered forever
+MAX_TAG_LENGTH = 64 * 1024
+
+@dataclass
+class ImageSource:
+    """An image or embedded object referenced by a page's HTML."""
+    url: str
+    content_type: Optional[str] = None
+    tag: str = "img"
+    width: Optional[int] = None
+    height: Optional[int] = None
+    attributes: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    @property
+    def resource_id(self) -> Optional[str]:
+        """Id of the Graph resource behind the URL, if it is one."""
+        match = re.search(r"/resources/([^/]+)/", self.url)
+        return match.group(1) if match else None
+
+def _parse_attributes(text: str) -> Dict[str, str]:
+    """Parse the attribute part of a start tag into a lower-cased dict."""
+    attributes = {}
+    for match in _ATTRIBUTE.finditer(text):
+        name = match.group(1).lower()
+        value = next((group for group in match.group(2, 3, 4) if group is not None), "")
+        attributes.setdefault(name, html.unescape(value))
+    return attributes
+
+def _dimension(value: Optional[str]) -> Optional[int]:
+    """Convert a width/height attribute such as ``"640"`` or ``"640.5"`` to pixels."""
+    try:
+        return int(float(value)) if value else None
+    except ValueError:
+        return None
+
+def _reference(tag: str, attributes: Dict[str, str]) -> Optional[ImageSource]:
+    """Turn a tag into a resource reference, preferring the full-resolution rendition."""
+    if tag == "img":
+        if attributes.get("data-fullres-src"):
+            url = attributes["data-fullres-src"]
+            content_type = attributes.get("data-fullres-src-type") or attributes.get("data-src-type")
+        else:
+            url = attributes.get("src")
+            content_type = attributes.get("data-src-type")
+    else:
+        url = attributes.get("data")
+        content_type = attributes.get("type")
+
+    if not url:
+        return None
+    return ImageSource(
+        url=url,
+        content_type=content_type,
+        tag=tag,
+        width=_dimension(attributes.get("width")),
+        height=_dimension(attributes.get("height")),
+        attributes=attributes
+    )
+
+class ResourceReferenceExtractor:
+    """Incrementally finds ``img`` and ``object`` references in page HTML.
+
+    Only the start tags of interest are tokenized; everything else in the
+    document (ink, tables, text) is skipped without building a tree. Data
+    can be fed in arbitrary chunks of text or bytes, e.g. straight from a
+    streamed response; a tag split across chunks is buffered until it is
+    complete.
+    """
+
+    def __init__(self, encoding: str = "utf-8"):
+        """Initialize the extractor.
+
+        Args:
+            encoding: Encoding of byte chunks
+        """
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._buffer = ""
+
+    def feed(self, chunk: Union[str, bytes]) -> List[ImageSource]:
+        """Consume a chunk and return the references completed by it."""
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        self._buffer += chunk
+        return self._drain(final=False)
+
+    def close(self) -> List[ImageSource]:
+        """Flush the remaining input and return its references."""
+        self._buffer += self._decoder.decode(b"", final=True)
+        references = self._drain(final=True)
+        self._buffer = ""
+        return references
+
+    def _drain(self, final: bool) -> List[ImageSource]:
+        """Extract complete tags from the buffer and keep only what may still become one."""
+        buffer = self._buffer
+        references = []
+        position = 0
+
+        while True:
+            start = _TAG_START.search(buffer, position)
+            if start is None:
+                break
+            match = _TAG.match(buffer, start.start())
+            if match is None:
+                if not final and len(buffer) - start.start() < MAX_TAG_LENGTH:
+                    # The tag continues in the next chunk
+                    self._buffer = buffer[start.start():]
+                    return references
+                logger.debug("Skipping unterminated tag in page content")
+                position = start.end()
+                continue
+
+            reference = _reference(match.group(1).lower(), _parse_attributes(match.group(2)))
+            if reference:
+                references.append(reference)
+            position = match.end()
+
+        tail = buffer[max(position, len(buffer) - _PREFIX_KEEP):]
+        self._buffer = "" if final else tail[tail.rfind("<"):] if "<" in tail else ""
+        return references
+
+def iter_resource_references(chunks: Iterable[Union[str, bytes]], encoding: str = "utf-8") -> Iterator[ImageSource]:
+    """Yield the ``img``/``object`` references of a document as its chunks arrive."""
+    extractor = ResourceReferenceExtractor(encoding)
+    for chunk in chunks:
+        yield from extractor.feed(chunk)
+    yield from extractor.close()
+
+def extract_resource_references(content: Union[str, bytes, Iterable[Union[str, bytes]]]) -> List[ImageSource]:
+    """Find every ``img`` and ``object`` reference of a page.
+
+    Args:
+        content: The page's HTML as text, bytes or an iterable of chunks
+            such as ``response.iter_content()``
+    """
+    if isinstance(content, (str, bytes)):
+        content = [content]
+    return list(iter_resource_references(content))
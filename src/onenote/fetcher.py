@@ -1,20 +1,52 @@
 import os
 import logging
-from typing import List, Dict, Optional, Protocol, Any
+import threading
+from collections import Counter
+from typing import List, Dict, Optional, Protocol, Any, Iterator, AsyncContextManager, Tuple
 import requests
-from bs4 import BeautifulSoup
 from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import Future
 from datetime import datetime
 from ..utils.self_healer import SelfHealer
+from ..utils.atomic_writer import AtomicFileWriter, DEFAULT_CHUNK_SIZE
+from ..utils.blob_store import BlobStore
+from ..utils.metrics import observe_write
+from ..utils.tracing import trace_span
 
-from .models import Notebook, Section, Page, Image
+from .models import Notebook, Section, SectionGroup, Page, Image
+from .pagination import iter_graph_collection, iter_graph_pages
+from .pipeline import Pipeline, PipelineConfig
+from .query import MAX_TOP, NOTEBOOK_QUERY, PAGE_QUERY, SECTION_GROUP_QUERY, SECTION_QUERY, GraphQuery
+from .resources import ImageSource, PageImages, PageResourceDownloader, extract_image_sources
+from .manifest import SyncManifest
+from .hierarchy import DEFAULT_ONENOTE_ROOT, HierarchyLoader, NotebookTree
+from .metadata_cache import MetadataCache
+from .journal import CrawlJournal
+
+# Manifest of the incremental sync, stored in the output directory
+MANIFEST_FILENAME = ".sync_manifest.json"
+
+# Content-addressable store shared by all downloaded images, in the output directory
+BLOB_STORE_DIRNAME = ".blobs"
+
+# Progress of unfinished crawls, in the output directory
+JOURNAL_FILENAME = ".crawl_journal.db"
 
 logger = logging.getLogger(__name__)
 
 class GraphAPIInterface(Protocol):
     """Interface for Graph API clients."""
-    def call_graph_api(self, endpoint: str, method: str = "GET", **kwargs) -> Dict:
-        """Make a call to the Microsoft Graph API."""
+    def call_graph_api(self, endpoint: str, method: str = "GET", response_type: str = "json", **kwargs) -> Any:
+        """Make a call to the Microsoft Graph API.
+        
+        ``response_type`` selects the result: ``json`` (decoded body),
+        ``text``, ``bytes`` or ``stream`` (the open response).
+        """
+        ...
+    
+    def download(self, url: str, authenticated: bool = False, **kwargs) -> requests.Response:
+        """Download a resource over the client's connection pool."""
         ...
     
     def add_progress(self, message: str) -> None:
@@ -29,25 +61,140 @@ class GraphAPIInterface(Protocol):
         """Add a user prompt message."""
         ...
 
+class AsyncGraphAPIInterface(Protocol):
+    """Interface for asyncio Graph API clients."""
+    async def call_graph_api(self, endpoint: str, method: str = "GET", response_type: str = "json", **kwargs) -> Any:
+        """Make a call to the Microsoft Graph API, see ``GraphAPIInterface``."""
+        ...
+    
+    async def download(self, url: str, **kwargs) -> Any:
+        """Download a resource over the client's connections."""
+        ...
+    
+    def stream(self, url: str, **kwargs) -> AsyncContextManager[Any]:
+        """Open a streamed download of a resource."""
+        ...
+    
+    def add_progress(self, message: str) -> None:
+        """Add a progress message."""
+        ...
+    
+    def handle_error(self, error: Exception, context: Dict[str, Any]) -> None:
+        """Handle errors using the self-healing mechanism."""
+        ...
+    
+    def add_user_prompt(self, message: str, options: List[str]) -> None:
+        """Add a user prompt message."""
+        ...
+
+@dataclass
+class PageTask:
+    """A page moving through the fetch pipeline."""
+    section: Section
+    page: Page
+    preview_url: Optional[str] = None
+    writer: Optional[AtomicFileWriter] = None
+
 class OneNoteImageFetcher:
     """Handles fetching images from OneNote pages."""
     
-    def __init__(self, graph_client: GraphAPIInterface, openai_api_key: Optional[str] = None):
-        """Initialize the image fetcher."""
+    def __init__(self, graph_client: GraphAPIInterface, openai_api_key: Optional[str] = None,
+                 pipeline_config: Optional[PipelineConfig] = None, overrides: Optional[Dict[str, Any]] = None):
+        """Initialize the image fetcher.
+        
+        Args:
+            graph_client: Client used for all Graph calls
+            openai_api_key: Enables the self-healing error analysis (optional)
+            pipeline_config: Worker and queue sizes of the crawl pipeline (optional)
+            overrides: Configuration values replacing the client's for this
+                fetcher only, such as ``notebook_name`` or ``output_dir`` (optional)
+        """
         self.graph_client = graph_client
-        self.output_dir = "downloaded_images"
+        self.config = {**getattr(graph_client, "config", {}), **(overrides or {})}
+        self.pipeline_config = pipeline_config or PipelineConfig.from_config(self.config)
+        self.fsync_policy = self.config.get("fsync_policy", "file")
+        self.chunk_size = self.config.get("download_chunk_size", DEFAULT_CHUNK_SIZE)
+        self._section_count = 0
+        
+        # The client's metrics registry, if it has one
+        self.metrics = getattr(graph_client, "metrics", None)
+        
+        # The client's tracer, if it has one; spans are no-ops unless tracing is enabled
+        self.tracer = getattr(graph_client, "tracer", None)
+        
+        # Sections, pages, images and errors of the current run
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._section_ids: List[str] = []
+        self.hierarchy: Optional[NotebookTree] = None
+        self._hierarchy_lock = threading.Lock()
+        self.metadata = MetadataCache(ttl=self.config.get("metadata_cache_ttl", 300.0))
+        
+        # Image references found while scanning, so downloads don't fetch the content again
+        self._scanned_sources: Dict[str, List[ImageSource]] = {}
+        self._scanned_lock = threading.Lock()
+        self.output_dir = self.config.get("output_dir") or "downloaded_images"
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # Identical images are stored once and linked into every section folder
+        self.blob_store = (
+            BlobStore(
+                os.path.join(self.output_dir, BLOB_STORE_DIRNAME),
+                self.config.get("blob_link_mode", "hardlink")
+            )
+            if self.config.get("blob_store", True) else None
+        )
+        self.resource_downloader = PageResourceDownloader(
+            graph_client,
+            fanout=self.config.get("page_image_fanout", 16),
+            fsync_policy=self.fsync_policy,
+            chunk_size=self.chunk_size,
+            blob_store=self.blob_store
+        )
+        
+        # Incremental sync skips pages whose lastModifiedDateTime is unchanged
+        self.sync_mode = self.config.get("sync_mode", "full")
+        self.manifest = (
+            SyncManifest(os.path.join(self.output_dir, MANIFEST_FILENAME))
+            if self.sync_mode == "incremental" else None
+        )
+        
+        # Listings ask only for the fields the models read, with the largest page size
+        self.projection = self.config.get("listing_projection", True)
+        self.page_orderby = self.config.get("page_orderby")
+        
+        # Lets a crawl that died partway resume where it stopped; opened by start()
+        self.journal: Optional[CrawlJournal] = None
+        
         # Initialize self-healer if API key is provided
-        self.self_healer = SelfHealer(openai_api_key) if openai_api_key else None
+        self.self_healer = SelfHealer(openai_api_key, tracer=self.tracer) if openai_api_key else None
         
         # SharePoint and Notebook configuration
-        self.site_id = "02531bc3-49a7-427a-a1b6-d7d48e4e6397"
-        self.notebook_name = "Notizbuch für Operatives"
+        self.site_id = self.config.get("site_id") or "02531bc3-49a7-427a-a1b6-d7d48e4e6397"
+        self.notebook_name = self.config.get("notebook_name") or "Notizbuch für Operatives"
+        self.onenote_root = self.config.get("onenote_root") or DEFAULT_ONENOTE_ROOT
         self.notebook_path = "https://juniorunimg.sharepoint.com/sites/Intranet/SiteAssets/Notizbuch für Operatives"
     
+    def _count(self, name: str, amount: int = 1) -> None:
+        """Add to one of the run's ``stats`` counters."""
+        with self._stats_lock:
+            self.stats[name] += amount
+        if self.metrics:
+            self.metrics.counter("onenote_crawl_items_total", "Sections, pages, images and errors processed").inc(
+                amount, kind=name
+            )
+    
+    def _track_queues(self, pipeline: Pipeline) -> Pipeline:
+        """Report the depth of the pipeline's queues as a metric."""
+        if self.metrics:
+            self.metrics.gauge("onenote_queue_depth", "Items waiting for a crawl stage").set_function(
+                pipeline.depths, label="queue"
+            )
+        return pipeline
+    
     def _handle_error(self, error_type: str, error_context: Dict[str, Any]) -> None:
         """Handle errors using the self-healing system."""
+        self._count("errors")
         if not self.self_healer:
             self.graph_client.add_progress(f"Error: {error_type}")
             return
@@ -75,126 +222,60 @@ class OneNoteImageFetcher:
         if not analysis['is_recoverable']:
             self.graph_client.add_progress("\nThis error is not recoverable. Manual intervention may be required.")
     
-    def start(self) -> None:
-        """Start the image fetching process."""
+    def start(self) -> bool:
+        """Start the image fetching process.
+        
+        Returns:
+            Whether the crawl ran to completion
+        """
         try:
             self.graph_client.add_progress(f"Fetching notebook: {self.notebook_name}")
             
-            # Get the specific notebook
-            notebooks = self.graph_client.call_graph_api("me/onenote/notebooks")
-            target_notebook = None
-            
-            for notebook in notebooks.get('value', []):
-                if notebook['displayName'] == self.notebook_name:
-                    target_notebook = notebook
-                    break
+            # Load the whole notebook / section group / section tree up front
+            tree = self.load_hierarchy()
+            target_notebook = tree.find_notebook(self.notebook_name)
             
             if not target_notebook:
                 error_context = {
                     "notebook_name": self.notebook_name,
-                    "available_notebooks": [n['displayName'] for n in notebooks.get('value', [])],
-                    "api_response": notebooks
+                    "available_notebooks": [notebook.name for notebook in tree.notebooks.values()]
                 }
                 self._handle_error("notebook_not_found", error_context)
-                return
+                return False
+            
+            self.graph_client.add_progress(f"Found notebook: {target_notebook.name}")
+            self._open_journal(tree.sections_in(target_notebook.id))
+            
+            # Stream sections, including those in nested section groups, through the
+            # listing, preview, download and write stages
+            sections = self._count_sections(iter(tree.sections_in(target_notebook.id)))
             
-            self.graph_client.add_progress(f"Found notebook: {target_notebook['displayName']}")
+            pipeline = self._track_queues(Pipeline(self.pipeline_config.queue_size, on_error=self._on_stage_error))
+            pipeline.add_stage("listing", self._list_section_pages, self.pipeline_config.listing_workers)
+            pipeline.add_stage("preview", self._resolve_preview, self.pipeline_config.preview_workers)
+            pipeline.add_stage("download", self._download_preview, self.pipeline_config.download_workers)
+            pipeline.add_stage("write", self._write_preview, self.pipeline_config.write_workers)
+            pipeline.run(sections)
             
-            # Get sections
-            self.graph_client.add_progress("Fetching sections...")
-            sections = self.graph_client.call_graph_api(f"me/onenote/notebooks/{target_notebook['id']}/sections")
+            if self.manifest:
+                # The section listing completed, so sections missing from it were deleted
+                self._prune_deleted_sections(target_notebook)
+                if self.blob_store:
+                    self.blob_store.collect_garbage()
             
-            if not sections.get('value'):
+            if not self._section_count:
                 error_context = {
-                    "notebook_id": target_notebook['id'],
-                    "notebook_name": target_notebook['displayName'],
-                    "api_response": sections
+                    "notebook_id": target_notebook.id,
+                    "notebook_name": target_notebook.name
                 }
                 self._handle_error("no_sections", error_context)
-                return
-            
-            self.graph_client.add_progress(f"Found {len(sections['value'])} sections.")
-            
-            # Process each section
-            for section in sections['value']:
-                self.graph_client.add_progress(f"Processing section: {section['displayName']}")
-                
-                # Get pages
-                self.graph_client.add_progress("Fetching pages...")
-                pages = self.graph_client.call_graph_api(f"me/onenote/sections/{section['id']}/pages")
-                
-                if not pages.get('value'):
-                    error_context = {
-                        "section_id": section['id'],
-                        "section_name": section['displayName'],
-                        "api_response": pages
-                    }
-                    self._handle_error("no_pages", error_context)
-                    continue
-                
-                self.graph_client.add_progress(f"Found {len(pages['value'])} pages.")
-                
-                # Process each page
-                for page in pages['value']:
-                    self.graph_client.add_progress(f"Processing page: {page['title']}")
-                    
-                    try:
-                        # Get page preview
-                        preview = self.graph_client.call_graph_api(
-                            f"sites/{self.site_id}/pages/{page['id']}/preview"
-                        )
-                        
-                        if not preview.get('previewImageUrl'):
-                            error_context = {
-                                "page_id": page['id'],
-                                "page_title": page['title'],
-                                "api_response": preview
-                            }
-                            self._handle_error("preview_error", error_context)
-                            continue
-                        
-                        # Download the preview image
-                        self.graph_client.add_progress("Downloading preview image...")
-                        response = requests.get(preview['previewImageUrl'])
-                        
-                        if response.status_code == 200:
-                            # Create directory structure
-                            section_path = os.path.join(
-                                self.output_dir,
-                                self.notebook_name,
-                                section['displayName']
-                            )
-                            os.makedirs(section_path, exist_ok=True)
-                            
-                            # Save the image
-                            filename = f"{page['title']}.png"
-                            filepath = os.path.join(section_path, filename)
-                            
-                            with open(filepath, 'wb') as f:
-                                f.write(response.content)
-                            
-                            self.graph_client.add_progress(f"Successfully downloaded preview to: {filepath}")
-                        else:
-                            error_context = {
-                                "page_id": page['id'],
-                                "page_title": page['title'],
-                                "status_code": response.status_code,
-                                "response_text": response.text,
-                                "preview_url": preview['previewImageUrl']
-                            }
-                            self._handle_error("download_error", error_context)
-                            
-                    except Exception as e:
-                        error_context = {
-                            "page_id": page['id'],
-                            "page_title": page['title'],
-                            "error": str(e),
-                            "error_type": type(e).__name__
-                        }
-                        self._handle_error("processing_error", error_context)
-                        continue
+                return False
             
+            self.graph_client.add_progress(f"Processed {self._section_count} sections.")
             self.graph_client.add_progress("Finished processing all sections.")
+            if self.journal:
+                self.journal.finish()
+            return True
             
         except Exception as e:
             error_context = {
@@ -204,142 +285,522 @@ class OneNoteImageFetcher:
             }
             self._handle_error("general_error", error_context)
             logger.exception("Full traceback:")
+            return False
+        finally:
+            self._close_journal()
+            if self.manifest:
+                self.manifest.save()
+            if self.blob_store:
+                self.blob_store.save()
+    
+    def _open_journal(self, sections: List[Section]) -> None:
+        """Open the crawl journal of this notebook and record its sections."""
+        if not self.config.get("crawl_journal", True):
+            return
+        
+        self.journal = CrawlJournal(
+            os.path.join(self.output_dir, JOURNAL_FILENAME),
+            run_key=f"{self.onenote_root}:{self.notebook_name}",
+            commit_interval=self.config.get("journal_commit_interval", 1.0)
+        )
+        if self.journal.resumed:
+            listed, done = self.journal.progress()
+            self.graph_client.add_progress(
+                f"Resuming interrupted crawl: {listed} sections listed and {done} pages downloaded before"
+            )
+        self.journal.record_sections(sections)
+    
+    def _close_journal(self) -> None:
+        """Commit the journal's last writes."""
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+    
+    def _iter_section_pages(self, section: Section) -> Iterator[Page]:
+        """Pages of a section, taken from the journal if an interrupted crawl listed it."""
+        if self.journal and self.journal.is_listed(section.id):
+            yield from self.journal.pages(section.id)
+            return
+        
+        for page in self.iter_pages(section.id):
+            if self.journal:
+                self.journal.record_page(page)
+            yield page
+        
+        if self.journal:
+            self.journal.mark_listed(section.id)
+    
+    def _count_sections(self, sections: Iterator[Section]) -> Iterator[Section]:
+        """Pass sections through while counting them."""
+        self._section_count = 0
+        self._section_ids = []
+        for section in sections:
+            self._section_count += 1
+            self._count("sections")
+            self._section_ids.append(section.id)
+            yield section
+    
+    def _prune_deleted_sections(self, notebook: Notebook) -> None:
+        """Drop manifest entries and files of sections no longer in the notebook."""
+        pruned = self.manifest.prune_notebook(notebook.id, self._section_ids)
+        if pruned:
+            self.graph_client.add_progress(f"Removed {len(pruned)} pages of deleted sections.")
+    
+    def _prune_deleted_pages(self, section: Section, seen_page_ids: List[str]) -> None:
+        """Drop manifest entries and files of pages no longer in a section."""
+        pruned = self.manifest.prune_section(section.id, seen_page_ids)
+        if pruned:
+            self.graph_client.add_progress(f"Removed {len(pruned)} deleted pages from section: {section.name}")
+    
+    def _list_section_pages(self, section: Section) -> Iterator[PageTask]:
+        """Listing stage: emit a task for every page of a section."""
+        self.graph_client.add_progress(f"Processing section: {section.name}")
+        self.graph_client.add_progress("Fetching pages...")
+        page_count = 0
+        seen_page_ids = []
+        unchanged = 0
+        finished = 0
+        
+        for page in self._iter_section_pages(section):
+            page_count += 1
+            self._count("pages")
+            seen_page_ids.append(page.id)
+            if self.journal and self.journal.is_done(page.id):
+                finished += 1
+                continue
+            if self.manifest and self.manifest.is_unchanged(page):
+                unchanged += 1
+                continue
+            yield PageTask(section=section, page=page)
+        
+        if self.manifest:
+            self._prune_deleted_pages(section, seen_page_ids)
+        
+        if not page_count:
+            error_context = {
+                "section_id": section.id,
+                "section_name": section.name
+            }
+            self._handle_error("no_pages", error_context)
+            return
+        
+        self.graph_client.add_progress(f"Found {page_count} pages in section: {section.name}")
+        if unchanged:
+            self.graph_client.add_progress(f"Skipped {unchanged} unchanged pages in section: {section.name}")
+        if finished:
+            self.graph_client.add_progress(f"Skipped {finished} pages finished before the interruption in section: {section.name}")
+    
+    def _resolve_preview(self, task: PageTask) -> List[PageTask]:
+        """Preview stage: look up the preview image URL of a page."""
+        page = task.page
+        self.graph_client.add_progress(f"Processing page: {page.title}")
+        
+        preview = self._call_batched(f"sites/{self.site_id}/pages/{page.id}/preview")
+        
+        if not preview.get('previewImageUrl'):
+            error_context = {
+                "page_id": page.id,
+                "page_title": page.title,
+                "api_response": preview
+            }
+            self._handle_error("preview_error", error_context)
+            return []
+        
+        task.preview_url = preview['previewImageUrl']
+        return [task]
+    
+    def _preview_path(self, task: PageTask) -> str:
+        """Path of a page's preview image below its section folder."""
+        _, groups, _ = self.section_path(task.section.id)
+        return os.path.join(
+            self.output_dir,
+            self.notebook_name,
+            *(group.name for group in groups),
+            task.section.name,
+            f"{task.page.title}.png"
+        )
+    
+    def _download_preview(self, task: PageTask) -> List[PageTask]:
+        """Download stage: stream the preview image into a temporary file."""
+        self.graph_client.add_progress("Downloading preview image...")
+        response = self.graph_client.download(task.preview_url, stream=True)
+        
+        try:
+            if response.status_code != 200:
+                error_context = {
+                    "page_id": task.page.id,
+                    "page_title": task.page.title,
+                    "status_code": response.status_code,
+                    "response_text": response.text,
+                    "preview_url": task.preview_url
+                }
+                self._handle_error("download_error", error_context)
+                return []
+            
+            writer = AtomicFileWriter(self._preview_path(task), self.fsync_policy)
+            with writer, trace_span(self.tracer, "write.preview", "disk") as span:
+                writer.write_all(response.iter_content(self.chunk_size))
+                span.set(bytes=writer.size)
+        finally:
+            response.close()
+        
+        task.writer = writer
+        return [task]
+    
+    def _write_preview(self, task: PageTask) -> None:
+        """Write stage: flush the preview image and move it into place."""
+        with trace_span(self.tracer, "commit.preview", "disk") as span:
+            # Previews keep the <title>.png names of the original output layout
+            result = task.writer.commit(fix_extension=False)
+            span.set(disk_ms=round(result.disk_seconds * 1000, 3))
+        observe_write(self.metrics, result, "preview")
+        if self.blob_store:
+            self.blob_store.adopt(result.path, result.sha256)
+        if self.manifest:
+            self.manifest.record(task.page, [result], task.section.notebook_id)
+        if self.journal:
+            self.journal.mark_done(task.page.id)
+        self._count("images")
+        self.graph_client.add_progress(f"Successfully downloaded preview to: {result.path}")
+    
+    @staticmethod
+    def _discard_writer(task: PageTask) -> None:
+        """Close and delete the temporary file of a preview that was never committed."""
+        if task.writer is not None and not task.writer.committed:
+            task.writer.abort()
+    
+    def _on_stage_error(self, stage: str, item: Any, error: Exception) -> None:
+        """Report an unexpected error raised inside a pipeline stage."""
+        if isinstance(item, PageTask):
+            self._discard_writer(item)
+        if isinstance(item, (PageTask, PageImages)):
+            error_context = {
+                "page_id": item.page.id,
+                "page_title": item.page.title,
+                "stage": stage,
+                "error": str(error),
+                "error_type": type(error).__name__
+            }
+        else:
+            error_context = {
+                "section_id": getattr(item, "id", None),
+                "section_name": getattr(item, "name", None),
+                "stage": stage,
+                "error": str(error),
+                "error_type": type(error).__name__
+            }
+        self._handle_error("processing_error", error_context)
+    
+    @staticmethod
+    def _notebook_from_api(notebook: Dict) -> Notebook:
+        """Build a notebook model from a Graph API item."""
+        return Notebook(
+            id=notebook["id"],
+            name=notebook["displayName"],
+            url=notebook["links"]["oneNoteWebUrl"]["href"]
+        )
+    
+    @staticmethod
+    def _section_from_api(section: Dict, notebook_id: str) -> Section:
+        """Build a section model from a Graph API item."""
+        return Section(
+            id=section["id"],
+            name=section["displayName"],
+            url=section["links"]["oneNoteWebUrl"]["href"],
+            notebook_id=notebook_id,
+            parent_section_group_id=(section.get("parentSectionGroup") or {}).get("id")
+        )
+    
+    @staticmethod
+    def _section_group_from_api(group: Dict) -> SectionGroup:
+        """Build a section group model from a Graph API item."""
+        return SectionGroup(
+            id=group["id"],
+            name=group["displayName"],
+            notebook_id=group["parentNotebook"]["id"],
+            parent_section_group_id=(group.get("parentSectionGroup") or {}).get("id")
+        )
+    
+    @staticmethod
+    def _page_from_api(page: Dict, section_id: str) -> Page:
+        """Build a page model from a Graph API item."""
+        return Page(
+            id=page["id"],
+            title=page["title"],
+            url=page["links"]["oneNoteWebUrl"]["href"],
+            section_id=section_id,
+            content_url=page["contentUrl"],
+            last_modified=page.get("lastModifiedDateTime")
+        )
+    
+    def query_endpoint(self, path: str, query: GraphQuery) -> str:
+        """Endpoint of ``path`` below the OneNote root with ``query`` applied.
+        
+        With ``listing_projection`` turned off only ``$orderby`` is kept, and
+        Graph returns its full default representations.
+        """
+        if not self.projection:
+            query = query.without_projection()
+        return query.apply(f"{self.onenote_root}/{path}")
+    
+    def notebooks_endpoint(self) -> str:
+        """Endpoint listing the notebooks."""
+        return self.query_endpoint("notebooks", NOTEBOOK_QUERY.limit(MAX_TOP))
+    
+    def sections_endpoint(self, notebook_id: str) -> str:
+        """Endpoint listing the sections directly inside a notebook."""
+        return self.query_endpoint(f"notebooks/{notebook_id}/sections", SECTION_QUERY.limit(MAX_TOP))
+    
+    def pages_endpoint(self, section_id: str) -> str:
+        """Endpoint listing the pages of a section, sorted by ``page_orderby`` if set."""
+        query = PAGE_QUERY.limit(MAX_TOP).ordered_by(self.page_orderby)
+        return self.query_endpoint(f"sections/{section_id}/pages", query)
+    
+    def iter_notebooks(self) -> Iterator[Notebook]:
+        """Yield OneNote notebooks as each page of the listing arrives."""
+        for item in iter_graph_collection(self.graph_client, self.notebooks_endpoint()):
+            notebook = self._notebook_from_api(item)
+            self.metadata.put(notebook)
+            yield notebook
+    
+    def iter_sections(self, notebook_id: str) -> Iterator[Section]:
+        """Yield the sections of a notebook as each page of the listing arrives."""
+        for item in iter_graph_collection(self.graph_client, self.sections_endpoint(notebook_id)):
+            section = self._section_from_api(item, notebook_id)
+            self.metadata.put(section)
+            yield section
+    
+    def iter_page_batches(self, section_id: str) -> Iterator[List[Page]]:
+        """Yield the pages of a section one listing response at a time."""
+        for items in iter_graph_pages(self.graph_client, self.pages_endpoint(section_id)):
+            yield [self._page_from_api(page, section_id) for page in items]
+    
+    def iter_pages(self, section_id: str) -> Iterator[Page]:
+        """Yield the pages of a section as each page of the listing arrives."""
+        for pages in self.iter_page_batches(section_id):
+            yield from pages
+    
+    def _call_batched(self, endpoint: str) -> Any:
+        """GET an endpoint, sharing a $batch call with concurrent callers when supported."""
+        call_batched = getattr(self.graph_client, "call_graph_api_batched", None)
+        if call_batched:
+            return call_batched(endpoint)
+        return self.graph_client.call_graph_api(endpoint)
+    
+    def _call_many(self, endpoints: List[str]) -> List[Future]:
+        """GET several endpoints in as few round trips as the client supports."""
+        call_many = getattr(self.graph_client, "call_graph_api_many", None)
+        if call_many:
+            return call_many(endpoints)
+        
+        futures = []
+        for endpoint in endpoints:
+            future = Future()
+            try:
+                future.set_result(self.graph_client.call_graph_api(endpoint))
+            except Exception as e:
+                future.set_exception(e)
+            futures.append(future)
+        return futures
+    
+    def load_hierarchy(self, refresh: bool = False) -> NotebookTree:
+        """Return the notebook hierarchy, loading it on first use.
+        
+        Args:
+            refresh: Load the tree again even if it is already known
+        """
+        with self._hierarchy_lock:
+            if self.hierarchy is None or refresh:
+                self.graph_client.add_progress("Loading notebook hierarchy...")
+                self.hierarchy = HierarchyLoader(
+                    self.graph_client, self._call_many, self.onenote_root, projection=self.projection
+                ).load()
+                self._seed_metadata(self.hierarchy)
+            return self.hierarchy
+    
+    def _seed_metadata(self, tree: NotebookTree) -> None:
+        """Make every object of a loaded hierarchy available without further calls."""
+        self.metadata.seed(tree.notebooks.values())
+        self.metadata.seed(tree.section_groups.values())
+        self.metadata.seed(tree.sections.values())
+    
+    def get_notebook(self, notebook_id: str) -> Notebook:
+        """Get a notebook, from the metadata cache when possible."""
+        return self.metadata.get(
+            Notebook, notebook_id,
+            lambda: self._notebook_from_api(
+                self._call_batched(self.query_endpoint(f"notebooks/{notebook_id}", NOTEBOOK_QUERY))
+            )
+        )
+    
+    def get_section_group(self, group_id: str) -> SectionGroup:
+        """Get a section group, from the metadata cache when possible."""
+        return self.metadata.get(
+            SectionGroup, group_id,
+            lambda: self._section_group_from_api(
+                self._call_batched(self.query_endpoint(f"sectionGroups/{group_id}", SECTION_GROUP_QUERY))
+            )
+        )
+    
+    def get_section(self, section_id: str) -> Section:
+        """Get a section, from the metadata cache when possible."""
+        def load() -> Section:
+            section = self._call_batched(self.query_endpoint(f"sections/{section_id}", SECTION_QUERY))
+            return self._section_from_api(section, section["parentNotebook"]["id"])
+        return self.metadata.get(Section, section_id, load)
+    
+    def section_path(self, section_id: str) -> Tuple[Notebook, List[SectionGroup], Section]:
+        """Notebook, enclosing section groups (outermost first) and section of a section id.
+        
+        Sections of the loaded hierarchy are resolved from the tree without
+        a Graph call, whatever the metadata cache TTL; any other section is
+        looked up through the metadata cache.
+        """
+        if self.hierarchy is not None and section_id in self.hierarchy.sections:
+            return self.hierarchy.path(section_id)
+        
+        section = self.get_section(section_id)
+        groups = []
+        group_id = section.parent_section_group_id
+        while group_id:
+            group = self.get_section_group(group_id)
+            groups.insert(0, group)
+            group_id = group.parent_section_group_id
+        return self.get_notebook(section.notebook_id), groups, section
     
     def get_notebooks(self) -> List[Notebook]:
         """Get all OneNote notebooks."""
-        response = self.graph_client.call_graph_api("me/onenote/notebooks")
-        return [
-            Notebook(
-                id=notebook["id"],
-                name=notebook["displayName"],
-                url=notebook["links"]["oneNoteWebUrl"]["href"]
-            )
-            for notebook in response["value"]
-        ]
+        return list(self.iter_notebooks())
     
     def get_sections(self, notebook_id: str) -> List[Section]:
-        """Get all sections in a notebook."""
-        response = self.graph_client.call_graph_api(f"me/onenote/notebooks/{notebook_id}/sections")
-        return [
-            Section(
-                id=section["id"],
-                name=section["displayName"],
-                url=section["links"]["oneNoteWebUrl"]["href"],
-                notebook_id=notebook_id,
-                parent_section_group_id=section.get("parentSectionGroup", {}).get("id")
-            )
-            for section in response["value"]
-        ]
+        """Get all sections in a notebook, including those in section groups."""
+        return self.load_hierarchy().sections_in(notebook_id)
     
     def get_pages(self, section_id: str) -> List[Page]:
         """Get all pages in a section."""
-        response = self.graph_client.call_graph_api(f"me/onenote/sections/{section_id}/pages")
-        return [
-            Page(
-                id=page["id"],
-                title=page["title"],
-                url=page["links"]["oneNoteWebUrl"]["href"],
-                section_id=section_id,
-                content_url=page["contentUrl"]
-            )
-            for page in response["value"]
-        ]
+        return list(self.iter_pages(section_id))
     
-    def scan_notebook_for_images(self, notebook: Notebook) -> List[Page]:
-        """Scan a notebook for pages containing images."""
-        pages_with_images = []
+    def iter_page_images(self, section: Section) -> Iterator[PageImages]:
+        """Yield every page of a section that contains images, with its image references.
         
-        # Get all sections
-        sections = self.get_sections(notebook.id)
-        for section in sections:
-            # Get all pages in section
-            pages = self.get_pages(section.id)
-            for page in pages:
+        Each page's content is fetched and parsed exactly once; the contents
+        of one listing response are fetched together. The references are
+        remembered so ``download_page_images`` can skip the content fetch.
+        """
+        for pages in self.iter_page_batches(section.id):
+            contents = self._call_many([f"{self.onenote_root}/pages/{page.id}/content" for page in pages])
+            
+            for page, content_future in zip(pages, contents):
                 try:
-                    # Get page content
-                    content = self.graph_client.call_graph_api(f"me/onenote/pages/{page.id}/content")
-                    
-                    # Parse HTML content
-                    soup = BeautifulSoup(content, 'html.parser')
-                    images = soup.find_all('img')
-                    
-                    if images:
-                        logger.info(f"Found {len(images)} images in page: {page.title}")
-                        pages_with_images.append(page)
-                    else:
-                        logger.info(f"No images found in page: {page.title}")
-                        
+                    content = content_future.result()
+                    with trace_span(self.tracer, "parse.page_content", "parse", page_id=page.id):
+                        sources = extract_image_sources(content)
                 except Exception as e:
                     logger.error(f"Error scanning page {page.title}: {str(e)}")
                     continue
+                
+                if not sources:
+                    logger.info(f"No images found in page: {page.title}")
+                    continue
+                
+                logger.info(f"Found {len(sources)} images in page: {page.title}")
+                with self._scanned_lock:
+                    self._scanned_sources[page.id] = sources
+                yield PageImages(page=page, sources=sources)
+    
+    def scan_notebook_for_images(self, notebook: Notebook) -> List[Page]:
+        """Scan a notebook for pages containing images."""
+        return [
+            scanned.page
+            for section in self.get_sections(notebook.id)
+            for scanned in self.iter_page_images(section)
+        ]
+    
+    def harvest_notebook(self, notebook: Notebook) -> Dict[str, List[str]]:
+        """Scan a notebook and download every image in a single pass.
+        
+        Pages go to the download stage as soon as their content has been
+        scanned, so no page content is fetched twice.
+        
+        Returns:
+            Paths of the saved images by page id
+        """
+        harvested: Dict[str, List[str]] = {}
+        lock = threading.Lock()
+        
+        def download(scanned: PageImages) -> None:
+            paths = self._download_sources(scanned.page, scanned.sources)
+            with lock:
+                harvested[scanned.page.id] = paths
+        
+        pipeline = self._track_queues(Pipeline(self.pipeline_config.queue_size, on_error=self._on_stage_error))
+        pipeline.add_stage("scan", self.iter_page_images, self.pipeline_config.listing_workers)
+        pipeline.add_stage("download", download, self.pipeline_config.download_workers)
+        pipeline.run(self.get_sections(notebook.id))
         
-        return pages_with_images
+        if self.blob_store:
+            self.blob_store.save()
+        return harvested
     
-    def download_image(self, page: Page) -> Optional[str]:
-        """Download an image from a page."""
+    def download_page_images(self, page: Page) -> List[str]:
+        """Download every image of a page.
+        
+        The page content is only fetched if the page wasn't scanned before;
+        all of its images are downloaded concurrently.
+        
+        Returns:
+            Paths of the saved images, in document order
+        """
         try:
-            # Get page content
-            content = self.graph_client.call_graph_api(f"me/onenote/pages/{page.id}/content")
-            
-            # Parse HTML content
-            soup = BeautifulSoup(content, 'html.parser')
-            images = soup.find_all('img')
-            
-            if not images:
-                logger.warning("No images found in page")
-                return None
+            with self._scanned_lock:
+                sources = self._scanned_sources.get(page.id)
             
-            # Get the first image
-            img = images[0]
-            img_url = img.get('src')
+            if sources is None:
+                # Stream the page content straight into the extractor
+                with self.graph_client.call_graph_api(
+                    f"{self.onenote_root}/pages/{page.id}/content", response_type="stream"
+                ) as response:
+                    with trace_span(self.tracer, "parse.page_content", "parse", page_id=page.id, streamed=True):
+                        sources = extract_image_sources(response.iter_content(self.chunk_size))
             
-            if not img_url:
-                logger.warning("Image URL not found")
-                return None
-            
-            # Create folder structure
-            folder_path = self._create_folder_structure(page)
-            
-            # Generate filename
-            filename = f"{page.title.replace(' ', '_')}.png"
-            file_path = os.path.join(folder_path, filename)
-            
-            # Download image
-            logger.info(f"Downloading image from: {img_url}")
-            response = requests.get(img_url)
-            response.raise_for_status()
-            
-            # Save image
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
-            
-            logger.info(f"Image saved to: {file_path}")
-            return file_path
+            paths = self._download_sources(page, sources)
+            if self.blob_store:
+                self.blob_store.save()
+            return paths
             
         except Exception as e:
-            logger.error(f"Error downloading image: {str(e)}")
-            return None
+            logger.error(f"Error downloading images: {str(e)}")
+            return []
+    
+    def _download_sources(self, page: Page, sources: List[ImageSource]) -> List[str]:
+        """Download already extracted images of a page into its section folder."""
+        if not sources:
+            logger.warning("No images found in page")
+            return []
+        
+        # Create folder structure
+        folder_path = self._create_folder_structure(page)
+        
+        # Download all images concurrently
+        logger.info(f"Downloading {len(sources)} images from page: {page.title}")
+        results = self.resource_downloader.download(page, sources, folder_path)
+        
+        for result in results:
+            logger.info(f"Image saved to: {result.path} ({result.size} bytes, sha256 {result.sha256})")
+        return [result.path for result in results]
+    
+    def download_image(self, page: Page) -> Optional[str]:
+        """Download the images of a page and return the path of the first one."""
+        paths = self.download_page_images(page)
+        return paths[0] if paths else None
     
     def _create_folder_structure(self, page: Page) -> str:
         """Create folder structure based on page hierarchy."""
-        # Get section details
-        section = self.graph_client.call_graph_api(f"me/onenote/sections/{page.section_id}")
-        section_name = section["displayName"].replace(" ", "_")
-        
-        # Get notebook details
-        notebook_id = section["parentNotebook"]["id"]
-        notebook = self.graph_client.call_graph_api(f"me/onenote/notebooks/{notebook_id}")
-        notebook_name = notebook["displayName"].replace(" ", "_")
-        
-        # Create path components
-        path_components = [notebook_name, section_name]
-        
-        # Add section group if exists
-        if "parentSectionGroup" in section:
-            group = self.graph_client.call_graph_api(
-                f"me/onenote/sectionGroups/{section['parentSectionGroup']['id']}"
-            )
-            path_components.insert(1, group["displayName"].replace(" ", "_"))
+        notebook, groups, section = self.section_path(page.section_id)
+        
+        # Notebook, then every enclosing section group, then the section
+        path_components = [notebook.name, *(group.name for group in groups), section.name]
+        path_components = [component.replace(" ", "_") for component in path_components]
         
         # Create the full path
         folder_path = Path(self.output_dir).joinpath(*path_components)
@@ -347,6 +808,27 @@ class OneNoteImageFetcher:
         
         return str(folder_path)
     
+    def run_interactive(self) -> Optional[str]:
+        """Let the user pick a notebook and a page, then download the page's images.
+        
+        The scan already extracted every page's images, so the chosen page's
+        content is not fetched again.
+        
+        Returns:
+            Path of the first saved image, if any
+        """
+        notebook = self._select_notebook(list(self.load_hierarchy().notebooks.values()))
+        if not notebook:
+            return None
+        
+        pages = self.scan_notebook_for_images(notebook)
+        if not pages:
+            logger.info("No pages with images found")
+            return None
+        
+        page = self._select_page(pages)
+        return self.download_image(page) if page else None
+    
     def _select_notebook(self, notebooks: List[Notebook]) -> Optional[Notebook]:
         """Let user select a notebook."""
         logger.info("\nAvailable notebooks:")
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .models import Notebook, Section, SectionGroup
+from .pagination import aiter_graph_collection, iter_graph_collection
+from .query import MAX_TOP, NOTEBOOK_QUERY, SECTION_QUERY, GraphQuery
+
+logger = logging.getLogger(__name__)
+
+# Expands two levels of a container; deeper section groups are fetched in follow-up calls
+HIERARCHY_EXPAND = "sections,sectionGroups($expand=sections,sectionGroups)"
+
+# The same two levels with only the fields ``NotebookTree`` reads
+_GROUP_QUERY = GraphQuery(select=("id", "displayName"))
+_SECTIONS = GraphQuery(select=SECTION_QUERY.select).nested("sections")
+HIERARCHY_QUERY = GraphQuery(expand=(
+    _SECTIONS,
+    _GROUP_QUERY.expanding(_SECTIONS, _GROUP_QUERY.nested("sectionGroups")).nested("sectionGroups")
+))
+
+# Graph path of the signed-in user's notebooks; app-only tokens use users/{id}/onenote or sites/{id}/onenote
+DEFAULT_ONENOTE_ROOT = "me/onenote"
+
+def notebooks_endpoint(root: str = DEFAULT_ONENOTE_ROOT, projection: bool = True) -> str:
+    """Endpoint listing the notebooks below ``root`` with two levels expanded.
+
+    With ``projection`` only the fields the tree needs are requested, with
+    the largest page size.
+    """
+    if not projection:
+        return f"{root}/notebooks?$expand={HIERARCHY_EXPAND}"
+    return NOTEBOOK_QUERY.expanding(*HIERARCHY_QUERY.expand).limit(MAX_TOP).apply(f"{root}/notebooks")
+
+def section_group_endpoint(group_id: str, root: str = DEFAULT_ONENOTE_ROOT, projection: bool = True) -> str:
+    """Endpoint returning a section group with its next two levels expanded."""
+    if not projection:
+        return f"{root}/sectionGroups/{group_id}?$expand={HIERARCHY_EXPAND}"
+    return _GROUP_QUERY.expanding(*HIERARCHY_QUERY.expand).apply(f"{root}/sectionGroups/{group_id}")
+
+class NotebookTree:
+    """In-memory notebook / section group / section hierarchy.
+
+    Section groups can be nested to any depth. Containers (notebooks and
+    section groups) keep their children in the order Graph returned them.
+    """
+
+    def __init__(self):
+        self.notebooks: Dict[str, Notebook] = {}
+        self.section_groups: Dict[str, SectionGroup] = {}
+        self.sections: Dict[str, Section] = {}
+        self._sections_by_parent: Dict[str, List[str]] = defaultdict(list)
+        self._groups_by_parent: Dict[str, List[str]] = defaultdict(list)
+
+    def add_notebook(self, item: Dict) -> List[str]:
+        """Add an expanded notebook.
+
+        Returns:
+            Ids of section groups whose children were not expanded yet
+        """
+        notebook = Notebook(
+            id=item["id"],
+            name=item["displayName"],
+            url=item["links"]["oneNoteWebUrl"]["href"]
+        )
+        self.notebooks[notebook.id] = notebook
+        return self._add_children(item, notebook.id, None)
+
+    def expand_group(self, item: Dict) -> List[str]:
+        """Fill in the children of a section group fetched in a follow-up call.
+
+        Returns:
+            Ids of section groups whose children were not expanded yet
+        """
+        group = self.section_groups[item["id"]]
+        return self._add_children(item, group.notebook_id, group.id)
+
+    def _add_children(self, item: Dict, notebook_id: str, group_id: Optional[str]) -> List[str]:
+        """Add the sections and section groups of an expanded container."""
+        parent_id = group_id or notebook_id
+        pending = []
+
+        for section in item.get("sections", []):
+            self.sections[section["id"]] = Section(
+                id=section["id"],
+                name=section["displayName"],
+                url=section["links"]["oneNoteWebUrl"]["href"],
+                notebook_id=notebook_id,
+                parent_section_group_id=group_id
+            )
+            self._sections_by_parent[parent_id].append(section["id"])
+
+        for child in item.get("sectionGroups", []):
+            self.section_groups[child["id"]] = SectionGroup(
+                id=child["id"],
+                name=child["displayName"],
+                notebook_id=notebook_id,
+                parent_section_group_id=group_id
+            )
+            self._groups_by_parent[parent_id].append(child["id"])
+
+            if "sections" in child and "sectionGroups" in child:
+                pending.extend(self._add_children(child, notebook_id, child["id"]))
+            else:
+                pending.append(child["id"])
+
+        return pending
+
+    def find_notebook(self, name: str) -> Optional[Notebook]:
+        """Notebook with the given display name, if any."""
+        return next((notebook for notebook in self.notebooks.values() if notebook.name == name), None)
+
+    def sections_in(self, container_id: str) -> List[Section]:
+        """Every section below a notebook or section group, depth first."""
+        sections = [self.sections[section_id] for section_id in self._sections_by_parent.get(container_id, [])]
+        for group_id in self._groups_by_parent.get(container_id, []):
+            sections.extend(self.sections_in(group_id))
+        return sections
+
+    def path(self, section_id: str) -> Tuple[Notebook, List[SectionGroup], Section]:
+        """Notebook, section groups (outermost first) and section of a section id.
+
+        Raises:
+            KeyError: If the section is not part of the tree
+        """
+        section = self.sections[section_id]
+        groups = []
+        group_id = section.parent_section_group_id
+        while group_id:
+            group = self.section_groups[group_id]
+            groups.insert(0, group)
+            group_id = group.parent_section_group_id
+        return self.notebooks[section.notebook_id], groups, section
+
+class HierarchyLoader:
+    """Builds a ``NotebookTree`` with as few Graph calls as possible.
+
+    One listing call with ``$expand`` returns every notebook with two levels
+    of sections and section groups. Section groups nested deeper are
+    expanded in follow-up rounds, one round per two levels, with all groups
+    of a round fetched together.
+    """
+
+    def __init__(self, graph_client: Any, call_many: Optional[Callable[[List[str]], List[Future]]] = None,
+                 root: str = DEFAULT_ONENOTE_ROOT, projection: bool = True):
+        """Initialize the loader.
+
+        Args:
+            graph_client: Client implementing ``call_graph_api``
+            call_many: Function GETting several endpoints at once, such as
+                ``GraphAPIClient.call_graph_api_many`` (optional)
+            root: OneNote root such as ``me/onenote``,
+                ``users/{id}/onenote`` or ``sites/{id}/onenote``
+            projection: Request only the fields the tree needs
+        """
+        self.graph_client = graph_client
+        self.call_many = call_many or self._call_sequentially
+        self.root = root
+        self.projection = projection
+
+    def _call_sequentially(self, endpoints: List[str]) -> List[Future]:
+        """Fallback for clients without batching."""
+        futures = []
+        for endpoint in endpoints:
+            future = Future()
+            try:
+                future.set_result(self.graph_client.call_graph_api(endpoint))
+            except Exception as e:
+                future.set_exception(e)
+            futures.append(future)
+        return futures
+
+    def load(self) -> NotebookTree:
+        """Load the hierarchy of every notebook."""
+        tree = NotebookTree()
+        pending = []
+        for item in iter_graph_collection(self.graph_client, notebooks_endpoint(self.root, self.projection)):
+            pending.extend(tree.add_notebook(item))
+
+        while pending:
+            logger.debug(f"Expanding {len(pending)} nested section groups")
+            futures = self.call_many([
+                section_group_endpoint(group_id, self.root, self.projection) for group_id in pending
+            ])
+            pending = []
+            for future in futures:
+                pending.extend(tree.expand_group(future.result()))
+
+        return tree
+
+    async def aload(self) -> NotebookTree:
+        """Load the hierarchy of every notebook with an async client."""
+        tree = NotebookTree()
+        pending = []
+        async for item in aiter_graph_collection(self.graph_client, notebooks_endpoint(self.root, self.projection)):
+            pending.extend(tree.add_notebook(item))
+
+        while pending:
+            logger.debug(f"Expanding {len(pending)} nested section groups")
+            items = await asyncio.gather(*(
+                self.graph_client.call_graph_api(section_group_endpoint(group_id, self.root, self.projection))
+                for group_id in pending
+            ))
+            pending = []
+            for item in items:
+                pending.extend(tree.expand_group(item))
+
+        return tree
@@ -0,0 +1,221 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from .models import Page, Section
+
+logger = logging.getLogger(__name__)
+
+# Buffered writes that trigger a commit before the interval is over
+DEFAULT_BATCH_SIZE = 500
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS runs ("
+    " run_key TEXT PRIMARY KEY,"
+    " started_at REAL NOT NULL,"
+    " updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS sections ("
+    " run_key TEXT NOT NULL,"
+    " section_id TEXT NOT NULL,"
+    " name TEXT,"
+    " listed INTEGER NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (run_key, section_id)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS pages ("
+    " run_key TEXT NOT NULL,"
+    " page_id TEXT NOT NULL,"
+    " section_id TEXT NOT NULL,"
+    " data TEXT NOT NULL,"
+    " done INTEGER NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (run_key, page_id)) WITHOUT ROWID",
+)
+
+class CrawlJournal:
+    """Write-ahead record of a crawl's progress, so an interrupted crawl can resume.
+
+    For one run (identified by ``run_key``, e.g. the notebook being crawled)
+    the journal records the discovered sections, the pages found in each
+    section, which sections were listed completely and which pages were
+    downloaded. Reopening the journal after a crash restores that state:
+    listed sections are not listed again and finished pages are skipped.
+
+    Writes are buffered and committed by a background thread every
+    ``commit_interval`` seconds (or once ``batch_size`` writes are pending)
+    in a single transaction, so journaling costs one fsync per batch
+    instead of one per page. A crash loses at most the last batch, whose
+    pages are simply fetched again. Lookups are answered from memory.
+    """
+
+    def __init__(self, path: str, run_key: str, commit_interval: float = 1.0,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        """Open the journal and load the state of an interrupted run.
+
+        Args:
+            path: SQLite database file
+            run_key: Identifies the crawl, e.g. ``me/onenote:Notebook``
+            commit_interval: Maximum seconds a write stays uncommitted
+            batch_size: Pending writes that trigger an early commit
+        """
+        self.path = path
+        self.run_key = run_key
+        self.commit_interval = commit_interval
+        self.batch_size = batch_size
+        self.commits = 0
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+        self._lock = threading.Lock()
+        # Serializes use of the connection between the flusher and the crawl
+        self._db_lock = threading.Lock()
+        self._pending: List[Tuple[str, Tuple[Any, ...]]] = []
+        self._listed: Set[str] = set()
+        self._done: Set[str] = set()
+        self._pages: Dict[str, Dict[str, Page]] = {}
+        self.resumed = self._load()
+
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="crawl-journal", daemon=True)
+        self._flusher.start()
+
+    def _load(self) -> bool:
+        """Restore the state of an unfinished run; returns whether there was one."""
+        row = self._connection.execute("SELECT 1 FROM runs WHERE run_key = ?", (self.run_key,)).fetchone()
+        now = time.time()
+        if row is None:
+            self._connection.execute(
+                "INSERT INTO runs (run_key, started_at, updated_at) VALUES (?, ?, ?)",
+                (self.run_key, now, now)
+            )
+            return False
+
+        for (section_id,) in self._connection.execute(
+                "SELECT section_id FROM sections WHERE run_key = ? AND listed = 1", (self.run_key,)):
+            self._listed.add(section_id)
+        for section_id, data, done in self._connection.execute(
+                "SELECT section_id, data, done FROM pages WHERE run_key = ?", (self.run_key,)):
+            page = Page(**json.loads(data))
+            self._pages.setdefault(section_id, {})[page.id] = page
+            if done:
+                self._done.add(page.id)
+        return True
+
+    def _write(self, sql: str, params: Tuple[Any, ...]) -> None:
+        """Buffer a write for the next commit."""
+        with self._lock:
+            self._pending.append((sql, params))
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def record_sections(self, sections: Iterable[Section]) -> None:
+        """Record the sections discovered for the run."""
+        for section in sections:
+            self._write(
+                "INSERT OR IGNORE INTO sections (run_key, section_id, name) VALUES (?, ?, ?)",
+                (self.run_key, section.id, section.name)
+            )
+
+    def record_page(self, page: Page) -> None:
+        """Record a page found while listing its section."""
+        with self._lock:
+            self._pages.setdefault(page.section_id, {})[page.id] = page
+            done = page.id in self._done
+        self._write(
+            "INSERT OR REPLACE INTO pages (run_key, page_id, section_id, data, done) VALUES (?, ?, ?, ?, ?)",
+            (self.run_key, page.id, page.section_id, json.dumps(asdict(page)), int(done))
+        )
+
+    def mark_listed(self, section_id: str) -> None:
+        """Record that every page of a section was recorded."""
+        with self._lock:
+            self._listed.add(section_id)
+        self._write(
+            "UPDATE sections SET listed = 1 WHERE run_key = ? AND section_id = ?",
+            (self.run_key, section_id)
+        )
+
+    def mark_done(self, page_id: str) -> None:
+        """Record that a page was downloaded."""
+        with self._lock:
+            self._done.add(page_id)
+        self._write("UPDATE pages SET done = 1 WHERE run_key = ? AND page_id = ?", (self.run_key, page_id))
+
+    def is_listed(self, section_id: str) -> bool:
+        """Whether an earlier attempt of the run listed the section completely."""
+        with self._lock:
+            return section_id in self._listed
+
+    def is_done(self, page_id: str) -> bool:
+        """Whether a page was already downloaded in this run."""
+        with self._lock:
+            return page_id in self._done
+
+    def pages(self, section_id: str) -> List[Page]:
+        """Recorded pages of a section."""
+        with self._lock:
+            return list(self._pages.get(section_id, {}).values())
+
+    def progress(self) -> Tuple[int, int]:
+        """Number of listed sections and of downloaded pages."""
+        with self._lock:
+            return len(self._listed), len(self._done)
+
+    def flush(self) -> None:
+        """Commit every buffered write in one transaction."""
+        with self._db_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+
+            connection = self._connection
+            connection.execute("BEGIN")
+            try:
+                for sql, params in pending:
+                    connection.execute(sql, params)
+                connection.execute("UPDATE runs SET updated_at = ? WHERE run_key = ?", (time.time(), self.run_key))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                with self._lock:
+                    self._pending[:0] = pending
+                raise
+            self.commits += 1
+
+    def _flush_loop(self) -> None:
+        """Background thread committing the buffered writes."""
+        while not self._closed:
+            self._wake.wait(self.commit_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Error writing crawl journal: {e}")
+
+    def finish(self) -> None:
+        """Forget the run after it completed, so the next crawl starts fresh."""
+        with self._db_lock:
+            with self._lock:
+                self._pending = []
+                self._listed.clear()
+                self._done.clear()
+                self._pages.clear()
+            for table in ("pages", "sections", "runs"):
+                self._connection.execute(f"DELETE FROM {table} WHERE run_key = ?", (self.run_key,))
+
+    def close(self) -> None:
+        """Commit the remaining writes and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        self._connection.close()
@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterable, List, Optional
+
+from ..utils.atomic_writer import AtomicFileWriter, WriteResult
+from .models import Page
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+@dataclass
+class ManifestEntry:
+    """What the last sync wrote for one page."""
+    page_id: str
+    section_id: str
+    notebook_id: Optional[str]
+    last_modified: Optional[str]
+    files: Dict[str, str] = field(default_factory=dict)  # path -> sha256
+
+class SyncManifest:
+    """On-disk record of synced pages, used to skip unchanged ones.
+
+    A page is unchanged when its ``lastModifiedDateTime`` matches the
+    manifest and every file written for it still exists. Pages that
+    disappear from a fully listed section are pruned together with their
+    files.
+    """
+
+    def __init__(self, path: str):
+        """Load the manifest at ``path`` (a missing file means an empty manifest)."""
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        """Read the manifest from disk."""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.entries = {
+                    page_id: ManifestEntry(**entry)
+                    for page_id, entry in data.get("pages", {}).items()
+                }
+        except Exception as e:
+            logger.error(f"Error loading sync manifest, starting a full sync: {e}")
+            self.entries = {}
+
+    def save(self) -> None:
+        """Atomically write the manifest if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": MANIFEST_VERSION,
+                "pages": {page_id: asdict(entry) for page_id, entry in self.entries.items()}
+            }
+            self._dirty = False
+
+        with AtomicFileWriter(self.path) as writer:
+            writer.write(json.dumps(data, indent=1).encode("utf-8"))
+            writer.commit(fix_extension=False)
+
+    def is_unchanged(self, page: Page) -> bool:
+        """Whether a page can be skipped because nothing changed since the last sync."""
+        with self._lock:
+            entry = self.entries.get(page.id)
+        if entry is None or not page.last_modified or entry.last_modified != page.last_modified:
+            return False
+        if entry.section_id != page.section_id:
+            # Moved pages are fetched again so pruning the old section can't remove their files
+            return False
+        return bool(entry.files) and all(os.path.exists(path) for path in entry.files)
+
+    def record(self, page: Page, results: Iterable[WriteResult], notebook_id: Optional[str] = None) -> None:
+        """Remember the files written for a page."""
+        entry = ManifestEntry(
+            page_id=page.id,
+            section_id=page.section_id,
+            notebook_id=notebook_id,
+            last_modified=page.last_modified,
+            files={result.path: result.sha256 for result in results}
+        )
+        with self._lock:
+            previous = self.entries.get(page.id)
+            self.entries[page.id] = entry
+            self._dirty = True
+
+        # Drop files the page no longer produces, e.g. after an extension fix
+        if previous:
+            self._remove_files(path for path in previous.files if path not in entry.files)
+
+    def prune_section(self, section_id: str, seen_page_ids: Iterable[str]) -> List[str]:
+        """Forget pages of a fully listed section that no longer exist upstream.
+
+        Returns:
+            Ids of the pruned pages
+        """
+        seen = set(seen_page_ids)
+        return self._prune(lambda entry: entry.section_id == section_id and entry.page_id not in seen)
+
+    def prune_notebook(self, notebook_id: str, seen_section_ids: Iterable[str]) -> List[str]:
+        """Forget pages of sections that no longer exist in a fully listed notebook.
+
+        Returns:
+            Ids of the pruned pages
+        """
+        seen = set(seen_section_ids)
+        return self._prune(lambda entry: entry.notebook_id == notebook_id and entry.section_id not in seen)
+
+    def _prune(self, predicate) -> List[str]:
+        """Remove matching entries and their files."""
+        with self._lock:
+            removed = [entry for entry in self.entries.values() if predicate(entry)]
+            for entry in removed:
+                del self.entries[entry.page_id]
+            if removed:
+                self._dirty = True
+
+        for entry in removed:
+            self._remove_files(entry.files)
+        return [entry.page_id for entry in removed]
+
+    @staticmethod
+    def _remove_files(paths: Iterable[str]) -> None:
+        """Delete files, ignoring ones that are already gone."""
+        for path in paths:
+            try:
+                os.remove(path)
+                logger.info(f"Removed stale file: {path}")
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Optional, Tuple, Type, TypeVar, Union
+
+from .models import Notebook, Section, SectionGroup
+
+logger = logging.getLogger(__name__)
+
+Metadata = Union[Notebook, SectionGroup, Section]
+
+T = TypeVar("T", Notebook, SectionGroup, Section)
+
+class MetadataCache:
+    """Thread-safe TTL cache for notebooks, section groups and sections.
+
+    Lookups that miss call a loader, but concurrent misses for the same
+    object share a single in-flight load (single-flight), so a thousand
+    workers asking for one section cause one Graph call. Listing responses
+    can seed the cache so later lookups need no call at all.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        """Initialize an empty cache.
+
+        Args:
+            ttl: Seconds an object is served before it is loaded again
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[type, str], Tuple[Metadata, float]] = {}
+        self._in_flight: Dict[Tuple[type, str], Future] = {}
+        self.hits = 0
+        self.loads = 0
+
+    def peek(self, kind: Type[T], object_id: str) -> Optional[T]:
+        """Return a cached object that has not expired, without loading it."""
+        with self._lock:
+            return self._fresh((kind, object_id))
+
+    def _fresh(self, key: Tuple[type, str]) -> Optional[Metadata]:
+        """Cached value of ``key`` unless expired; the lock must be held."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    def get(self, kind: Type[T], object_id: str, loader: Callable[[], T]) -> T:
+        """Return an object, loading it at most once however many threads ask.
+
+        Args:
+            kind: ``Notebook``, ``SectionGroup`` or ``Section``
+            object_id: Graph id of the object
+            loader: Called to fetch the object on a miss
+
+        Raises:
+            Whatever the loader raised, in every waiting thread
+        """
+        key = (kind, object_id)
+        with self._lock:
+            value = self._fresh(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self.loads += 1
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            del self._in_flight[key]
+        future.set_result(value)
+        return value
+
+    def put(self, value: Metadata) -> None:
+        """Add or refresh a single object."""
+        self.seed([value])
+
+    def seed(self, values: Iterable[Metadata]) -> None:
+        """Add objects taken from listing responses."""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for value in values:
+                self._entries[(type(value), value.id)] = (value, expires_at)
+
+    def invalidate(self, kind: Optional[type] = None, object_id: Optional[str] = None) -> None:
+        """Drop one object, every object of a kind, or everything."""
+        with self._lock:
+            if kind is not None and object_id is not None:
+                self._entries.pop((kind, object_id), None)
+            else:
+                for key in [key for key in self._entries if kind is None or key[0] is kind]:
+                    del self._entries[key]
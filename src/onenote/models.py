@@ -8,6 +8,14 @@ class Notebook:
     name: str
     url: str
 
+@dataclass
+class SectionGroup:
+    """Represents a OneNote section group."""
+    id: str
+    name: str
+    notebook_id: str
+    parent_section_group_id: Optional[str] = None
+
 @dataclass
 class Section:
     """Represents a OneNote section."""
@@ -25,6 +33,7 @@ class Page:
     url: str
     section_id: str
     content_url: Optional[str] = None
+    last_modified: Optional[str] = None
 
 @dataclass
 class Image:
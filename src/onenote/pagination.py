@@ -0,0 +1,47 @@
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+def iter_graph_pages(graph_client: Any, endpoint: str, **kwargs) -> Iterator[List[Dict]]:
+    """Yield each page of a Graph collection as it arrives.
+    
+    The next page is only requested once the caller asks for it, so work on
+    the first batch can start before the rest of the listing is known.
+    
+    Args:
+        graph_client: Client implementing ``call_graph_api``
+        endpoint: Collection endpoint to list
+        **kwargs: Additional arguments for the first request
+        
+    Yields:
+        The ``value`` list of each response
+    """
+    next_endpoint = endpoint
+    page_number = 0
+    while next_endpoint:
+        response = graph_client.call_graph_api(next_endpoint, **kwargs)
+        page_number += 1
+        items = response.get("value", [])
+        logger.debug(f"Received page {page_number} of {endpoint} with {len(items)} items")
+        yield items
+        
+        # The next link already carries the original query parameters
+        next_endpoint = response.get("@odata.nextLink")
+        kwargs = {}
+
+def iter_graph_collection(graph_client: Any, endpoint: str, **kwargs) -> Iterator[Dict]:
+    """Yield every item of a Graph collection, following ``@odata.nextLink`` lazily."""
+    for items in iter_graph_pages(graph_client, endpoint, **kwargs):
+        yield from items
+
+async def aiter_graph_collection(graph_client: Any, endpoint: str, **kwargs) -> AsyncIterator[Dict]:
+    """Asynchronously yield every item of a Graph collection, following ``@odata.nextLink`` lazily."""
+    next_endpoint = endpoint
+    while next_endpoint:
+        response = await graph_client.call_graph_api(next_endpoint, **kwargs)
+        for item in response.get("value", []):
+            yield item
+        
+        next_endpoint = response.get("@odata.nextLink")
+        kwargs = {}
@@ -0,0 +1,148 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_STOP = object()
+
+@dataclass
+class PipelineConfig:
+    """Worker and queue sizing for the staged fetch pipeline."""
+    listing_workers: int = 2
+    preview_workers: int = 4
+    download_workers: int = 8
+    write_workers: int = 2
+    queue_size: int = 64
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PipelineConfig":
+        """Build the pipeline settings from the application configuration."""
+        defaults = cls()
+        return cls(
+            listing_workers=config.get("listing_workers", defaults.listing_workers),
+            preview_workers=config.get("preview_workers", defaults.preview_workers),
+            download_workers=config.get("download_workers", defaults.download_workers),
+            write_workers=config.get("write_workers", defaults.write_workers),
+            queue_size=config.get("pipeline_queue_size", defaults.queue_size)
+        )
+
+class Stage:
+    """A pool of worker threads that consumes one queue and feeds the next."""
+
+    def __init__(self, name: str, handler: Callable[[Any], Optional[Iterable[Any]]],
+                 workers: int, inbox: queue.Queue, outbox: Optional[queue.Queue],
+                 on_error: Optional[Callable[[str, Any, Exception], None]] = None):
+        """Initialize the stage.
+
+        Args:
+            name: Stage name used in thread names and logs
+            handler: Callable processing one item and returning the items for
+                the next stage (or None to emit nothing)
+            workers: Number of worker threads
+            inbox: Queue the stage reads from
+            outbox: Queue the stage writes to, None for the last stage
+            on_error: Called with (stage name, item, exception) when the
+                handler raises
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.inbox = inbox
+        self.outbox = outbox
+        self.on_error = on_error
+        self.threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work,
+                name=f"{self.name}-{i}",
+                daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self) -> None:
+        """Signal every worker that no more input will arrive and wait for them."""
+        for _ in self.threads:
+            self.inbox.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+
+    def _work(self) -> None:
+        """Process items until the stop marker is received."""
+        while True:
+            item = self.inbox.get()
+            if item is _STOP:
+                return
+
+            try:
+                results = self.handler(item)
+                if results is not None and self.outbox is not None:
+                    for result in results:
+                        # Blocks while the next stage is saturated
+                        self.outbox.put(result)
+            except Exception as e:
+                if not self.on_error:
+                    logger.exception(f"Unhandled error in stage {self.name}")
+                    continue
+                try:
+                    self.on_error(self.name, item, e)
+                except Exception:
+                    # A dead worker would leave the stages before it blocked on a full queue
+                    logger.exception(f"Error handler of stage {self.name} failed")
+
+class Pipeline:
+    """Chain of stages connected by bounded queues.
+
+    Each queue holds at most ``queue_size`` items, so a slow stage makes the
+    stages before it wait instead of buffering the whole crawl in memory.
+    """
+
+    def __init__(self, queue_size: int = 64,
+                 on_error: Optional[Callable[[str, Any, Exception], None]] = None):
+        """Initialize an empty pipeline."""
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self._stages: List[tuple] = []
+        self._queues: Dict[str, queue.Queue] = {}
+
+    def add_stage(self, name: str, handler: Callable[[Any], Optional[Iterable[Any]]],
+                  workers: int) -> "Pipeline":
+        """Append a stage to the pipeline."""
+        self._stages.append((name, handler, workers))
+        return self
+
+    def depths(self) -> Dict[str, int]:
+        """Items waiting in each stage's input queue while the pipeline runs."""
+        return {name: inbox.qsize() for name, inbox in list(self._queues.items())}
+
+    def run(self, items: Iterable[Any]) -> None:
+        """Feed items into the first stage and wait until every stage has drained.
+
+        Args:
+            items: Input for the first stage; consumed lazily
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self._stages]
+        self._queues = {name: inbox for (name, _, _), inbox in zip(self._stages, queues)}
+        stages = []
+        for index, (name, handler, workers) in enumerate(self._stages):
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            stages.append(Stage(name, handler, workers, queues[index], outbox, self.on_error))
+
+        for stage in stages:
+            stage.start()
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            # Drain stage by stage so every item reaches the end
+            for stage in stages:
+                stage.stop()
+            self._queues = {}
@@ -0,0 +1,83 @@
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+# Largest page size the OneNote API accepts for $top
+MAX_TOP = 100
+
+# Characters left unescaped in query option values; OData needs them literally
+_SAFE = "$,()=;/'"
+
+@dataclass(frozen=True)
+class GraphQuery:
+    """OData query options of a Graph request.
+
+    Queries are immutable; the builder methods return a modified copy, so
+    the per-model queries below can be shared and refined:
+
+        PAGE_QUERY.limit(MAX_TOP).ordered_by("createdDateTime").apply("me/onenote/sections/1/pages")
+    """
+    select: Tuple[str, ...] = ()
+    expand: Tuple[str, ...] = ()
+    top: Optional[int] = None
+    orderby: Optional[str] = None
+
+    def selecting(self, *fields: str) -> "GraphQuery":
+        """Also return ``fields`` (``$select``)."""
+        return replace(self, select=self.select + tuple(field for field in fields if field not in self.select))
+
+    def expanding(self, *relations: str) -> "GraphQuery":
+        """Also expand ``relations`` (``$expand``); a relation may be a nested query, see ``nested``."""
+        return replace(self, expand=self.expand + tuple(relations))
+
+    def limit(self, top: int) -> "GraphQuery":
+        """Return at most ``top`` items per response (``$top``), capped at ``MAX_TOP``."""
+        if top < 1:
+            raise ValueError(f"$top must be at least 1, got {top}")
+        return replace(self, top=min(top, MAX_TOP))
+
+    def ordered_by(self, orderby: Optional[str]) -> "GraphQuery":
+        """Sort the collection (``$orderby``), e.g. ``title`` or ``createdDateTime desc``; None keeps Graph's order."""
+        return replace(self, orderby=orderby or None)
+
+    def without_projection(self) -> "GraphQuery":
+        """The query without ``$select``, ``$expand`` and ``$top``, keeping only the order."""
+        return GraphQuery(orderby=self.orderby)
+
+    def _options(self) -> List[Tuple[str, str]]:
+        options = []
+        if self.select:
+            options.append(("$select", ",".join(self.select)))
+        if self.expand:
+            options.append(("$expand", ",".join(self.expand)))
+        if self.top is not None:
+            options.append(("$top", str(self.top)))
+        if self.orderby:
+            options.append(("$orderby", self.orderby))
+        return options
+
+    def nested(self, relation: str) -> str:
+        """``relation`` expanded with this query, e.g. ``sections($select=id,displayName)``."""
+        options = ";".join(f"{name}={value}" for name, value in self._options())
+        return f"{relation}({options})" if options else relation
+
+    def query_string(self) -> str:
+        """The options as a URL query string, without the leading ``?``."""
+        return "&".join(f"{name}={quote(value, safe=_SAFE)}" for name, value in self._options())
+
+    def apply(self, endpoint: str) -> str:
+        """Append the options to ``endpoint``, keeping any query it already has."""
+        query = self.query_string()
+        if not query:
+            return endpoint
+        return f"{endpoint}{'&' if '?' in endpoint else '?'}{query}"
+
+# Only the id of a parent is read, e.g. to place a section in its section group
+PARENT_NOTEBOOK = GraphQuery(select=("id",)).nested("parentNotebook")
+PARENT_SECTION_GROUP = GraphQuery(select=("id",)).nested("parentSectionGroup")
+
+# The fields each model in models.py is built from
+NOTEBOOK_QUERY = GraphQuery(select=("id", "displayName", "links"))
+SECTION_QUERY = GraphQuery(select=("id", "displayName", "links"), expand=(PARENT_NOTEBOOK, PARENT_SECTION_GROUP))
+SECTION_GROUP_QUERY = GraphQuery(select=("id", "displayName"), expand=(PARENT_NOTEBOOK, PARENT_SECTION_GROUP))
+PAGE_QUERY = GraphQuery(select=("id", "title", "links", "contentUrl", "lastModifiedDateTime"))
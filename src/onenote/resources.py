@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Union
+
+from ..utils.atomic_writer import (
+    CONTENT_TYPE_EXTENSIONS, DEFAULT_CHUNK_SIZE, WriteResult, replace_extension, write_stream_atomic
+)
+from ..utils.blob_store import BlobInfo, BlobStore
+from ..utils.http_session import GRAPH_ROOT
+from ..utils.metrics import observe_write
+from ..utils.tracing import trace_span
+from .extractor import ImageSource, extract_resource_references
+from .models import Page
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PageImages:
+    """A page together with the images found in its content."""
+    page: Page
+    sources: List[ImageSource]
+
+def extract_image_sources(content: Union[str, bytes, Iterable[Union[str, bytes]]]) -> List[ImageSource]:
+    """Find every image on a page, preferring the full-resolution rendition.
+
+    Args:
+        content: The page's HTML content, as text or as streamed chunks
+
+    Returns:
+        The images in document order
+    """
+    return [reference for reference in extract_resource_references(content) if reference.tag == "img"]
+
+def safe_filename(name: str) -> str:
+    """Turn a page title into a file name that is valid on every platform."""
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", name.replace(" ", "_")).strip(". ")
+    return name or "untitled"
+
+class PageResourceDownloader:
+    """Downloads every image of a page concurrently through the Graph client.
+
+    Images are fetched with up to ``fanout`` downloads in flight, so a page
+    takes about as long as its slowest image. Graph resource URLs are
+    fetched with the access token; other hosts never see it. With a blob
+    store, resources downloaded before are linked instead of fetched again
+    and identical files share one copy on disk.
+    """
+
+    def __init__(self, graph_client: Any, fanout: int = 16, fsync_policy: str = "file",
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, blob_store: Optional[BlobStore] = None):
+        """Initialize the downloader.
+
+        Args:
+            graph_client: Client implementing ``download``
+            fanout: Maximum concurrent downloads per page
+            fsync_policy: fsync policy for the written files
+            chunk_size: Bytes read per chunk while streaming
+            blob_store: Store used to deduplicate downloads (optional)
+        """
+        self.graph_client = graph_client
+        self.tracer = getattr(graph_client, "tracer", None)
+        self.blob_store = blob_store
+        self.fanout = max(1, fanout)
+        self.fsync_policy = fsync_policy
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def image_filename(page: Page, index: int, source: ImageSource) -> str:
+        """Deterministic file name of the ``index``-th image on a page.
+
+        Titles repeat within a section (untitled pages, "Meeting notes"), so
+        a short hash of the page id keeps the images of such pages apart.
+        """
+        extension = CONTENT_TYPE_EXTENSIONS.get(source.content_type or "", ".png")
+        page_key = hashlib.sha1(page.id.encode("utf-8")).hexdigest()[:8]
+        return f"{safe_filename(page.title)}_{page_key}_{index:03d}{extension}"
+
+    def download(self, page: Page, sources: List[ImageSource], folder_path: str) -> List[WriteResult]:
+        """Download the given images of a page into a folder.
+
+        Args:
+            page: The page the images belong to
+            sources: The page's images, e.g. from ``extract_image_sources``
+            folder_path: Directory to write the images to
+
+        Returns:
+            The written files, in document order; failed images are left out
+        """
+        if not sources:
+            return []
+
+        targets = [
+            os.path.join(folder_path, self.image_filename(page, index, source))
+            for index, source in enumerate(sources, 1)
+        ]
+
+        with ThreadPoolExecutor(max_workers=min(self.fanout, len(sources))) as executor:
+            futures = [
+                executor.submit(self._download_one, source, target)
+                for source, target in zip(sources, targets)
+            ]
+
+        results = []
+        for source, future in zip(sources, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Error downloading image {source.url} from page {page.title}: {str(e)}")
+        return results
+
+    def _download_one(self, source: ImageSource, target: str) -> WriteResult:
+        """Stream one image to disk, or link it if the blob store already has it."""
+        resource_id = source.resource_id
+        if self.blob_store and resource_id:
+            known = self.blob_store.lookup_resource(resource_id)
+            if known:
+                path = replace_extension(target, known.content_type)
+                self.blob_store.link(known.sha256, path)
+                return WriteResult(path=path, size=known.size, sha256=known.sha256,
+                                   content_type=known.content_type)
+
+        authenticated = source.url.startswith(getattr(self.graph_client, "graph_root", GRAPH_ROOT))
+        response = self.graph_client.download(source.url, authenticated=authenticated, stream=True)
+        try:
+            response.raise_for_status()
+            with trace_span(self.tracer, "write.resource", "disk") as span:
+                result = write_stream_atomic(
+                    response.iter_content(self.chunk_size),
+                    target,
+                    self.fsync_policy
+                )
+                span.set(bytes=result.size, disk_ms=round(result.disk_seconds * 1000, 3))
+        finally:
+            response.close()
+        observe_write(getattr(self.graph_client, "metrics", None), result, "resource")
+
+        if self.blob_store:
+            self.blob_store.adopt(result.path, result.sha256)
+            if resource_id:
+                self.blob_store.remember_resource(
+                    resource_id,
+                    BlobInfo(sha256=result.sha256, size=result.size, content_type=result.content_type)
+                )
+        return result
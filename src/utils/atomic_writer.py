@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How hard to push written files to disk before they are renamed into place
+FSYNC_POLICIES = ("none", "file", "full")
+
+# Bytes kept from the start of a file to detect its type
+SNIFF_LENGTH = 64
+
+# Extensions accepted as matching a sniffed type
+_EXTENSION_ALIASES = {".jpg": (".jpg", ".jpeg"), ".tif": (".tif", ".tiff")}
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# File extensions for the content types OneNote pages reference
+CONTENT_TYPE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/bmp": ".bmp",
+    "image/tiff": ".tif",
+    "image/webp": ".webp",
+    "image/emf": ".emf",
+    "image/x-emf": ".emf",
+    "application/pdf": ".pdf",
+}
+
+def replace_extension(path: str, content_type: Optional[str]) -> str:
+    """Give ``path`` the extension matching ``content_type`` unless it already has one of its aliases."""
+    extension = CONTENT_TYPE_EXTENSIONS.get(content_type or "")
+    if not extension:
+        return path
+    root, current = os.path.splitext(path)
+    if current.lower() in _EXTENSION_ALIASES.get(extension, (extension,)):
+        return path
+    return root + extension
+
+def sniff_content_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """Detect a file type from its first bytes.
+
+    Returns:
+        A (content type, extension) tuple, or None if the type is unknown
+    """
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png", ".png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg", ".jpg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif", ".gif"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    if head.startswith((b"II*\x00", b"MM\x00*")):
+        return "image/tiff", ".tif"
+    if head.startswith(b"BM"):
+        return "image/bmp", ".bmp"
+    if head.startswith(b"\x01\x00\x00\x00") and head[40:44] == b" EMF":
+        return "image/emf", ".emf"
+    if head.startswith(b"%PDF"):
+        return "application/pdf", ".pdf"
+    return None
+
+@dataclass
+class WriteResult:
+    """Outcome of an atomic file write."""
+    path: str
+    size: int
+    sha256: str
+    content_type: Optional[str] = None
+    # Time spent writing, syncing and renaming, without waiting for the data
+    disk_seconds: float = 0.0
+
+class AtomicFileWriter:
+    """Streams data into a temporary file and renames it into place on commit.
+
+    The temporary file lives in the target directory so the final rename is
+    atomic; a crash before ``commit`` leaves only a hidden ``.part`` file,
+    never a truncated image under the real name. The checksum and content
+    type are computed while the data streams through.
+    """
+
+    def __init__(self, target_path: str, fsync_policy: str = "file"):
+        """Open a temporary file next to the target.
+
+        Args:
+            target_path: Final path of the file
+            fsync_policy: ``none`` to skip fsync, ``file`` to fsync the file
+                before renaming it, ``full`` to also fsync the directory
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+
+        self.target_path = target_path
+        self.fsync_policy = fsync_policy
+        self.size = 0
+        self.disk_seconds = 0.0
+        self.committed = False
+        self._hash = hashlib.sha256()
+        self._head = b""
+
+        directory = os.path.dirname(os.path.abspath(target_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(
+            dir=directory,
+            prefix=f".{os.path.basename(target_path)}.",
+            suffix=".part"
+        )
+        self._file = os.fdopen(fd, "wb")
+
+    def __enter__(self) -> "AtomicFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is not None:
+            self.abort()
+
+    def write(self, chunk: bytes) -> None:
+        """Append a chunk to the temporary file."""
+        if not chunk:
+            return
+        if len(self._head) < SNIFF_LENGTH:
+            self._head += chunk[:SNIFF_LENGTH - len(self._head)]
+        self._hash.update(chunk)
+        started = time.perf_counter()
+        self._file.write(chunk)
+        self.disk_seconds += time.perf_counter() - started
+        self.size += len(chunk)
+
+    def write_all(self, chunks: Iterable[bytes]) -> None:
+        """Append every chunk of an iterable, such as ``response.iter_content()``."""
+        for chunk in chunks:
+            self.write(chunk)
+
+    @property
+    def content_type(self) -> Optional[str]:
+        """Content type detected from the data written so far."""
+        sniffed = sniff_content_type(self._head)
+        return sniffed[0] if sniffed else None
+
+    def commit(self, fix_extension: bool = True) -> WriteResult:
+        """Flush the data and atomically move it to the target path.
+
+        Args:
+            fix_extension: Replace the target's extension with the one
+                matching the sniffed content type
+
+        Returns:
+            The final path, size, checksum and content type
+        """
+        started = time.perf_counter()
+        try:
+            self._file.flush()
+            if self.fsync_policy != "none":
+                os.fsync(self._file.fileno())
+            self._file.close()
+
+            target_path = self.target_path
+            sniffed = sniff_content_type(self._head)
+            if fix_extension and sniffed:
+                target_path = replace_extension(target_path, sniffed[0])
+
+            os.replace(self.temp_path, target_path)
+
+            if self.fsync_policy == "full" and hasattr(os, "O_DIRECTORY"):
+                dir_fd = os.open(os.path.dirname(os.path.abspath(target_path)), os.O_DIRECTORY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+        except BaseException:
+            self.abort()
+            raise
+        self.disk_seconds += time.perf_counter() - started
+        self.committed = True
+
+        return WriteResult(
+            path=target_path,
+            size=self.size,
+            sha256=self._hash.hexdigest(),
+            content_type=sniffed[0] if sniffed else None,
+            disk_seconds=self.disk_seconds
+        )
+
+    def abort(self) -> None:
+        """Discard the temporary file."""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+def write_stream_atomic(chunks: Iterable[bytes], target_path: str, fsync_policy: str = "file",
+                        fix_extension: bool = True) -> WriteResult:
+    """Stream chunks into ``target_path`` atomically.
+
+    Args:
+        chunks: Data to write, e.g. ``response.iter_content(DEFAULT_CHUNK_SIZE)``
+        target_path: Final path of the file
+        fsync_policy: One of ``FSYNC_POLICIES``
+        fix_extension: Correct the extension from the sniffed content type
+
+    Returns:
+        The final path, size, checksum and content type
+    """
+    with AtomicFileWriter(target_path, fsync_policy) as writer:
+        writer.write_all(chunks)
+        return writer.commit(fix_extension)
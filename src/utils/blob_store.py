@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+from .atomic_writer import AtomicFileWriter
+
+logger = logging.getLogger(__name__)
+
+LINK_MODES = ("hardlink", "symlink", "copy")
+
+INDEX_FILENAME = "resources.json"
+
+# Present once hardlinks into the store failed (e.g. across file systems); the store then copies for good
+COPY_FALLBACK_FILENAME = "copy-fallback"
+
+@dataclass
+class BlobInfo:
+    """What the store knows about a downloaded resource."""
+    sha256: str
+    size: int
+    content_type: Optional[str] = None
+
+class BlobStore:
+    """Content-addressable store for downloaded files.
+
+    Every distinct file is kept once under ``objects/<first two hex
+    digits>/<sha256>``; the per-section paths are hardlinks (or symlinks or
+    copies, depending on ``link_mode``) to it. An index from Graph resource
+    id to content hash lets callers skip downloading resources they already
+    have.
+
+    If a hardlink fails, the store switches to ``copy`` mode for good and
+    stops collecting garbage, since copied blobs have a link count of one
+    while still in use.
+    """
+
+    def __init__(self, root: str, link_mode: str = "hardlink"):
+        """Open (or create) a store.
+
+        Args:
+            root: Directory of the store
+            link_mode: How per-section paths refer to blobs: ``hardlink``,
+                ``symlink`` or ``copy``
+        """
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {link_mode}")
+
+        self.root = root
+        self.link_mode = link_mode
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, INDEX_FILENAME)
+        self.fallback_path = os.path.join(root, COPY_FALLBACK_FILENAME)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        if link_mode == "hardlink" and os.path.exists(self.fallback_path):
+            self.link_mode = "copy"
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._index: Dict[str, BlobInfo] = self._load_index()
+
+    def _load_index(self) -> Dict[str, BlobInfo]:
+        """Read the resource index from disk."""
+        try:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    return {
+                        resource_id: BlobInfo(**info)
+                        for resource_id, info in json.load(f).items()
+                    }
+        except Exception as e:
+            logger.error(f"Error loading blob index: {e}")
+        return {}
+
+    def save(self) -> None:
+        """Atomically write the resource index if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {resource_id: asdict(info) for resource_id, info in self._index.items()}
+            self._dirty = False
+
+        with AtomicFileWriter(self.index_path) as writer:
+            writer.write(json.dumps(data).encode("utf-8"))
+            writer.commit(fix_extension=False)
+
+    def blob_path(self, sha256: str) -> str:
+        """Path of the blob with a given hash."""
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def has(self, sha256: str) -> bool:
+        """Whether the store holds a blob."""
+        return os.path.exists(self.blob_path(sha256))
+
+    def lookup_resource(self, resource_id: str) -> Optional[BlobInfo]:
+        """Blob of an already downloaded resource, if the blob still exists."""
+        with self._lock:
+            info = self._index.get(resource_id)
+        if info and self.has(info.sha256):
+            return info
+        return None
+
+    def remember_resource(self, resource_id: str, info: BlobInfo) -> None:
+        """Record which blob a resource id resolves to."""
+        with self._lock:
+            self._index[resource_id] = info
+            self._dirty = True
+
+    def adopt(self, path: str, sha256: str) -> None:
+        """Move a freshly written file into the store and leave a link in its place.
+
+        If the store already has the content, the file is replaced by a link
+        to the existing blob, freeing the duplicate.
+        """
+        blob = self.blob_path(sha256)
+        if os.path.exists(blob):
+            self.link(sha256, path)
+            return
+
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        try:
+            if self.link_mode == "hardlink":
+                os.link(path, blob)
+                return
+            shutil.copyfile(path, blob)
+        except FileExistsError:
+            # Another worker stored the same content meanwhile
+            self.link(sha256, path)
+            return
+        except OSError as e:
+            self._fall_back_to_copy(e)
+            shutil.copyfile(path, blob)
+            return
+
+        if self.link_mode == "symlink":
+            self.link(sha256, path)
+
+    def link(self, sha256: str, path: str) -> None:
+        """Atomically make ``path`` refer to a blob."""
+        blob = self.blob_path(sha256)
+        if self._refers_to(path, blob):
+            # rename() between two links of the same file is a no-op and would leave the temp link behind
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.link"
+
+        try:
+            if self.link_mode == "hardlink":
+                try:
+                    os.link(blob, temp_path)
+                except OSError as e:
+                    self._fall_back_to_copy(e)
+                    shutil.copyfile(blob, temp_path)
+            elif self.link_mode == "symlink":
+                os.symlink(os.path.abspath(blob), temp_path)
+            else:
+                shutil.copyfile(blob, temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _fall_back_to_copy(self, error: OSError) -> None:
+        """Copy instead of hardlinking from now on, also in later runs."""
+        with self._lock:
+            if self.link_mode != "hardlink":
+                return
+            self.link_mode = "copy"
+        logger.warning(f"Hardlink into blob store failed, copying files from now on: {error}")
+        try:
+            with open(self.fallback_path, "w", encoding="utf-8"):
+                pass
+        except OSError as e:
+            logger.error(f"Could not record the copy fallback of the blob store: {e}")
+
+    def _refers_to(self, path: str, blob: str) -> bool:
+        """Whether ``path`` already is a link to ``blob``."""
+        if self.link_mode == "copy":
+            return False
+        try:
+            return os.path.samefile(path, blob)
+        except OSError:
+            return False
+
+    def collect_garbage(self) -> int:
+        """Delete hardlinked blobs that no per-section path refers to anymore.
+
+        Only applies to the ``hardlink`` mode, where the link count tells
+        whether a blob is still used; a store that fell back to copies
+        keeps every blob.
+
+        Returns:
+            Number of blobs removed
+        """
+        if self.link_mode != "hardlink":
+            return 0
+
+        removed = 0
+        for directory, _, files in os.walk(self.objects_dir):
+            for name in files:
+                path = os.path.join(directory, name)
+                if os.stat(path).st_nlink <= 1:
+                    os.remove(path)
+                    removed += 1
+
+        if removed:
+            with self._lock:
+                stale = [rid for rid, info in self._index.items() if not self.has(info.sha256)]
+                for resource_id in stale:
+                    del self._index[resource_id]
+                self._dirty = self._dirty or bool(stale)
+            logger.info(f"Removed {removed} unreferenced blobs")
+        return removed
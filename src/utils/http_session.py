@@ -0,0 +1,87 @@
+import logging
+import threading
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GRAPH_ROOT = "https://graph.microsoft.com"
+GRAPH_BASE_URL = f"{GRAPH_ROOT}/v1.0"
+
+# How call_graph_api returns a response body: decoded JSON (text for other
+# content types), text, bytes, or the open response for streaming
+RESPONSE_TYPES = ("json", "text", "bytes", "stream")
+
+class HTTPTransport:
+    """Pooled, keep-alive HTTP session shared by Graph API calls and downloads."""
+
+    def __init__(self, pool_size: int = 20, pool_block: bool = False,
+                 keep_alive: bool = True, timeout: float = 30.0):
+        """Initialize the transport.
+
+        Args:
+            pool_size: Maximum number of connections kept open per host
+            pool_block: Block callers when the pool is exhausted instead of
+                opening throwaway connections
+            keep_alive: Reuse connections between requests; when False every
+                request asks the server to close its connection
+            timeout: Default timeout in seconds for every request
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=pool_block
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request over the pooled session."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request over the pooled session."""
+        return self.request("GET", url, **kwargs)
+
+    def prewarm(self, url: str = GRAPH_ROOT, connections: Optional[int] = None) -> List[threading.Thread]:
+        """Open connections to a host in the background so later calls skip the handshake.
+
+        Each connection is opened by a concurrent HEAD request; once the
+        request finishes the socket is returned to the pool and reused by
+        the next call to the same host.
+
+        Args:
+            url: URL on the host to warm up
+            connections: Number of connections to open (defaults to a quarter of the pool)
+
+        Returns:
+            The started background threads
+        """
+        count = connections if connections is not None else max(1, self.pool_size // 4)
+        count = min(count, self.pool_size)
+
+        def warm():
+            try:
+                self.session.head(url, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                logger.debug(f"Connection pre-warming to {url} failed: {str(e)}")
+
+        threads = [threading.Thread(target=warm, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+
+        logger.info(f"Pre-warming {count} connection(s) to {url}")
+        return threads
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
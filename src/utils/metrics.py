@@ -0,0 +1,341 @@
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from .atomic_writer import AtomicFileWriter, WriteResult
+from .http_session import GRAPH_BASE_URL
+from .rate_limiter import THROTTLE_STATUSES, endpoint_family
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from cached Graph reads to large image downloads
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Quantiles reported for every histogram in the JSON summary
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+
+# Path segments that are not plain words are ids and become ``{id}`` in endpoint labels
+_ID_SEGMENT = re.compile(r"[^A-Za-z$]|^.{41,}$")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def endpoint_template(url: str, base_url: str = GRAPH_BASE_URL) -> str:
+    """Endpoint label of a request URL, with ids and the query string removed.
+
+    ``https://graph.microsoft.com/v1.0/me/onenote/sections/1-ab!2/pages?$top=100``
+    becomes ``me/onenote/sections/{id}/pages``. URLs outside the Graph base
+    URL, such as preview image hosts, are reduced to their host.
+    """
+    if url.startswith(base_url):
+        path = url[len(base_url):]
+    elif urlparse(url).netloc:
+        return urlparse(url).netloc
+    else:
+        path = url
+    path = path.split("?")[0].strip("/")
+    return "/".join("{id}" if _ID_SEGMENT.search(segment) else segment for segment in path.split("/"))
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _Metric:
+    """A named metric with one value per label combination."""
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, Any] = {}
+        self._function: Optional[Callable[[], Union[float, Dict[str, float]]]] = None
+        self._function_label: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def set_function(self, function: Callable[[], Union[float, Dict[str, float]]],
+                     label: Optional[str] = None) -> None:
+        """Read the value from ``function`` whenever the metric is collected.
+
+        Args:
+            function: Returns the value, or with ``label`` a mapping from
+                label value to value (e.g. queue name to depth)
+            label: Name of the label the mapping's keys are reported under
+        """
+        with self._lock:
+            self._function = function
+            self._function_label = label
+
+    def values(self) -> Dict[LabelKey, Any]:
+        """Current value of every label combination."""
+        with self._lock:
+            values = dict(self._values)
+            function, label = self._function, self._function_label
+        if function is not None:
+            sampled = function()
+            if label is None:
+                values[()] = float(sampled)
+            else:
+                for key, value in sampled.items():
+                    values[((label, str(key)),)] = float(value)
+        return values
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in sorted(self.values().items())]
+
+    def summarize(self) -> List[Dict[str, Any]]:
+        return [{"labels": dict(key), "value": value} for key, value in sorted(self.values().items())]
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. requests sent."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add ``amount`` to the count of the given labels."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. a queue depth."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the value of the given labels."""
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add ``amount`` (which may be negative) to the value of the given labels."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, e.g. latencies."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one value for the given labels."""
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "max": 0.0}
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            state["counts"][index] += 1
+            state["sum"] += value
+            state["max"] = max(state["max"], value)
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the seconds spent in the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _snapshot(self) -> Dict[LabelKey, Dict[str, Any]]:
+        with self._lock:
+            return {key: {"counts": list(state["counts"]), "sum": state["sum"], "max": state["max"]}
+                    for key, state in self._values.items()}
+
+    def merged_counts(self) -> List[int]:
+        """Bucket counts summed over every label combination."""
+        merged = [0] * (len(self.buckets) + 1)
+        for state in self._snapshot().values():
+            merged = [total + count for total, count in zip(merged, state["counts"])]
+        return merged
+
+    def quantile(self, counts: List[int], q: float) -> float:
+        """Estimate a quantile from bucket counts by interpolating within the bucket."""
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, state in sorted(self._snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state["counts"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+    def summarize(self) -> List[Dict[str, Any]]:
+        summary = []
+        for key, state in sorted(self._snapshot().items()):
+            count = sum(state["counts"])
+            entry = {
+                "labels": dict(key),
+                "count": count,
+                "sum": state["sum"],
+                "mean": state["sum"] / count if count else 0.0,
+                "max": state["max"]
+            }
+            for q in SUMMARY_QUANTILES:
+                entry[f"p{int(q * 100)}"] = self.quantile(state["counts"], q)
+            summary.append(entry)
+        return summary
+
+class MetricsRegistry:
+    """In-process metrics, exposed in the Prometheus text format and as JSON.
+
+    Metrics are created on first use by name, so instrumented code just
+    asks for ``registry.counter("name", "help")`` where it counts. All
+    updates are thread-safe and cheap enough for every request.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: type, name: str, help: str, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is a {metric.kind}, not a {cls.kind}")
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        """Get or create a counter."""
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str = "") -> Gauge:
+        """Get or create a gauge."""
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def _sorted(self) -> List[_Metric]:
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._sorted():
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        """All metrics as a JSON-serializable dictionary, with quantiles for histograms."""
+        summary: Dict[str, Any] = {
+            "started_at": self.started_at,
+            "seconds": time.time() - self.started_at,
+            "counters": {},
+            "gauges": {},
+            "histograms": {}
+        }
+        for metric in self._sorted():
+            summary[f"{metric.kind}s"][metric.name] = metric.summarize()
+        return summary
+
+    def write_summary(self, path: str) -> None:
+        """Write ``summary()`` to a JSON file, replacing it atomically."""
+        with AtomicFileWriter(path, fsync_policy="file") as writer:
+            writer.write(json.dumps(self.summary(), indent=2).encode("utf-8"))
+            writer.commit(fix_extension=False)
+
+def observe_request(metrics: Optional[MetricsRegistry], method: str, url: str, status: int,
+                    seconds: float, size: Optional[int] = None, base_url: str = GRAPH_BASE_URL) -> None:
+    """Record one HTTP exchange of a Graph call or download.
+
+    Args:
+        metrics: Registry to record into; nothing happens if None
+        method: HTTP method
+        url: Request URL, reduced to its endpoint template
+        status: Response status code
+        seconds: Time until the response headers arrived
+        size: Response body size in bytes, if known
+        base_url: Graph base URL the endpoint is relative to
+    """
+    if metrics is None:
+        return
+    endpoint = endpoint_template(url, base_url)
+    metrics.counter("onenote_http_requests_total", "HTTP requests by endpoint and status").inc(
+        method=method, endpoint=endpoint, status=status
+    )
+    metrics.histogram("onenote_http_request_duration_seconds", "Time until the response headers arrived").observe(
+        seconds, method=method, endpoint=endpoint
+    )
+    if size is not None:
+        metrics.counter("onenote_http_response_bytes_total", "Response body bytes").inc(size, endpoint=endpoint)
+    if status in THROTTLE_STATUSES:
+        observe_throttle(metrics, url, status, base_url)
+
+def observe_throttle(metrics: Optional[MetricsRegistry], url: str, status: int,
+                     base_url: str = GRAPH_BASE_URL) -> None:
+    """Record a throttling response (429/503/504), including $batch sub-responses."""
+    if metrics is None:
+        return
+    metrics.counter("onenote_http_throttled_total", "Responses signalling throttling (429/503/504)").inc(
+        endpoint=endpoint_template(url, base_url), status=status
+    )
+
+def observe_retry(metrics: Optional[MetricsRegistry], url: str, reason: str,
+                  base_url: str = GRAPH_BASE_URL) -> None:
+    """Record a request sent again, ``reason`` being ``throttled``, ``unauthorized`` or ``batch``."""
+    if metrics is None:
+        return
+    metrics.counter("onenote_http_retries_total", "Requests sent again").inc(
+        endpoint=endpoint_template(url, base_url), reason=reason
+    )
+
+def observe_wait(metrics: Optional[MetricsRegistry], url: str, seconds: float) -> None:
+    """Record how long a request waited for the rate limiter."""
+    if metrics is None:
+        return
+    metrics.histogram("onenote_rate_limit_wait_seconds", "Time requests waited for the rate limiter").observe(
+        seconds, family=endpoint_family(url)
+    )
+
+def observe_write(metrics: Optional[MetricsRegistry], result: WriteResult, kind: str) -> None:
+    """Record a file written to the output directory, ``kind`` being ``preview`` or ``resource``."""
+    if metrics is None:
+        return
+    metrics.histogram("onenote_disk_write_seconds", "Time spent writing, syncing and renaming files").observe(
+        result.disk_seconds, kind=kind
+    )
+    metrics.counter("onenote_disk_write_bytes_total", "Bytes written to the output directory").inc(
+        result.size, kind=kind
+    )
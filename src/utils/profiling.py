@@ -0,0 +1,144 @@
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+# Profilers selectable with PROFILE / --profile
+PROFILE_MODES = ("cprofile", "sample")
+
+# File written by each profiler, in the output directory unless PROFILE_FILE is set
+PROFILE_FILENAMES = {"cprofile": "profile.prof", "sample": "profile.folded"}
+
+class CProfileProfiler:
+    """Deterministic profile of every thread of a run, dumped in pstats format.
+
+    cProfile only sees the thread that enabled it before Python 3.12, and
+    only that thread can disable it. So while profiling, every thread
+    started runs its ``run`` under a profiler of its own, which it disables
+    when ``run`` returns; the profiles are merged when the run ends. Threads
+    still running then, or with their own ``run`` method, are left out.
+    Open the dump with ``python -m pstats`` or snakeviz.
+    """
+
+    def __init__(self):
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._per_thread = sys.version_info < (3, 12)
+        self._profiling = False
+        self._main: Optional[cProfile.Profile] = None
+        self._thread_run: Optional[Callable[[threading.Thread], None]] = None
+
+    def _profiled_run(self, run: Callable[[threading.Thread], None]) -> Callable[[threading.Thread], None]:
+        """Wrap ``Thread.run`` so the thread profiles itself until its work ends."""
+        @functools.wraps(run)
+        def profiled_run(thread: threading.Thread) -> None:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                run(thread)
+            finally:
+                profile.disable()
+                with self._lock:
+                    if self._profiling:
+                        self._profiles.append(profile)
+        return profiled_run
+
+    def start(self) -> None:
+        self._profiling = True
+        if self._per_thread:
+            self._thread_run = threading.Thread.run
+            threading.Thread.run = self._profiled_run(self._thread_run)
+        # From 3.12 on one profiler observes every thread
+        self._main = cProfile.Profile()
+        self._main.enable()
+
+    def stop(self, path: str) -> None:
+        """Stop profiling and write the merged profile to ``path``.
+
+        Raises:
+            ValueError: If no call was profiled
+        """
+        if self._thread_run is not None:
+            threading.Thread.run = self._thread_run
+            self._thread_run = None
+        self._main.disable()
+        with self._lock:
+            self._profiling = False
+            profiles, self._profiles = self._profiles + [self._main], []
+
+        # pstats rejects a profile without any call
+        profiles = [profile for profile in profiles if profile.getstats()]
+        if not profiles:
+            raise ValueError("no calls were profiled")
+        stats = pstats.Stats(*profiles)
+        stats.dump_stats(path)
+
+class SamplingProfiler:
+    """Samples the stack of every thread at a fixed interval.
+
+    Costs far less than cProfile and shows where threads wait as well as
+    where they compute. The samples are written as folded stacks (one
+    ``thread;outer;...;inner count`` line per distinct stack), the input
+    of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """Initialize the profiler.
+
+        Args:
+            interval: Seconds between two samples
+        """
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self, path: str) -> None:
+        """Stop sampling and write the folded stacks to ``path``."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+def create_profiler(config: Dict[str, Any]) -> Optional[Any]:
+    """The profiler selected by the ``profile`` setting, or None if profiling is off."""
+    mode = config.get("profile")
+    if not mode:
+        return None
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profiler: {mode}")
+    if mode == "sample":
+        return SamplingProfiler(config.get("profile_interval_ms", 5) / 1000)
+    return CProfileProfiler()
+
+def profile_path(config: Dict[str, Any]) -> str:
+    """Where the profile of a run is written."""
+    return config.get("profile_file") or os.path.join(
+        config.get("output_dir") or "downloaded_images", PROFILE_FILENAMES[config["profile"]]
+    )
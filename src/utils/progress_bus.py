@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ProgressEvent:
+    """A progress message with its position in the stream."""
+    id: int
+    data: Dict[str, Any]
+    key: Optional[str] = None
+
+class ProgressBus:
+    """Bounded, push-based progress stream with resumable subscriptions.
+
+    Events live in a ring buffer of ``capacity`` entries, so memory stays
+    flat on long crawls. Subscribers block on a condition variable until
+    something is published instead of polling. A message published with a
+    coalescing key (such as one per API call) replaces its predecessor with
+    the same key while that is still the newest event, so bursts reach slow
+    clients as their latest state. Event ids increase monotonically, which
+    lets SSE clients resume with ``Last-Event-ID``.
+    """
+
+    def __init__(self, capacity: int = 1000, flush_interval: float = 0.1, heartbeat: float = 15.0):
+        """Initialize the bus.
+
+        Args:
+            capacity: Number of events kept for subscribers that fall behind
+                or reconnect
+            flush_interval: Minimum seconds between two deliveries to one
+                subscriber; events arriving meanwhile are delivered together
+            heartbeat: Seconds after which an idle subscription yields a
+                keep-alive, so disconnected clients are noticed
+        """
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.heartbeat = heartbeat
+        self._events: Deque[ProgressEvent] = deque(maxlen=capacity)
+        self._condition = threading.Condition()
+        self._next_id = 1
+        self._evicted_through = 0
+        self._closed = False
+        self.subscribers = 0
+
+    def publish(self, data: Dict[str, Any], coalesce_key: Optional[str] = None) -> int:
+        """Append an event and wake every subscriber.
+
+        Args:
+            data: JSON-serializable event payload
+            coalesce_key: Events with the same key supersede each other while
+                they are the newest event
+
+        Returns:
+            The id of the new event
+        """
+        with self._condition:
+            if coalesce_key and self._events and self._events[-1].key == coalesce_key:
+                previous = self._events.pop()
+                data = dict(data, coalesced=previous.data.get("coalesced", 1) + 1)
+
+            event = ProgressEvent(id=self._next_id, data=data, key=coalesce_key)
+            self._next_id += 1
+            if len(self._events) == self.capacity:
+                self._evicted_through = self._events[0].id
+            self._events.append(event)
+            self._condition.notify_all()
+            return event.id
+
+    def events_after(self, last_id: int) -> Tuple[List[ProgressEvent], bool]:
+        """Events newer than ``last_id``, and whether some of them were already evicted."""
+        with self._condition:
+            return self._events_after(last_id)
+
+    def _events_after(self, last_id: int) -> Tuple[List[ProgressEvent], bool]:
+        """``events_after`` for callers holding the condition."""
+        if not self._events or self._events[-1].id <= last_id:
+            return [], False
+        events = [event for event in self._events if event.id > last_id]
+        return events, last_id < self._evicted_through
+
+    @property
+    def last_id(self) -> int:
+        """Id of the newest event, 0 if none was published."""
+        with self._condition:
+            return self._next_id - 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Payloads of the buffered events, oldest first."""
+        with self._condition:
+            return [event.data for event in self._events]
+
+    def subscribe(self, last_id: int = 0) -> Iterator[Optional[ProgressEvent]]:
+        """Yield events after ``last_id`` as they are published.
+
+        Yields ``None`` as a keep-alive after ``heartbeat`` idle seconds. If
+        the subscriber fell further behind than the buffer holds, a notice
+        event with id ``last_id`` reports that messages were lost. The
+        generator ends when the bus is closed; closing the generator (e.g.
+        when the client disconnects) releases the subscription.
+        """
+        with self._condition:
+            self.subscribers += 1
+            if last_id >= self._next_id:
+                # The id comes from before a restart; replay what we have
+                last_id = 0
+        try:
+            while True:
+                with self._condition:
+                    deadline = time.monotonic() + self.heartbeat
+                    events, dropped = self._events_after(last_id)
+                    while not events and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                        events, dropped = self._events_after(last_id)
+                    closed = self._closed
+
+                if dropped:
+                    yield ProgressEvent(id=last_id, data={
+                        'timestamp': time.time(),
+                        'type': 'gap',
+                        'message': "Older progress messages were dropped"
+                    })
+                if events:
+                    for event in events:
+                        yield event
+                    last_id = events[-1].id
+                elif closed:
+                    return
+                else:
+                    yield None
+
+                if self.flush_interval:
+                    time.sleep(self.flush_interval)
+        finally:
+            with self._condition:
+                self.subscribers -= 1
+
+    def close(self) -> None:
+        """End every subscription once it has delivered the buffered events."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Statuses Graph uses to signal throttling or overload
+THROTTLE_STATUSES = {429, 503, 504}
+
+# Path prefixes of Graph API versions, which identify Graph hosted elsewhere (e.g. a mock server)
+GRAPH_VERSION_PREFIXES = ("/v1.0/", "/beta/")
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a ``Retry-After`` header (seconds or HTTP date) to seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def endpoint_family(url: str) -> str:
+    """Group a request URL into the throttling family it counts against."""
+    parsed = urlparse(url)
+    if (parsed.netloc and "graph.microsoft.com" not in parsed.netloc
+            and not parsed.path.startswith(GRAPH_VERSION_PREFIXES)):
+        return "download"
+
+    path = parsed.path if parsed.netloc else url.split("?")[0]
+    if "$batch" in path:
+        return "batch"
+    if re.search(r"/resources/[^/]+/(\$value|content)", path):
+        return "resource"
+    if re.search(r"/pages/[^/]+/(content|preview)", path):
+        return "content"
+    if "onenote" in path:
+        return "listing"
+    return "graph"
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    ``reserve`` returns how long the caller has to wait before its token is
+    available, so the same bucket serves threads (``time.sleep``) and
+    coroutines (``asyncio.sleep``).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens, going into debt if needed, and return the wait in seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0 or self.rate <= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+class AIMDLimiter:
+    """Concurrency limit adjusted by additive increase / multiplicative decrease.
+
+    Every successful request below the latency threshold grows the limit by
+    roughly one slot per window of ``limit`` requests. A throttling response
+    (or latency far above the baseline of the request's endpoint family,
+    since a ``$batch`` or content call is always slower than a listing)
+    multiplies the limit by
+    ``decrease_factor``, at most once per ``cooldown`` seconds so a burst of
+    429s from requests already in flight only counts once.
+    """
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64,
+                 decrease_factor: float = 0.5, latency_tolerance: float = 3.0,
+                 cooldown: float = 1.0):
+        """Initialize the limiter."""
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._baseline_latency: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def acquire(self) -> None:
+        """Wait until a concurrency slot is free."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        """Wait until a concurrency slot is free without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+    def release(self) -> None:
+        """Free a concurrency slot."""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+            self._wake_async_waiters()
+
+    def _wake_async_waiters(self) -> None:
+        """Let every waiting coroutine check for a free slot again. Caller holds the lock."""
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    def on_success(self, latency: Optional[float] = None, family: str = "graph") -> None:
+        """Record a successful request; without a latency only the increase applies.
+
+        Args:
+            latency: Seconds until the response arrived
+            family: Endpoint family of the request, see ``endpoint_family``;
+                latency is only compared with earlier requests of the same family
+        """
+        with self._condition:
+            congested = False
+            if latency is not None:
+                baseline = self._baseline_latency.get(family)
+                if baseline is None:
+                    baseline = latency
+                else:
+                    # Slowly track the fastest typical latency
+                    baseline = min(latency, 0.95 * baseline + 0.05 * latency)
+                self._baseline_latency[family] = baseline
+                congested = latency > baseline * self.latency_tolerance
+
+            if congested:
+                self._decrease()
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+            self._wake_async_waiters()
+
+    def on_throttle(self) -> None:
+        """Record a throttling response."""
+        with self._condition:
+            self._decrease()
+
+    def _decrease(self) -> None:
+        """Shrink the limit unless it was shrunk very recently. Caller holds the lock."""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.minimum), self.limit * self.decrease_factor)
+        logger.info(f"Reducing concurrency limit from {previous:.1f} to {self.limit:.1f}")
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+class RateLimiter:
+    """Shared throttling for Graph calls and downloads.
+
+    Combines a token bucket per endpoint family, an AIMD concurrency limit
+    and a per-family pause set from ``Retry-After`` headers.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, burst: float = 20.0,
+                 initial_concurrency: int = 8, max_concurrency: int = 64,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0):
+        """Initialize the limiter.
+
+        Args:
+            rates: Requests per second per endpoint family; families not
+                listed use the ``default`` entry
+            burst: Token bucket capacity for every family
+            initial_concurrency: Starting concurrency limit
+            max_concurrency: Upper bound for the concurrency limit
+            base_backoff: First backoff delay when no ``Retry-After`` is sent
+            max_backoff: Largest backoff delay
+        """
+        self.rates = {"default": 10.0, "download": 50.0}
+        self.rates.update(rates or {})
+        self.burst = burst
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.concurrency = AIMDLimiter(initial=initial_concurrency, maximum=max_concurrency)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._paused_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, family: str) -> TokenBucket:
+        """Get or create the token bucket of a family."""
+        with self._lock:
+            if family not in self._buckets:
+                rate = self.rates.get(family, self.rates["default"])
+                self._buckets[family] = TokenBucket(rate, self.burst)
+            return self._buckets[family]
+
+    def reserve(self, url: str) -> float:
+        """Reserve a request slot for a URL and return the seconds to wait first."""
+        family = endpoint_family(url)
+        with self._lock:
+            pause = max(0.0, self._paused_until.get(family, 0.0) - time.monotonic())
+        return max(pause, self._bucket(family).reserve())
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Block until a request to ``url`` may be sent and hold a concurrency slot meanwhile."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+        self.concurrency.acquire()
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    @asynccontextmanager
+    async def aslot(self, url: str) -> AsyncIterator[None]:
+        """``slot`` for coroutines; waits with ``asyncio.sleep`` so the event loop keeps running."""
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        await self.concurrency.acquire_async()
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    def record(self, url: str, status_code: int, latency: float,
+               retry_after: Optional[str] = None) -> None:
+        """Feed the outcome of a request back into the limiter."""
+        if status_code in THROTTLE_STATUSES:
+            self.record_throttle(url, parse_retry_after(retry_after))
+        elif status_code < 500:
+            # Download times depend on file size, so they don't count as a congestion signal
+            family = endpoint_family(url)
+            self.concurrency.on_success(None if family == "download" else latency, family)
+
+    def record_throttle(self, url: str, retry_after: Optional[float] = None) -> None:
+        """Pause the URL's family for ``Retry-After`` seconds and shrink the concurrency limit."""
+        self.concurrency.on_throttle()
+        if retry_after is not None:
+            family = endpoint_family(url)
+            # Jitter keeps paused callers from waking up in lockstep
+            resume = time.monotonic() + retry_after + random.uniform(0, min(1.0, retry_after / 4))
+            with self._lock:
+                self._paused_until[family] = max(self._paused_until.get(family, 0.0), resume)
+            logger.info(f"Throttled on {family} requests, pausing for {retry_after:.1f}s")
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Delay before retrying a throttled request, with full jitter."""
+        parsed = parse_retry_after(retry_after)
+        if parsed is not None:
+            return parsed + random.uniform(0, min(1.0, parsed / 4))
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Mapping, Optional
+
+from .atomic_writer import AtomicFileWriter
+from .rate_limiter import endpoint_family
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse a ``family=seconds`` list such as ``listing=60,content=300``."""
+    ttls = {}
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        family, seconds = part.split("=", 1)
+        try:
+            ttls[family.strip()] = float(seconds)
+        except ValueError:
+            logger.warning(f"Ignoring invalid cache TTL: {part}")
+    return ttls
+
+@dataclass
+class CachedResponse:
+    """A stored response body together with its validators."""
+    url: str
+    body: Any
+    variant: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_type: Optional[str]
+    stored_at: float
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that turn a GET for this entry into a revalidation."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class ResponseCache:
+    """On-disk cache of Graph GET responses with ETag revalidation.
+
+    Entries younger than the TTL of their endpoint family (see
+    ``endpoint_family``) are served without a request; older ones are
+    revalidated with ``If-None-Match``/``If-Modified-Since``, so an unchanged
+    resource costs a 304 instead of its body. The cache is bounded to
+    ``max_bytes`` and evicts the least recently used entries first; file
+    modification times keep the LRU order across runs.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttls: Optional[Dict[str, float]] = None, default_ttl: float = 0.0):
+        """Open (or create) a cache.
+
+        Args:
+            directory: Directory holding one file per cached response
+            max_bytes: Upper bound for the total size of the cache files
+            ttls: Seconds an entry is served without revalidation, per
+                endpoint family
+            default_ttl: TTL of families missing from ``ttls``
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        """Rebuild the LRU order from the files on disk."""
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            files.append((stat.st_mtime, name[:-len(".json")], stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._sizes[key] = size
+            self._total += size
+        self._evict()
+
+    @staticmethod
+    def _key(url: str, variant: str) -> str:
+        return hashlib.sha256(f"{variant}\0{url}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def ttl(self, url: str) -> float:
+        """Seconds a response for ``url`` is used without revalidation."""
+        return self.ttls.get(endpoint_family(url), self.default_ttl)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """Whether an entry can be used without asking Graph."""
+        return time.time() - entry.stored_at < self.ttl(entry.url)
+
+    def lookup(self, url: str, variant: str = "json") -> Optional[CachedResponse]:
+        """Return the cached response for ``url``, if any.
+
+        Args:
+            url: Absolute URL of the request
+            variant: Decoding the body was stored with, such as the
+                response type of ``call_graph_api``
+        """
+        key = self._key(url, variant)
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            self._sizes.move_to_end(key)
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = CachedResponse(**json.load(f))
+            os.utime(self._path(key))
+        except Exception as e:
+            logger.debug(f"Dropping unreadable cache entry for {url}: {e}")
+            self._discard(key)
+            return None
+        return entry if entry.url == url and entry.variant == variant else None
+
+    def store(self, url: str, body: Any, headers: Mapping[str, str], variant: str = "json") -> None:
+        """Cache a 200 response unless Graph marked it as not storable.
+
+        Args:
+            url: Absolute URL of the request
+            body: Decoded body (JSON value or text)
+            headers: Response headers, matched case-insensitively
+            variant: Decoding of ``body``, see ``lookup``
+        """
+        headers = {name.lower(): value for name, value in headers.items()}
+        if "no-store" in headers.get("cache-control", ""):
+            return
+
+        entry = CachedResponse(
+            url=url,
+            body=body,
+            variant=variant,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            content_type=headers.get("content-type"),
+            stored_at=time.time()
+        )
+        if not entry.etag and not entry.last_modified and self.ttl(url) <= 0:
+            # Could neither be revalidated nor served fresh
+            return
+        self._write(entry)
+
+    def revalidated(self, entry: CachedResponse) -> Any:
+        """Restart an entry's TTL after a 304 and return its body."""
+        entry.stored_at = time.time()
+        self._write(entry)
+        return entry.body
+
+    def invalidate(self, url: str, variant: str = "json") -> None:
+        """Forget the cached response for ``url``."""
+        self._discard(self._key(url, variant))
+
+    def _write(self, entry: CachedResponse) -> None:
+        """Persist an entry and evict old ones if the cache grew too large."""
+        key = self._key(entry.url, entry.variant)
+        data = json.dumps(asdict(entry)).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        with AtomicFileWriter(self._path(key), fsync_policy="none") as writer:
+            writer.write(data)
+            writer.commit(fix_extension=False)
+
+        with self._lock:
+            self._total += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits ``max_bytes``."""
+        evicted = []
+        with self._lock:
+            while self._total > self.max_bytes and self._sizes:
+                key, size = self._sizes.popitem(last=False)
+                self._total -= size
+                evicted.append(key)
+
+        for key in evicted:
+            self._remove_file(key)
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} cached responses")
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            self._total -= self._sizes.pop(key, 0)
+        self._remove_file(key)
+
+    def _remove_file(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
@@ -1,27 +1,32 @@
 import os
 import json
 import logging
-import openai
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from .tracing import Tracer, trace_span
+
 logger = logging.getLogger(__name__)
 
 class SelfHealer:
     """Intelligent self-healing system using OpenAI to analyze errors and logs."""
     
-    def __init__(self, api_key: str):
-        """Initialize the self-healer with OpenAI API key."""
+    def __init__(self, api_key: str, tracer: Optional[Tracer] = None):
+        """Initialize the self-healer with OpenAI API key and an optional tracer."""
         if not api_key:
             raise ValueError("OpenAI API key is required for self-healing")
         self.api_key = api_key
-        openai.api_key = api_key
+        self.tracer = tracer
         self.attempts: Dict[str, int] = {}  # Track attempts per error type
         self.max_attempts = 3
     
     def _analyze_error_with_gpt(self, error_type: str, error_context: Dict[str, Any], logs: str) -> Dict[str, Any]:
         """Use GPT to analyze the error and provide intelligent suggestions."""
         try:
+            # Imported on first use; the client library is slow to import
+            import openai
+            openai.api_key = self.api_key
+            
             prompt = f"""
             Analyze this error in a OneNote image fetching application:
             
@@ -95,11 +100,12 @@ class SelfHealer:
                 "next_steps": ["Contact support or review logs manually"]
             }
         
-        # Get recent logs
-        logs = self._read_recent_logs()
-        
-        # Analyze with GPT
-        analysis = self._analyze_error_with_gpt(error_type, error_context, logs)
+        with trace_span(self.tracer, "self_healer.analyze", "openai", error_type=error_type):
+            # Get recent logs
+            logs = self._read_recent_logs()
+            
+            # Analyze with GPT
+            analysis = self._analyze_error_with_gpt(error_type, error_context, logs)
         
         # Log the analysis
         logger.info(f"Self-healing analysis for {error_type}: {json.dumps(analysis, indent=2)}")
@@ -1,17 +1,28 @@
 import json
 import os
+import threading
+import time
 from typing import Dict, Optional
 import logging
 
+from .atomic_writer import AtomicFileWriter
+
 logger = logging.getLogger(__name__)
 
 class TokenCache:
-    """Handles token storage and retrieval."""
-    
+    """Handles token storage and retrieval.
+
+    Besides the current access token the file holds the serialized MSAL
+    token cache (accounts and refresh tokens), so a restarted process can
+    acquire tokens silently. The file is replaced atomically: a crash while
+    saving never leaves a truncated cache behind.
+    """
+
     def __init__(self, cache_file: str = "token_cache.json"):
         self.cache_file = cache_file
+        self._lock = threading.Lock()
         self.cache = self._load_cache()
-    
+
     def _load_cache(self) -> Dict:
         """Load token cache from file."""
         try:
@@ -21,25 +32,47 @@ class TokenCache:
         except Exception as e:
             logger.error(f"Error loading token cache: {e}")
         return {}
-    
+
     def _save_cache(self) -> None:
         """Save token cache to file."""
         try:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache, f)
+            with self._lock:
+                data = json.dumps(self.cache).encode("utf-8")
+                with AtomicFileWriter(self.cache_file, fsync_policy="file") as writer:
+                    writer.write(data)
+                    writer.commit(fix_extension=False)
         except Exception as e:
             logger.error(f"Error saving token cache: {e}")
-    
+
     def get_token(self) -> Optional[Dict]:
         """Get the stored token."""
         return self.cache.get('access_token')
-    
+
     def set_token(self, token: Dict) -> None:
         """Set the token in cache."""
         self.cache['access_token'] = token
         self._save_cache()
-    
+
+    def expires_in(self) -> float:
+        """Seconds until the stored access token expires, 0 if there is none."""
+        token = self.get_token()
+        if not token:
+            return 0.0
+        try:
+            return max(0.0, float(token.get('expires_at', 0)) - time.time())
+        except (TypeError, ValueError):
+            return 0.0
+
+    def get_msal_cache(self) -> Optional[str]:
+        """Get the serialized MSAL token cache."""
+        return self.cache.get('msal_cache')
+
+    def set_msal_cache(self, serialized: str) -> None:
+        """Store the serialized MSAL token cache."""
+        self.cache['msal_cache'] = serialized
+        self._save_cache()
+
     def clear(self) -> None:
         """Clear the token cache."""
         self.cache = {}
-        self._save_cache() 
\ No newline at end of file
+        self._save_cache()
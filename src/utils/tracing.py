@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .atomic_writer import AtomicFileWriter
+
+# Spans kept per run; later spans are counted but dropped to bound memory
+DEFAULT_MAX_EVENTS = 500_000
+
+class _NullSpan:
+    """Span returned while tracing is disabled; does nothing."""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        return None
+
+    def set(self, **args: Any) -> None:
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class Span:
+    """A timed region of the crawl, recorded when the ``with`` block exits."""
+    __slots__ = ("tracer", "name", "category", "args", "lane", "started")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> "Span":
+        self.lane = self.tracer._lane()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self, time.perf_counter())
+
+    def set(self, **args: Any) -> None:
+        """Attach values known only inside the span, e.g. a status code."""
+        self.args.update(args)
+
+class Tracer:
+    """Records spans of a run and exports them as a Chrome trace.
+
+    Spans are complete (``"ph": "X"``) events, one timeline row per thread
+    or asyncio task, so the trace opens in ``chrome://tracing`` or
+    https://ui.perfetto.dev. A disabled tracer hands out a shared no-op span,
+    so instrumented code pays one attribute check per span.
+    """
+
+    def __init__(self, enabled: bool = False, max_events: int = DEFAULT_MAX_EVENTS):
+        """Initialize the tracer.
+
+        Args:
+            enabled: Record spans; when False every span is a no-op
+            max_events: Spans kept before further spans are dropped
+        """
+        self.enabled = enabled
+        self.max_events = max_events
+        self.dropped = 0
+        self._origin = time.perf_counter()
+        self._events: List[Tuple[str, str, float, float, int, Dict[str, Any]]] = []
+        self._lanes: Dict[int, int] = {}
+        self._lane_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, category: str = "crawl", **args: Any) -> Any:
+        """Context manager timing a region.
+
+        Args:
+            name: Span name shown on the timeline, e.g. ``graph.listing``
+            category: Group of the span, e.g. ``graph``, ``parse`` or ``disk``
+            **args: Values shown with the span, e.g. the endpoint
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def reset(self) -> None:
+        """Forget the recorded spans, e.g. before the next run."""
+        with self._lock:
+            self._events = []
+            self.dropped = 0
+            self._origin = time.perf_counter()
+
+    def _lane(self) -> int:
+        """Timeline row of the caller: its asyncio task, or else its thread."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task is not None else threading.get_ident()
+
+        lane = self._lanes.get(key)
+        if lane is None:
+            with self._lock:
+                lane = self._lanes.setdefault(key, len(self._lanes) + 1)
+                self._lane_names[lane] = task.get_name() if task is not None else threading.current_thread().name
+        return lane
+
+    def _record(self, span: Span, finished: float) -> None:
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+            self._events.append((span.name, span.category, span.started, finished, span.lane, span.args))
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """Number of spans and total seconds per span name."""
+        totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+        with self._lock:
+            for name, _, started, finished, _, _ in self._events:
+                totals[name]["count"] += 1
+                totals[name]["seconds"] += finished - started
+        return dict(totals)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The recorded spans in the Chrome trace event format."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            lane_names = dict(self._lane_names)
+
+        trace_events: List[Dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": lane, "args": {"name": name}}
+            for lane, name in lane_names.items()
+        ]
+        for name, category, started, finished, lane, args in events:
+            trace_events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((started - self._origin) * 1e6, 1),
+                "dur": round((finished - started) * 1e6, 1),
+                "pid": pid,
+                "tid": lane,
+                "args": args
+            })
+        return {
+            "traceEvents": trace_events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_spans": self.dropped}
+        }
+
+    def export(self, path: str) -> None:
+        """Write the Chrome trace to a JSON file, replacing it atomically."""
+        with AtomicFileWriter(path, fsync_policy="none") as writer:
+            writer.write(json.dumps(self.chrome_trace()).encode("utf-8"))
+            writer.commit(fix_extension=False)
+
+def trace_span(tracer: Optional[Tracer], name: str, category: str = "crawl", **args: Any) -> Any:
+    """``tracer.span(...)``, or a no-op span if there is no tracer."""
+    if tracer is None or not tracer.enabled:
+        return NULL_SPAN
+    return Span(tracer, name, category, args)
@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from .atomic_writer import AtomicFileWriter
+
+logger = logging.getLogger(__name__)
+
+# File extensions that select the SQLite backend in ``open_queue``
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+def worker_name() -> str:
+    """Identifies this process in claims: ``host:pid``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class WorkQueue(Protocol):
+    """Queue of JSON work items shared by processes on one or more machines.
+
+    Every item is claimed by exactly one worker. A worker that crashes
+    leaves its item claimed until ``requeue_stale`` hands it out again.
+    """
+    def put(self, item_id: str, payload: Dict[str, Any]) -> None:
+        """Add an item unless one with the same id exists."""
+        ...
+
+    def claim(self, owner: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Take the next pending item, or None if there is none."""
+        ...
+
+    def complete(self, item_id: str, result: Dict[str, Any]) -> None:
+        """Mark a claimed item as done and store its result."""
+        ...
+
+    def requeue_stale(self, max_age: float) -> int:
+        """Return items claimed longer than ``max_age`` seconds ago to the queue."""
+        ...
+
+    def counts(self) -> Dict[str, int]:
+        """Number of ``pending``, ``claimed`` and ``done`` items."""
+        ...
+
+    def results(self) -> List[Dict[str, Any]]:
+        """Results of every completed item."""
+        ...
+
+class DirectoryQueue:
+    """Work queue kept as JSON files in ``pending/``, ``claimed/`` and ``done/``.
+
+    A worker claims an item by renaming its file from ``pending`` to
+    ``claimed``; the rename is atomic, so on a local or shared file system
+    only one worker wins each item.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        for state in ("pending", "claimed", "done"):
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+
+    def _path(self, state: str, item_id: str) -> str:
+        return os.path.join(self.root, state, f"{item_id}.json")
+
+    def _write(self, path: str, data: Dict[str, Any]) -> None:
+        with AtomicFileWriter(path, fsync_policy="file") as writer:
+            writer.write(json.dumps(data).encode("utf-8"))
+            writer.commit(fix_extension=False)
+
+    def put(self, item_id: str, payload: Dict[str, Any]) -> None:
+        if any(os.path.exists(self._path(state, item_id)) for state in ("pending", "claimed", "done")):
+            return
+        self._write(self._path("pending", item_id), {"id": item_id, "payload": payload})
+
+    def claim(self, owner: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        for name in sorted(os.listdir(os.path.join(self.root, "pending"))):
+            if not name.endswith(".json"):
+                continue
+            item_id = name[:-len(".json")]
+            claimed = self._path("claimed", item_id)
+            try:
+                os.rename(self._path("pending", item_id), claimed)
+            except FileNotFoundError:
+                # Another worker was faster
+                continue
+            # The claim's age is measured from the rename
+            os.utime(claimed)
+            with open(claimed, "r", encoding="utf-8") as f:
+                return item_id, json.load(f)["payload"]
+        return None
+
+    def complete(self, item_id: str, result: Dict[str, Any]) -> None:
+        self._write(self._path("done", item_id), {"id": item_id, "result": result})
+        try:
+            os.remove(self._path("claimed", item_id))
+        except FileNotFoundError:
+            pass
+
+    def requeue_stale(self, max_age: float) -> int:
+        requeued = 0
+        now = time.time()
+        for name in os.listdir(os.path.join(self.root, "claimed")):
+            path = os.path.join(self.root, "claimed", name)
+            try:
+                if now - os.stat(path).st_mtime > max_age:
+                    os.rename(path, os.path.join(self.root, "pending", name))
+                    requeued += 1
+            except FileNotFoundError:
+                continue
+        return requeued
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            state: sum(1 for name in os.listdir(os.path.join(self.root, state)) if name.endswith(".json"))
+            for state in ("pending", "claimed", "done")
+        }
+
+    def results(self) -> List[Dict[str, Any]]:
+        results = []
+        for name in sorted(os.listdir(os.path.join(self.root, "done"))):
+            if name.endswith(".json"):
+                with open(os.path.join(self.root, "done", name), "r", encoding="utf-8") as f:
+                    results.append(json.load(f)["result"])
+        return results
+
+class SQLiteQueue:
+    """Work queue in a SQLite file, for workers sharing one file system.
+
+    Claims run in ``BEGIN IMMEDIATE`` transactions, which serializes them
+    across processes; the database uses WAL so readers never block.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS work_items ("
+                " id TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " state TEXT NOT NULL DEFAULT 'pending',"
+                " owner TEXT,"
+                " claimed_at REAL,"
+                " result TEXT)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection of the calling thread; connections cannot be shared between threads."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+    def put(self, item_id: str, payload: Dict[str, Any]) -> None:
+        self._connect().execute(
+            "INSERT OR IGNORE INTO work_items (id, payload) VALUES (?, ?)",
+            (item_id, json.dumps(payload))
+        )
+
+    def claim(self, owner: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT id, payload FROM work_items WHERE state = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE work_items SET state = 'claimed', owner = ?, claimed_at = ? WHERE id = ?",
+                    (owner, time.time(), row[0])
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return (row[0], json.loads(row[1])) if row else None
+
+    def complete(self, item_id: str, result: Dict[str, Any]) -> None:
+        self._connect().execute(
+            "UPDATE work_items SET state = 'done', result = ? WHERE id = ?",
+            (json.dumps(result), item_id)
+        )
+
+    def requeue_stale(self, max_age: float) -> int:
+        cursor = self._connect().execute(
+            "UPDATE work_items SET state = 'pending', owner = NULL, claimed_at = NULL"
+            " WHERE state = 'claimed' AND claimed_at < ?",
+            (time.time() - max_age,)
+        )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"pending": 0, "claimed": 0, "done": 0}
+        for state, count in self._connect().execute("SELECT state, COUNT(*) FROM work_items GROUP BY state"):
+            counts[state] = count
+        return counts
+
+    def results(self) -> List[Dict[str, Any]]:
+        rows = self._connect().execute("SELECT result FROM work_items WHERE state = 'done' ORDER BY id")
+        return [json.loads(row[0]) for row in rows]
+
+def open_queue(location: str) -> WorkQueue:
+    """Open a ``SQLiteQueue`` for ``*.db``/``*.sqlite`` paths, else a ``DirectoryQueue``."""
+    if location.lower().endswith(SQLITE_EXTENSIONS):
+        return SQLiteQueue(location)
+    return DirectoryQueue(location)
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pytest
+
+# Make ``src`` and ``benchmarks`` importable when pytest runs from any directory
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+class FakeResponse:
+    """Minimal streamed ``requests.Response``."""
+
+    def __init__(self, body: bytes = b"", status_code: int = 200, headers: Optional[Dict[str, str]] = None):
+        self.content = body
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self) -> None:
+        self.closed = True
+
+class FakeGraphClient:
+    """Stand-in for ``GraphAPIClient`` answering Graph calls from a dict or a function."""
+
+    def __init__(self, responses: Optional[Dict[str, Any]] = None,
+                 handler: Optional[Callable[[str], Any]] = None, config: Optional[Dict[str, Any]] = None):
+        self.responses = responses or {}
+        self.handler = handler
+        self.config: Dict[str, Any] = config or {}
+        self.downloads: Dict[str, bytes] = {}
+        self.calls: List[str] = []
+        self.progress: List[str] = []
+        self.errors: List[Dict[str, Any]] = []
+
+    def call_graph_api(self, endpoint: str, method: str = "GET", response_type: str = "json", **kwargs) -> Any:
+        self.calls.append(endpoint)
+        if self.handler is not None:
+            return self.handler(endpoint)
+        return self.responses[endpoint]
+
+    def download(self, url: str, authenticated: bool = False, **kwargs) -> FakeResponse:
+        self.calls.append(url)
+        if url not in self.downloads:
+            return FakeResponse(status_code=404)
+        return FakeResponse(self.downloads[url])
+
+    def add_progress(self, message: str, coalesce_key: Optional[str] = None) -> None:
+        self.progress.append(message)
+
+    def handle_error(self, error: Exception, context: Dict[str, Any]) -> None:
+        self.errors.append(context)
+
+    def add_user_prompt(self, message: str, options: List[str]) -> None:
+        pass
+
+@pytest.fixture
+def fake_graph() -> FakeGraphClient:
+    return FakeGraphClient()
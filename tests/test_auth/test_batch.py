@@ -0,0 +1,140 @@
+import base64
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+from src.auth import batch as batch_module
+from src.auth.batch import BatchRequest, GraphBatchError, GraphBatcher, _decode_body
+
+class RecordingLimiter:
+    def __init__(self):
+        self.throttles: List[tuple] = []
+
+    def record_throttle(self, url: str, retry_after: Optional[float] = None) -> None:
+        self.throttles.append((url, retry_after))
+
+class BatchGraph:
+    """Answers $batch POSTs, sub-request by sub-request, with ``respond(request, attempt)``."""
+
+    def __init__(self, respond: Optional[Callable[[Dict[str, Any], int], Dict[str, Any]]] = None):
+        self.respond = respond or (lambda request, attempt: {"status": 200, "body": {"url": request["url"]}})
+        self.payloads: List[Dict[str, Any]] = []
+        self.attempts: Dict[str, int] = {}
+        self.errors: List[Dict[str, Any]] = []
+        self.rate_limiter = RecordingLimiter()
+        self.metrics = None
+
+    def call_graph_api(self, endpoint: str, method: str = "GET", data: str = "", **kwargs) -> Any:
+        assert (endpoint, method) == ("$batch", "POST")
+        payload = json.loads(data)
+        self.payloads.append(payload)
+        responses = []
+        for request in payload["requests"]:
+            attempt = self.attempts.get(request["url"], 0)
+            self.attempts[request["url"]] = attempt + 1
+            responses.append({"id": request["id"], **self.respond(request, attempt)})
+        return {"responses": responses}
+
+    def handle_error(self, error: Exception, context: Dict[str, Any]) -> None:
+        self.errors.append(context)
+
+@pytest.fixture
+def sleeps(monkeypatch) -> List[float]:
+    delays: List[float] = []
+    monkeypatch.setattr(batch_module.time, "sleep", delays.append)
+    return delays
+
+def test_requests_are_sent_in_chunks_of_twenty():
+    graph = BatchGraph()
+    batcher = GraphBatcher(graph)
+
+    futures = batcher.submit_many([BatchRequest(f"me/onenote/pages/{i}") for i in range(45)])
+
+    assert [len(payload["requests"]) for payload in graph.payloads] == [20, 20, 5]
+    assert [future.result()["url"] for future in futures] == [f"/me/onenote/pages/{i}" for i in range(45)]
+
+def test_dependency_chains_stay_in_one_batch():
+    graph = BatchGraph()
+    batcher = GraphBatcher(graph)
+    requests = [BatchRequest(f"me/onenote/pages/{i}") for i in range(18)]
+    requests += [
+        BatchRequest("me/onenote/sections/s1"),
+        BatchRequest("me/onenote/sections/s1/pages", depends_on=[18]),
+        BatchRequest("me/onenote/sections/s1/pages?$top=1", depends_on=[19])
+    ]
+
+    batcher.submit_many(requests)
+
+    # The chain of three no longer fits next to the 18 independent requests
+    assert [len(payload["requests"]) for payload in graph.payloads] == [18, 3]
+    chain = graph.payloads[1]["requests"]
+    assert "dependsOn" not in chain[0]
+    assert chain[1]["dependsOn"] == [chain[0]["id"]]
+    assert chain[2]["dependsOn"] == [chain[1]["id"]]
+
+def test_dependency_chains_longer_than_a_batch_are_rejected():
+    batcher = GraphBatcher(BatchGraph())
+    requests = [BatchRequest("me/onenote/pages/0")]
+    requests += [BatchRequest(f"me/onenote/pages/{i}", depends_on=[i - 1]) for i in range(1, 21)]
+
+    with pytest.raises(ValueError):
+        batcher.submit_many(requests)
+
+def test_failed_dependency_fails_its_dependents(sleeps):
+    def respond(request, attempt):
+        if request["url"] == "/me/onenote/sections/gone":
+            return {"status": 404, "body": {"error": {"code": "itemNotFound"}}}
+        return {"status": 424, "body": None}
+
+    graph = BatchGraph(respond)
+    batcher = GraphBatcher(graph)
+
+    parent, child = batcher.submit_many([
+        BatchRequest("me/onenote/sections/gone"),
+        BatchRequest("me/onenote/sections/gone/pages", depends_on=[0])
+    ])
+
+    assert parent.exception().status_code == 404
+    assert isinstance(child.exception(), GraphBatchError)
+    assert child.exception().status_code == 424
+    # The dependent is not sent again on its own
+    assert len(graph.payloads) == 1
+    assert sleeps == []
+    assert [error["status_code"] for error in graph.errors] == [404]
+
+def test_throttled_items_are_retried_alone(sleeps):
+    def respond(request, attempt):
+        if request["url"] == "/me/onenote/pages/1" and attempt == 0:
+            return {"status": 429, "headers": {"Retry-After": "2"}, "body": None}
+        return {"status": 200, "body": {"url": request["url"]}}
+
+    graph = BatchGraph(respond)
+    batcher = GraphBatcher(graph)
+
+    futures = batcher.submit_many([BatchRequest(f"me/onenote/pages/{i}") for i in range(3)])
+
+    assert [future.result()["url"] for future in futures] == [f"/me/onenote/pages/{i}" for i in range(3)]
+    assert [request["url"] for request in graph.payloads[1]["requests"]] == ["/me/onenote/pages/1"]
+    assert len(sleeps) == 1 and 2 <= sleeps[0] <= 2.5
+    assert graph.rate_limiter.throttles == [("me/onenote/pages/1", 2.0)]
+
+def test_items_fail_once_their_retries_are_used_up(sleeps):
+    graph = BatchGraph(lambda request, attempt: {"status": 503, "body": None})
+    batcher = GraphBatcher(graph, max_retries=2)
+
+    future, = batcher.submit_many([BatchRequest("me/onenote/pages/0")])
+
+    assert future.exception().status_code == 503
+    assert len(graph.payloads) == 3
+
+def test_decode_body():
+    png = b"\x89PNG\r\n\x1a\n"
+    assert _decode_body({"body": {"value": []}}) == {"value": []}
+    assert _decode_body({"body": base64.b64encode(png).decode(), "headers": {"Content-Type": "image/png"}}) == png
+    assert _decode_body({
+        "body": base64.b64encode(b"<html></html>").decode(),
+        "headers": {"content-type": "text/html"}
+    }) == "<html></html>"
+    assert _decode_body({"body": "not base64!", "headers": {"Content-Type": "text/plain"}}) == "not base64!"
+    assert _decode_body({"status": 204}) is None
@@ -0,0 +1,58 @@
+from src.auth import graph_client as graph_client_module
+from src.auth.batch import BatchRequest
+from src.auth.graph_client import GraphAPIClient
+from tests.conftest import FakeResponse
+
+URL = "https://graph.microsoft.com/v1.0/me/onenote/pages"
+
+def make_client(tmp_path, responses, **config) -> GraphAPIClient:
+    client = GraphAPIClient({
+        "client_id": "client",
+        "tenant_id": "tenant",
+        "scopes": ["Notes.Read"],
+        "openai_api_key": None,
+        "token_cache_file": str(tmp_path / "token_cache.json"),
+        **config
+    })
+    client.transport.request = lambda method, url, **kwargs: responses.pop(0)
+    return client
+
+def test_unusable_retry_after_backs_off(tmp_path, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(graph_client_module.time, "sleep", sleeps.append)
+    monkeypatch.setattr(GraphAPIClient, "add_progress", lambda self, message, coalesce_key=None: None)
+    client = make_client(tmp_path, [
+        FakeResponse(status_code=429, headers={"Retry-After": "soon"}),
+        FakeResponse(b"{}")
+    ])
+
+    response = client._send("GET", URL)
+
+    assert response.status_code == 200
+    assert len(sleeps) == 1
+
+def test_retry_after_zero_retries_at_once(tmp_path, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(graph_client_module.time, "sleep", sleeps.append)
+    monkeypatch.setattr(GraphAPIClient, "add_progress", lambda self, message, coalesce_key=None: None)
+    client = make_client(tmp_path, [
+        FakeResponse(status_code=429, headers={"Retry-After": "0"}),
+        FakeResponse(b"{}")
+    ])
+
+    response = client._send("GET", URL)
+
+    assert response.status_code == 200
+    assert sleeps == []
+
+def test_batched_revalidation_leaves_the_callers_request_alone(tmp_path, monkeypatch):
+    client = make_client(tmp_path, [], response_cache=True, response_cache_dir=str(tmp_path / "cache"))
+    client.response_cache.store(URL, {"value": []}, {"ETag": '"v1"'})
+    sent = []
+    monkeypatch.setattr(client.batcher, "submit_many", sent.extend)
+    request = BatchRequest("me/onenote/pages")
+
+    client.call_graph_api_many([request])
+
+    assert request.headers is None
+    assert sent[0].headers == {"If-None-Match": '"v1"'}
@@ -0,0 +1,35 @@
+import pytest
+import requests
+
+from src.cli import EXIT_AUTH_FAILED, run_headless
+
+class FailingTokenProvider:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def use_refresh_token(self, refresh_token: str) -> None:
+        pass
+
+    def get_access_token(self) -> str:
+        raise self.error
+
+class Client:
+    def __init__(self, error: Exception):
+        self.config = {"onenote_root": "me/onenote"}
+        self.token_provider = FailingTokenProvider(error)
+        self.started = False
+
+    def start_fetcher(self) -> bool:
+        self.started = True
+        return True
+
+@pytest.mark.parametrize("error", [
+    ValueError("invalid_grant"),
+    requests.ConnectionError("login.microsoftonline.com unreachable"),
+    RuntimeError("MSAL authority discovery failed")
+])
+def test_authentication_errors_exit_with_the_auth_code(error):
+    client = Client(error)
+
+    assert run_headless(client, refresh_token="token") == EXIT_AUTH_FAILED
+    assert not client.started
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry, endpoint_template, observe_request
+
+def test_endpoint_template_drops_ids_and_queries():
+    url = "https://graph.microsoft.com/v1.0/me/onenote/sections/1-ab!2/pages?$top=100"
+
+    assert endpoint_template(url) == "me/onenote/sections/{id}/pages"
+    assert endpoint_template("https://images.onenote.test/preview/42.png") == "images.onenote.test"
+
+def test_prometheus_rendering():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc(endpoint="pages", status=200)
+    registry.counter("requests_total").inc(2, endpoint="pages", status=200)
+    registry.gauge("in_flight").set_function(lambda: 3)
+    histogram = registry.histogram("latency_seconds", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(5.0)
+
+    text = registry.render()
+
+    assert "# HELP requests_total Requests" in text
+    assert 'requests_total{endpoint="pages",status="200"} 3' in text
+    assert "in_flight 3" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+
+def test_summary_estimates_quantiles(tmp_path):
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", buckets=(1.0, 2.0))
+    for _ in range(100):
+        histogram.observe(1.5)
+
+    path = tmp_path / "metrics.json"
+    registry.write_summary(str(path))
+    entry, = json.loads(path.read_text())["histograms"]["latency_seconds"]
+
+    assert entry["count"] == 100
+    assert entry["max"] == 1.5
+    assert 1.0 < entry["p50"] <= entry["p99"] <= 2.0
+
+def test_metric_kinds_cannot_be_mixed():
+    registry = MetricsRegistry()
+    registry.counter("items")
+
+    with pytest.raises(ValueError):
+        registry.gauge("items")
+
+def test_throttled_requests_are_counted():
+    registry = MetricsRegistry()
+
+    observe_request(registry, "GET", "https://graph.microsoft.com/v1.0/me/onenote/pages", 429, 0.2, size=10)
+    observe_request(None, "GET", "https://graph.microsoft.com/v1.0/me/onenote/pages", 429, 0.2)
+
+    throttled = registry.summary()["counters"]["onenote_http_throttled_total"]
+    assert throttled == [{"labels": {"endpoint": "me/onenote/pages", "status": "429"}, "value": 1.0}]
@@ -0,0 +1,55 @@
+import threading
+
+from src.utils.progress_bus import ProgressBus
+
+def test_coalesced_messages_replace_the_newest_event():
+    bus = ProgressBus()
+    bus.publish({"message": "listing"})
+    bus.publish({"message": "call 1"}, coalesce_key="api_call")
+    bus.publish({"message": "call 2"}, coalesce_key="api_call")
+
+    assert bus.snapshot() == [{"message": "listing"}, {"message": "call 2", "coalesced": 2}]
+    assert bus.last_id == 3
+
+def test_ring_buffer_reports_evicted_events():
+    bus = ProgressBus(capacity=3)
+    for index in range(5):
+        bus.publish({"n": index})
+
+    events, dropped = bus.events_after(0)
+
+    assert [event.data["n"] for event in events] == [2, 3, 4]
+    assert dropped
+    # Event ids start at 1, so a subscriber that saw event 2 missed nothing
+    assert not bus.events_after(2)[1]
+    assert bus.events_after(5) == ([], False)
+
+def test_subscribers_resume_after_the_last_seen_event():
+    bus = ProgressBus(flush_interval=0, heartbeat=5)
+    for index in range(3):
+        bus.publish({"n": index})
+    received = []
+
+    def consume():
+        for event in bus.subscribe(last_id=1):
+            received.append(event.data["n"])
+
+    thread = threading.Thread(target=consume)
+    thread.start()
+    bus.publish({"n": 3})
+    bus.close()
+    thread.join(5)
+
+    assert received == [1, 2, 3]
+    assert bus.subscribers == 0
+
+def test_lagging_subscribers_get_a_gap_notice():
+    bus = ProgressBus(capacity=2, flush_interval=0)
+    for index in range(4):
+        bus.publish({"n": index})
+    bus.close()
+
+    events = list(bus.subscribe(last_id=1))
+
+    assert events[0].data["type"] == "gap"
+    assert [event.data["n"] for event in events[1:]] == [2, 3]
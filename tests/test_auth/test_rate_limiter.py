@@ -0,0 +1,40 @@
+from email.utils import formatdate
+import time
+
+from src.utils.rate_limiter import RateLimiter, parse_retry_after
+
+URL = "https://graph.microsoft.com/v1.0/me/onenote/pages"
+
+def test_parse_retry_after_accepts_seconds_and_dates():
+    assert parse_retry_after("0") == 0.0
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert 0 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+def test_retry_after_zero_is_honoured_without_a_pause():
+    limiter = RateLimiter(initial_concurrency=8)
+
+    limiter.record(URL, 429, 0.1, "0")
+
+    # The server asked for an immediate retry: shrink the limit, but don't wait
+    assert limiter.concurrency.limit < 8
+    assert limiter.reserve(URL) == 0.0
+    assert limiter.backoff(0, "0") == 0.0
+
+def test_retry_after_pauses_the_endpoint_family():
+    limiter = RateLimiter()
+
+    limiter.record(URL, 429, 0.1, "30")
+
+    assert 29 < limiter.reserve(URL) <= 31
+    assert limiter.reserve("https://graph.microsoft.com/v1.0/me/onenote/pages/p1/content") < 1
+
+def test_missing_or_invalid_retry_after_falls_back_to_backoff():
+    limiter = RateLimiter(base_backoff=1.0, max_backoff=4.0)
+
+    limiter.record(URL, 503, 0.1, "soon")
+
+    assert limiter.reserve(URL) == 0.0
+    assert 0 <= limiter.backoff(5, "soon") <= 4.0
@@ -0,0 +1,58 @@
+import time
+
+from src.utils.response_cache import ResponseCache, parse_ttls
+
+URL = "https://graph.microsoft.com/v1.0/me/onenote/notebooks"
+
+def test_entries_carry_their_validators(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store(URL, {"value": []}, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+    entry = cache.lookup(URL)
+
+    assert entry.body == {"value": []}
+    assert entry.conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+    assert not cache.is_fresh(entry)
+    assert cache.lookup(URL, variant="text") is None
+
+def test_entries_survive_a_reopen(tmp_path):
+    ResponseCache(str(tmp_path)).store(URL, {"value": [1]}, {"ETag": '"v1"'})
+
+    assert ResponseCache(str(tmp_path)).lookup(URL).body == {"value": [1]}
+
+def test_ttl_serves_entries_without_revalidation(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), ttls={"listing": 60})
+    cache.store(URL, {"value": []}, {})
+    entry = cache.lookup(URL)
+    assert cache.is_fresh(entry)
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert not cache.is_fresh(entry)
+    cache.revalidated(entry)
+    assert cache.is_fresh(cache.lookup(URL))
+
+def test_unstorable_responses_are_skipped(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store(URL, {}, {"ETag": '"v1"', "Cache-Control": "private, no-store"})
+    cache.store(f"{URL}/other", {}, {})
+
+    assert cache.lookup(URL) is None
+    assert cache.lookup(f"{URL}/other") is None
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=700)
+    for name in ("a", "b", "c"):
+        cache.store(f"{URL}/{name}", "x" * 100, {"ETag": name})
+        if name == "b":
+            cache.lookup(f"{URL}/a")
+
+    assert cache.lookup(f"{URL}/a") is not None
+    assert cache.lookup(f"{URL}/b") is None
+    assert cache.lookup(f"{URL}/c") is not None
+
+def test_parse_ttls_skips_invalid_parts():
+    assert parse_ttls("listing=60, content=300,broken,resource=soon") == {"listing": 60.0, "content": 300.0}
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from src.auth.token_provider import APP_SCOPES, TokenProvider, TokenRefreshError
+from src.utils.token_cache import TokenCache
+
+class FakeMsalApp:
+    """Issues numbered tokens; ``acquire_token_by_refresh_token`` can be slowed down or made to fail."""
+
+    def __init__(self, delay: float = 0.0, error: bool = False):
+        self.delay = delay
+        self.error = error
+        self.issued = 0
+        self.refresh_tokens = []
+        self.token_cache = None
+
+    def get_accounts(self):
+        return []
+
+    def acquire_token_by_refresh_token(self, refresh_token, scopes):
+        self.refresh_tokens.append(refresh_token)
+        time.sleep(self.delay)
+        if self.error:
+            return {"error": "invalid_grant", "error_description": "Refresh token expired"}
+        self.issued += 1
+        return {"access_token": f"token-{self.issued}", "expires_in": 3600, "refresh_token": "rotated"}
+
+    def acquire_token_for_client(self, scopes):
+        assert scopes == APP_SCOPES
+        self.issued += 1
+        return {"access_token": f"app-{self.issued}", "expires_in": 3600}
+
+def make_provider(tmp_path, app: FakeMsalApp, **kwargs) -> TokenProvider:
+    cache = TokenCache(str(tmp_path / "token_cache.json"))
+    return TokenProvider(lambda: app, cache, ["Notes.Read"], **kwargs)
+
+def test_valid_tokens_are_served_from_the_cache(tmp_path):
+    app = FakeMsalApp()
+    provider = make_provider(tmp_path, app)
+    provider.token_cache.set_token({"token": "cached", "expires_at": time.time() + 3600, "refresh_token": "r"})
+
+    assert provider.get_access_token() == "cached"
+    assert app.refresh_tokens == []
+
+def test_concurrent_callers_share_one_refresh(tmp_path):
+    app = FakeMsalApp(delay=0.1)
+    provider = make_provider(tmp_path, app)
+    provider.use_refresh_token("initial")
+    tokens = []
+
+    threads = [threading.Thread(target=lambda: tokens.append(provider.get_access_token())) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert tokens == ["token-1"] * 10
+    assert app.refresh_tokens == ["initial"]
+    assert provider.refreshes == 1
+    assert provider.token_cache.get_token()["refresh_token"] == "rotated"
+
+def test_rejected_tokens_are_refreshed_once(tmp_path):
+    app = FakeMsalApp()
+    provider = make_provider(tmp_path, app)
+    provider.use_refresh_token("initial")
+    first = provider.get_access_token()
+
+    second = provider.refresh(rejected=first)
+
+    assert second == "token-2"
+    # A caller still holding the old token gets the replacement without another refresh
+    assert provider.refresh(rejected=first) == "token-2"
+    assert app.issued == 2
+
+def test_failed_refresh_raises_token_refresh_error(tmp_path):
+    provider = make_provider(tmp_path, FakeMsalApp(error=True))
+    provider.use_refresh_token("expired")
+
+    with pytest.raises(TokenRefreshError, match="Refresh token expired") as info:
+        provider.get_access_token()
+    assert info.value.result["error"] == "invalid_grant"
+
+def test_missing_refresh_token_is_reported(tmp_path):
+    with pytest.raises(TokenRefreshError):
+        make_provider(tmp_path, FakeMsalApp()).get_access_token()
+
+def test_client_credentials_acquire_app_tokens(tmp_path):
+    app = FakeMsalApp()
+    provider = TokenProvider(lambda: app, TokenCache(str(tmp_path / "cache.json")), APP_SCOPES,
+                             client_credentials=True)
+
+    assert provider.get_access_token() == "app-1"
+    assert provider.get_access_token() == "app-1"
@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+from src.utils.tracing import NULL_SPAN, Tracer, trace_span
+
+def test_disabled_tracer_hands_out_the_null_span():
+    tracer = Tracer(enabled=False)
+
+    assert tracer.span("graph.listing") is NULL_SPAN
+    assert trace_span(None, "graph.listing") is NULL_SPAN
+    with tracer.span("graph.listing") as span:
+        span.set(status=200)
+    assert tracer.totals() == {}
+
+def test_spans_are_exported_as_a_chrome_trace(tmp_path):
+    tracer = Tracer(enabled=True)
+    with tracer.span("graph.listing", "graph", endpoint="me/onenote/pages") as span:
+        span.set(status=200)
+    with pytest.raises(OSError):
+        with trace_span(tracer, "write.preview", "disk"):
+            raise OSError("disk full")
+
+    path = tmp_path / "trace.json"
+    tracer.export(str(path))
+    events = [event for event in json.loads(path.read_text())["traceEvents"] if event["ph"] == "X"]
+
+    assert [event["name"] for event in events] == ["graph.listing", "write.preview"]
+    assert events[0]["args"] == {"endpoint": "me/onenote/pages", "status": 200}
+    assert events[1]["args"] == {"error": "OSError"}
+    assert tracer.totals()["graph.listing"]["count"] == 1
+
+def test_asyncio_tasks_get_their_own_lanes():
+    tracer = Tracer(enabled=True)
+
+    async def work():
+        with tracer.span("page"):
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(work(), work())
+
+    asyncio.run(main())
+
+    lanes = {event["tid"] for event in tracer.chrome_trace()["traceEvents"] if event["ph"] == "X"}
+    assert len(lanes) == 2
+
+def test_spans_beyond_the_limit_are_dropped():
+    tracer = Tracer(enabled=True, max_events=2)
+    for _ in range(5):
+        with tracer.span("page"):
+            pass
+
+    assert tracer.totals()["page"]["count"] == 2
+    assert tracer.chrome_trace()["otherData"] == {"dropped_spans": 3}
+    tracer.reset()
+    assert tracer.totals() == {}
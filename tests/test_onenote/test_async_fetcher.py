@@ -0,0 +1,49 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from benchmarks.mock_graph import FaultProfile, TenantShape, start_in_subprocess
+from src.auth.graph_client import GraphAPIClient, load_config
+
+@pytest.fixture
+def mock_graph():
+    shape = TenantShape(sections=2, section_groups=1, group_depth=2, group_sections=1, pages=5, images=1)
+    process, base_url = start_in_subprocess(shape, FaultProfile())
+    try:
+        yield shape, base_url
+    finally:
+        process.terminate()
+        process.join()
+
+def test_async_backend_writes_previews_without_metadata_cache(mock_graph, tmp_path):
+    """With a TTL of 0 every metadata lookup misses; output paths must still resolve."""
+    shape, base_url = mock_graph
+    config = load_config()
+    config.update({
+        "graph_base_url": base_url,
+        "token_cache_file": str(tmp_path / "token.json"),
+        "output_dir": str(tmp_path / "images"),
+        "fetch_backend": "async",
+        "metadata_cache_ttl": 0.0,
+        "notebook_name": "Notebook 0",
+        "site_id": "site",
+        "openai_api_key": None,
+        "crawl_journal": False,
+        "trace": False,
+        "profile": None
+    })
+    client = GraphAPIClient(config)
+    client.token_cache.set_token({"token": "test", "expires_at": time.time() + 3600, "refresh_token": None})
+
+    assert client.start_fetcher()
+
+    previews = [
+        name
+        for _, _, files in os.walk(tmp_path / "images" / "Notebook 0")
+        for name in files
+        if name.endswith(".png")
+    ]
+    assert len(previews) == shape.page_count()
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from src.utils.atomic_writer import AtomicFileWriter, replace_extension, sniff_content_type, write_stream_atomic
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 32
+
+def hidden_files(directory) -> list:
+    return [name for name in os.listdir(directory) if name.startswith(".")]
+
+@pytest.mark.parametrize("head, expected", [
+    (PNG, "image/png"),
+    (JPEG, "image/jpeg"),
+    (b"GIF89a", "image/gif"),
+    (b"RIFF\x00\x00\x00\x00WEBP", "image/webp"),
+    (b"%PDF-1.7", "application/pdf"),
+    (b"plain text", None)
+])
+def test_sniff_content_type(head, expected):
+    sniffed = sniff_content_type(head)
+    assert (sniffed[0] if sniffed else None) == expected
+
+def test_replace_extension_keeps_aliases():
+    assert replace_extension("a/image.png", "image/jpeg") == "a/image.jpg"
+    assert replace_extension("a/image.jpeg", "image/jpeg") == "a/image.jpeg"
+    assert replace_extension("a/image.png", "text/plain") == "a/image.png"
+    assert replace_extension("a/image.png", None) == "a/image.png"
+
+def test_commit_renames_to_the_sniffed_type(tmp_path):
+    result = write_stream_atomic([JPEG[:3], JPEG[3:]], str(tmp_path / "image.png"), fsync_policy="none")
+
+    assert result.path == str(tmp_path / "image.jpg")
+    assert result.content_type == "image/jpeg"
+    assert result.size == len(JPEG)
+    assert os.listdir(tmp_path) == ["image.jpg"]
+
+def test_commit_can_keep_the_requested_name(tmp_path):
+    result = write_stream_atomic([JPEG], str(tmp_path / "preview.png"), fsync_policy="none", fix_extension=False)
+
+    assert result.path == str(tmp_path / "preview.png")
+    assert result.content_type == "image/jpeg"
+    assert os.listdir(tmp_path) == ["preview.png"]
+
+def test_nothing_is_visible_before_commit(tmp_path):
+    writer = AtomicFileWriter(str(tmp_path / "image.png"), fsync_policy="none")
+    writer.write(PNG)
+
+    assert not (tmp_path / "image.png").exists()
+    assert len(hidden_files(tmp_path)) == 1
+    assert not writer.committed
+
+    writer.commit()
+    assert writer.committed
+    assert (tmp_path / "image.png").read_bytes() == PNG
+    assert hidden_files(tmp_path) == []
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    def chunks():
+        yield PNG
+        raise ConnectionError("connection reset")
+
+    with pytest.raises(ConnectionError):
+        write_stream_atomic(chunks(), str(tmp_path / "image.png"), fsync_policy="none")
+    assert os.listdir(tmp_path) == []
+
+def test_unknown_fsync_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        AtomicFileWriter(str(tmp_path / "image.png"), fsync_policy="always")
@@ -0,0 +1,67 @@
+import hashlib
+import os
+
+import pytest
+
+from src.utils.blob_store import BlobInfo, BlobStore
+
+def write(path, data: bytes) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return hashlib.sha256(data).hexdigest()
+
+def test_identical_files_share_one_blob(tmp_path):
+    store = BlobStore(str(tmp_path / "store"))
+    first, second = str(tmp_path / "a" / "1.png"), str(tmp_path / "b" / "2.png")
+    digest = write(first, b"image")
+    write(second, b"image")
+
+    store.adopt(first, digest)
+    store.adopt(second, digest)
+
+    assert os.path.samefile(first, store.blob_path(digest))
+    assert os.path.samefile(second, store.blob_path(digest))
+    assert open(second, "rb").read() == b"image"
+
+def test_resource_index_survives_a_reopen(tmp_path):
+    root = str(tmp_path / "store")
+    store = BlobStore(root)
+    path = str(tmp_path / "out" / "1.png")
+    digest = write(path, b"image")
+    store.adopt(path, digest)
+    store.remember_resource("resource-1", BlobInfo(digest, 5, "image/png"))
+    store.save()
+
+    reopened = BlobStore(root)
+
+    assert reopened.lookup_resource("resource-1") == BlobInfo(digest, 5, "image/png")
+    assert reopened.lookup_resource("resource-2") is None
+
+def test_garbage_collection_removes_unreferenced_blobs(tmp_path):
+    store = BlobStore(str(tmp_path / "store"))
+    kept, dropped = str(tmp_path / "out" / "kept.png"), str(tmp_path / "out" / "dropped.png")
+    kept_digest, dropped_digest = write(kept, b"kept"), write(dropped, b"dropped")
+    store.adopt(kept, kept_digest)
+    store.adopt(dropped, dropped_digest)
+    store.remember_resource("dropped", BlobInfo(dropped_digest, 7))
+    os.remove(dropped)
+
+    assert store.collect_garbage() == 1
+    assert store.has(kept_digest)
+    assert not store.has(dropped_digest)
+    assert store.lookup_resource("dropped") is None
+
+def test_copy_mode_keeps_independent_files(tmp_path):
+    store = BlobStore(str(tmp_path / "store"), link_mode="copy")
+    path = str(tmp_path / "out" / "1.png")
+    digest = write(path, b"image")
+
+    store.adopt(path, digest)
+
+    assert not os.path.samefile(path, store.blob_path(digest))
+    assert store.collect_garbage() == 0
+
+def test_unknown_link_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        BlobStore(str(tmp_path / "store"), link_mode="reflink")
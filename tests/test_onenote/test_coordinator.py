@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from src.onenote import coordinator as coordinator_module
+from src.onenote.coordinator import (
+    CrawlCoordinator, CrawlPlan, CrawlTarget, RunReport, ShardWorker, TargetResult,
+    account_config, load_plan, shard_targets
+)
+from src.utils.work_queue import DirectoryQueue
+
+def test_node_rate_share_is_split_among_local_workers(monkeypatch):
+    pools = []
+    monkeypatch.setattr(coordinator_module, "ProcessPoolExecutor", lambda **kwargs: pools.append(kwargs))
+    coordinator = CrawlCoordinator({}, CrawlPlan(targets=[]), workers=4, rate_share=0.5)
+
+    coordinator._pool()
+
+    assert pools[0]["max_workers"] == 4
+    assert pools[0]["initargs"][2] == pytest.approx(0.125)
+
+def test_workers_get_their_share_of_the_account_budget():
+    config = account_config({"rate_limit_rps": 10.0, "rate_limit_burst": 20.0}, "default", {}, rate_share=0.25)
+
+    assert config["rate_limit_rps"] == 2.5
+    assert config["rate_limit_burst"] == 5.0
+
+@pytest.mark.parametrize("rate_share", [0, -1, 1.5])
+def test_rate_share_must_be_a_fraction(rate_share):
+    with pytest.raises(ValueError):
+        CrawlCoordinator({}, CrawlPlan(targets=[]), rate_share=rate_share)
+
+def test_targets_sharing_an_output_directory_stay_in_one_shard():
+    targets = [
+        CrawlTarget("A", account="alice"),
+        CrawlTarget("B", account="bob"),
+        CrawlTarget("C", account="alice"),
+        CrawlTarget("D", onenote_root="sites/x/onenote", account="alice")
+    ]
+
+    shards = shard_targets(targets, shard_size=2)
+
+    assert [[t.notebook_name for t in shard.targets] for shard in shards] == [["A", "C"], ["B", "D"]]
+    assert shard_targets(targets, shard_size=2)[0].id == shards[0].id
+
+def test_load_plan_accepts_a_plain_list(tmp_path):
+    path = tmp_path / "targets.json"
+    path.write_text(json.dumps([{"notebook_name": "Ops", "account": "archive"}]))
+
+    plan = load_plan(str(path))
+
+    assert plan.targets == [CrawlTarget("Ops", account="archive")]
+    assert plan.accounts == {}
+
+def test_failing_targets_are_reported_not_raised(monkeypatch, tmp_path):
+    class NoSignIn:
+        def __getattr__(self, name):
+            raise RuntimeError("sign-in failed")
+
+    worker = ShardWorker({"output_dir": str(tmp_path)}, {})
+    monkeypatch.setattr(worker, "client", lambda account: NoSignIn())
+
+    result, = worker.run_shard(shard_targets([CrawlTarget("Ops")], 4)[0])
+
+    assert not result.ok
+    assert result.error == "RuntimeError: sign-in failed"
+
+def test_drain_completes_every_claimed_shard(monkeypatch, tmp_path):
+    queue = DirectoryQueue(str(tmp_path / "queue"))
+    for shard in shard_targets([CrawlTarget(name, account=name) for name in "ABC"], 1):
+        queue.put(shard.id, shard.to_dict())
+    worker = ShardWorker({}, {})
+    monkeypatch.setattr(worker, "run_target", lambda target: TargetResult(
+        target.id, target.account, target.notebook_name, True, 0.0, worker.name
+    ))
+
+    assert worker.drain(queue) == 3
+    report = RunReport(0.0, 1.0, CrawlCoordinator.collect(queue))
+    assert report.ok
+    assert report.summary()["totals"] == {"targets": 3, "failed": 0}
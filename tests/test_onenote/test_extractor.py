@@ -0,0 +1,81 @@
+from src.onenote.extractor import ResourceReferenceExtractor, extract_resource_references
+
+RESOURCE = "https://graph.microsoft.com/v1.0/me/onenote/resources/0-abc!1/$value"
+
+def test_full_resolution_rendition_is_preferred():
+    html = (f'<p>x</p><img src="{RESOURCE}" data-src-type="image/png" '
+            f'data-fullres-src="{RESOURCE}?full" data-fullres-src-type="image/jpeg" width="640" height="480.5">')
+
+    source, = extract_resource_references(html)
+
+    assert source.url == f"{RESOURCE}?full"
+    assert source.content_type == "image/jpeg"
+    assert (source.width, source.height) == (640, 480)
+    assert source.resource_id == "0-abc!1"
+
+def test_objects_and_images_without_a_source():
+    html = f'<img alt="no source"><object data="{RESOURCE}" type="application/pdf" data-attachment="a.pdf"></object>'
+
+    source, = extract_resource_references(html)
+
+    assert (source.tag, source.url, source.content_type) == ("object", RESOURCE, "application/pdf")
+
+def test_quoted_values_may_contain_angle_brackets():
+    source, = extract_resource_references(f'<img alt="a > b" src="{RESOURCE}">')
+
+    assert source.url == RESOURCE
+    assert source.attributes["alt"] == "a > b"
+
+def test_multibyte_characters_split_across_byte_chunks():
+    data = f'<img alt="Grüße" src="{RESOURCE}">'.encode("utf-8")
+    split = data.index("ü".encode("utf-8")) + 1
+    extractor = ResourceReferenceExtractor()
+
+    sources = extractor.feed(data[:split]) + extractor.feed(data[split:]) + extractor.close()
+
+    assert [source.attributes["alt"] for source in sources] == ["Grüße"]
+
+def test_single_quoted_and_unquoted_values():
+    html = f"<img src='{RESOURCE}' alt='a \"quoted\" > b'><img src=https://onenote.test/a.png width=640 alt=x/>"
+
+    first, second = extract_resource_references(html)
+
+    assert first.url == RESOURCE
+    assert first.attributes["alt"] == 'a "quoted" > b'
+    assert second.url == "https://onenote.test/a.png"
+    assert second.width == 640
+    # An unquoted value keeps a trailing slash, as in HTML
+    assert second.attributes["alt"] == "x/"
+
+def test_unquoted_values_end_at_quotes_and_backticks():
+    source, = extract_resource_references(f"<img alt=it's title=a`b src={RESOURCE}>")
+
+    assert source.attributes["alt"] == "it"
+    assert source.attributes["title"] == "a"
+    assert source.url == RESOURCE
+
+def test_stray_quotes_do_not_swallow_later_tags():
+    html = f"<img alt=it's src=https://onenote.test/a.png><p>it's</p><img src=\"{RESOURCE}\">"
+
+    assert [source.url for source in extract_resource_references(html)] == ["https://onenote.test/a.png", RESOURCE]
+
+def test_entity_encoded_values_are_decoded():
+    source, = extract_resource_references('<img src="https://onenote.test/a.png?w=1&amp;h=2" alt=&lt;chart&gt;>')
+
+    assert source.url == "https://onenote.test/a.png?w=1&h=2"
+    assert source.attributes["alt"] == "<chart>"
+
+def test_tags_split_across_chunks():
+    html = f"<p>text</p><img data-src-type='image/png' src={RESOURCE} width=\"10\"><object data='{RESOURCE}'>"
+
+    for split in range(1, len(html)):
+        extractor = ResourceReferenceExtractor()
+        sources = extractor.feed(html[:split]) + extractor.feed(html[split:]) + extractor.close()
+        assert [(source.tag, source.url) for source in sources] == [("img", RESOURCE), ("object", RESOURCE)], split
+
+def test_unterminated_tags_with_unquoted_values_fail_fast():
+    html = "<img " + " ".join(f"a{index}={'v' * 40}" for index in range(40))
+    extractor = ResourceReferenceExtractor()
+
+    assert extractor.feed(html) == []
+    assert extractor.close() == []
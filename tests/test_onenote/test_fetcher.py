@@ -0,0 +1,55 @@
+import os
+
+from src.onenote.fetcher import OneNoteImageFetcher, PageTask
+from src.onenote.models import Page, Section
+from src.onenote.pipeline import Pipeline
+from src.utils.atomic_writer import AtomicFileWriter
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+def make_fetcher(fake_graph, tmp_path, **overrides):
+    return OneNoteImageFetcher(fake_graph, overrides={"output_dir": str(tmp_path), "blob_store": False, **overrides})
+
+def make_task(tmp_path) -> PageTask:
+    section = Section(id="s1", name="Section", url="", notebook_id="n1")
+    page = Page(id="p1", title="Page", url="", section_id="s1")
+    writer = AtomicFileWriter(str(tmp_path / "Section" / "Page.png"), fsync_policy="none")
+    writer.write(PNG)
+    return PageTask(section=section, page=page, preview_url="https://example.test/p1", writer=writer)
+
+def test_failed_write_stage_discards_the_temporary_file(fake_graph, tmp_path):
+    fetcher = make_fetcher(fake_graph, tmp_path)
+    task = make_task(tmp_path)
+
+    def failing_write(item):
+        raise OSError("disk full")
+
+    pipeline = Pipeline(queue_size=1, on_error=fetcher._on_stage_error)
+    pipeline.add_stage("write", failing_write, workers=1)
+    pipeline.run([task])
+
+    assert task.writer._file.closed
+    assert list((tmp_path / "Section").iterdir()) == []
+    assert fetcher.stats["errors"] == 1
+    assert fake_graph.progress[-1] == "Error: processing_error"
+
+def test_errors_after_commit_keep_the_written_file(fake_graph, tmp_path):
+    fetcher = make_fetcher(fake_graph, tmp_path)
+    task = make_task(tmp_path)
+    task.writer.commit(fix_extension=False)
+
+    fetcher._on_stage_error("write", task, RuntimeError("manifest failed"))
+
+    assert (tmp_path / "Section" / "Page.png").read_bytes() == PNG
+
+def test_previews_keep_their_png_name(fake_graph, tmp_path):
+    fetcher = make_fetcher(fake_graph, tmp_path)
+    task = make_task(tmp_path)
+    task.writer.abort()
+    task.writer = AtomicFileWriter(str(tmp_path / "Section" / "Page.png"), fsync_policy="none")
+    # Previews may be served as JPEG
+    task.writer.write(b"\xff\xd8\xff\xe0" + b"\x00" * 32)
+
+    fetcher._write_preview(task)
+
+    assert sorted(os.listdir(tmp_path / "Section")) == ["Page.png"]
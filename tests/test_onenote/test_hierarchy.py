@@ -0,0 +1,56 @@
+from src.onenote.hierarchy import HierarchyLoader, NotebookTree, notebooks_endpoint
+
+def link(name: str):
+    return {"oneNoteWebUrl": {"href": f"https://onenote.test/{name}"}}
+
+def section(section_id: str):
+    return {"id": section_id, "displayName": section_id.upper(), "links": link(section_id)}
+
+# Two expanded levels, with group g2 nested too deep to be expanded in the listing
+NOTEBOOKS = {"value": [{
+    "id": "n1",
+    "displayName": "Notebook",
+    "links": link("n1"),
+    "sections": [section("s1")],
+    "sectionGroups": [{
+        "id": "g1",
+        "displayName": "Group",
+        "sections": [section("s2")],
+        "sectionGroups": [{"id": "g2", "displayName": "Nested"}]
+    }]
+}]}
+
+GROUP_G2 = {"id": "g2", "displayName": "Nested", "sections": [section("s3")], "sectionGroups": []}
+
+def respond(endpoint: str):
+    if endpoint.startswith("me/onenote/notebooks"):
+        return NOTEBOOKS
+    assert endpoint.startswith("me/onenote/sectionGroups/g2")
+    return GROUP_G2
+
+def test_loader_expands_nested_groups_in_follow_up_calls(fake_graph):
+    fake_graph.handler = respond
+
+    tree = HierarchyLoader(fake_graph).load()
+
+    assert len(fake_graph.calls) == 2
+    assert [s.id for s in tree.sections_in("n1")] == ["s1", "s2", "s3"]
+    notebook, groups, leaf = tree.path("s3")
+    assert notebook.name == "Notebook"
+    assert [group.id for group in groups] == ["g1", "g2"]
+    assert leaf.parent_section_group_id == "g2"
+
+def test_tree_finds_notebooks_by_name():
+    tree = NotebookTree()
+    assert tree.add_notebook(NOTEBOOKS["value"][0]) == ["g2"]
+
+    assert tree.find_notebook("Notebook").id == "n1"
+    assert tree.find_notebook("Missing") is None
+
+def test_projection_selects_only_the_needed_fields():
+    projected = notebooks_endpoint()
+    full = notebooks_endpoint(projection=False)
+
+    assert "$select=" in projected and "$top=" in projected
+    assert "$select" not in full
+    assert full.startswith("me/onenote/notebooks?$expand=sections,sectionGroups")
@@ -0,0 +1,62 @@
+from src.onenote.journal import CrawlJournal
+from src.onenote.models import Page, Section
+
+def page(page_id: str, section_id: str = "s1") -> Page:
+    return Page(id=page_id, title=page_id, url="", section_id=section_id)
+
+def open_journal(tmp_path, run_key: str = "me/onenote:Notebook") -> CrawlJournal:
+    return CrawlJournal(str(tmp_path / "journal.db"), run_key, commit_interval=60)
+
+def test_interrupted_run_resumes_from_the_journal(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.record_sections([Section(id="s1", name="One", url="", notebook_id="n1")])
+    journal.record_page(page("p1"))
+    journal.record_page(page("p2"))
+    journal.mark_listed("s1")
+    journal.mark_done("p1")
+    journal.close()
+
+    resumed = open_journal(tmp_path)
+
+    assert resumed.resumed
+    assert resumed.is_listed("s1")
+    assert [p.id for p in resumed.pages("s1")] == ["p1", "p2"]
+    assert resumed.is_done("p1") and not resumed.is_done("p2")
+    assert resumed.progress() == (1, 1)
+    resumed.close()
+
+def test_writes_are_committed_in_batches(tmp_path):
+    journal = open_journal(tmp_path)
+    for index in range(50):
+        journal.record_page(page(f"p{index}"))
+        journal.mark_done(f"p{index}")
+
+    journal.flush()
+
+    assert journal.commits == 1
+    journal.close()
+
+def test_finished_runs_start_fresh(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.record_page(page("p1"))
+    journal.mark_done("p1")
+    journal.flush()
+    journal.finish()
+    journal.close()
+
+    fresh = open_journal(tmp_path)
+
+    assert not fresh.resumed
+    assert not fresh.is_done("p1")
+    fresh.close()
+
+def test_runs_are_kept_apart(tmp_path):
+    journal = open_journal(tmp_path, "me/onenote:One")
+    journal.mark_listed("s1")
+    journal.close()
+
+    other = open_journal(tmp_path, "me/onenote:Two")
+
+    assert not other.resumed
+    assert not other.is_listed("s1")
+    other.close()
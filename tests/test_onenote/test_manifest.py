@@ -0,0 +1,61 @@
+import os
+
+from src.onenote.manifest import SyncManifest
+from src.onenote.models import Page
+from src.utils.atomic_writer import WriteResult
+
+def page(page_id="p1", section_id="s1", last_modified="2024-01-01T00:00:00Z") -> Page:
+    return Page(id=page_id, title=page_id, url="", section_id=section_id, last_modified=last_modified)
+
+def written(tmp_path, name: str) -> WriteResult:
+    path = tmp_path / name
+    path.write_bytes(b"image")
+    return WriteResult(path=str(path), sha256="0" * 64, size=5)
+
+def test_unchanged_pages_are_skipped_after_a_reload(tmp_path):
+    manifest = SyncManifest(str(tmp_path / "manifest.json"))
+    manifest.record(page(), [written(tmp_path, "p1.png")], notebook_id="n1")
+    manifest.save()
+
+    reloaded = SyncManifest(str(tmp_path / "manifest.json"))
+
+    assert reloaded.is_unchanged(page())
+    assert not reloaded.is_unchanged(page(last_modified="2024-02-01T00:00:00Z"))
+    assert not reloaded.is_unchanged(page(section_id="s2"))
+
+def test_missing_files_make_a_page_changed(tmp_path):
+    manifest = SyncManifest(str(tmp_path / "manifest.json"))
+    result = written(tmp_path, "p1.png")
+    manifest.record(page(), [result])
+
+    os.remove(result.path)
+
+    assert not manifest.is_unchanged(page())
+
+def test_files_a_page_no_longer_produces_are_removed(tmp_path):
+    manifest = SyncManifest(str(tmp_path / "manifest.json"))
+    old, new = written(tmp_path, "p1.bin"), written(tmp_path, "p1.png")
+    manifest.record(page(), [old])
+
+    manifest.record(page(), [new])
+
+    assert not os.path.exists(old.path)
+    assert os.path.exists(new.path)
+
+def test_pruning_removes_deleted_pages_and_sections(tmp_path):
+    manifest = SyncManifest(str(tmp_path / "manifest.json"))
+    kept, deleted, moved = (written(tmp_path, f"{name}.png") for name in ("kept", "deleted", "gone"))
+    manifest.record(page("kept"), [kept], notebook_id="n1")
+    manifest.record(page("deleted"), [deleted], notebook_id="n1")
+    manifest.record(page("gone", section_id="s2"), [moved], notebook_id="n1")
+
+    assert manifest.prune_section("s1", ["kept"]) == ["deleted"]
+    assert manifest.prune_notebook("n1", ["s1"]) == ["gone"]
+    assert sorted(manifest.entries) == ["kept"]
+    assert not os.path.exists(deleted.path) and not os.path.exists(moved.path)
+
+def test_unreadable_manifest_starts_empty(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{not json")
+
+    assert SyncManifest(str(path)).entries == {}
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from src.onenote.metadata_cache import MetadataCache
+from src.onenote.models import Notebook, Section
+
+def section(section_id: str = "s1") -> Section:
+    return Section(id=section_id, name=section_id, url="", notebook_id="n1")
+
+def test_concurrent_misses_share_one_load():
+    cache = MetadataCache()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return section()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(Section, "s1", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [section()] * 8
+    assert cache.loads == 1
+
+def test_seeded_objects_are_served_until_they_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = MetadataCache(ttl=10)
+    cache.seed([section(), Notebook(id="s1", name="Same id, other kind", url="")])
+
+    assert cache.get(Section, "s1", lambda: pytest.fail("should be cached")) == section()
+    assert cache.peek(Notebook, "s1").name == "Same id, other kind"
+
+    now[0] += 11
+    assert cache.peek(Section, "s1") is None
+
+def test_failed_loads_are_not_cached():
+    cache = MetadataCache()
+
+    def failing():
+        raise RuntimeError("Graph unavailable")
+
+    with pytest.raises(RuntimeError):
+        cache.get(Section, "s1", failing)
+    assert cache.get(Section, "s1", section) == section()
+
+def test_invalidate_by_kind():
+    cache = MetadataCache()
+    cache.seed([section("s1"), section("s2"), Notebook(id="n1", name="n", url="")])
+
+    cache.invalidate(Section)
+
+    assert cache.peek(Section, "s1") is None and cache.peek(Section, "s2") is None
+    assert cache.peek(Notebook, "n1") is not None
@@ -0,0 +1,61 @@
+import threading
+
+from src.onenote.pipeline import Pipeline, PipelineConfig
+
+def run_with_timeout(pipeline: Pipeline, items, timeout: float = 10.0) -> None:
+    thread = threading.Thread(target=pipeline.run, args=(items,), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline did not drain"
+
+def test_items_pass_every_stage():
+    results = []
+    lock = threading.Lock()
+
+    def collect(item):
+        with lock:
+            results.append(item)
+
+    pipeline = Pipeline(queue_size=2)
+    pipeline.add_stage("double", lambda item: [item, item], workers=2)
+    pipeline.add_stage("square", lambda item: [item * item], workers=3)
+    pipeline.add_stage("collect", collect, workers=1)
+    run_with_timeout(pipeline, range(20))
+
+    assert sorted(results) == sorted([i * i for i in range(20)] * 2)
+
+def test_handler_errors_are_reported_and_skipped():
+    errors = []
+    results = []
+
+    def handler(item):
+        if item % 3 == 0:
+            raise ValueError(item)
+        return [item]
+
+    pipeline = Pipeline(queue_size=1, on_error=lambda stage, item, error: errors.append((stage, item)))
+    pipeline.add_stage("filter", handler, workers=2)
+    pipeline.add_stage("collect", results.append, workers=1)
+    run_with_timeout(pipeline, range(10))
+
+    assert sorted(errors) == [("filter", 0), ("filter", 3), ("filter", 6), ("filter", 9)]
+    assert sorted(results) == [1, 2, 4, 5, 7, 8]
+
+def test_failing_error_handler_does_not_stall_the_pipeline():
+    def handler(item):
+        raise RuntimeError("stage failed")
+
+    def on_error(stage, item, error):
+        raise RuntimeError("error handler failed")
+
+    # More items than the queues hold; a dead worker would block the feeder forever
+    pipeline = Pipeline(queue_size=1, on_error=on_error)
+    pipeline.add_stage("fail", handler, workers=1)
+    pipeline.add_stage("never", lambda item: None, workers=1)
+    run_with_timeout(pipeline, range(50))
+
+def test_config_reads_pipeline_settings():
+    config = PipelineConfig.from_config({"download_workers": 3, "pipeline_queue_size": 5})
+    assert config.download_workers == 3
+    assert config.queue_size == 5
+    assert config.write_workers == PipelineConfig().write_workers
@@ -0,0 +1,65 @@
+from src.onenote.extractor import ImageSource
+from src.onenote.models import Page
+from src.onenote.resources import PageResourceDownloader, extract_image_sources, safe_filename
+from src.utils.blob_store import BlobStore
+
+PNG = b"\x89PNG\r\n\x1a\n"
+JPEG = b"\xff\xd8\xff\xe0"
+
+def resource_url(resource_id: str) -> str:
+    return f"https://graph.microsoft.com/v1.0/me/onenote/resources/{resource_id}/$value"
+
+def test_safe_filename_replaces_reserved_characters():
+    assert safe_filename('Q1: plan/"draft"') == "Q1__plan__draft_"
+    assert safe_filename("..") == "untitled"
+
+def test_extract_image_sources_keeps_images_only():
+    content = '<img src="a.png"><object data="b.pdf" type="application/pdf"></object><img src="c.png">'
+    assert [source.url for source in extract_image_sources(content)] == ["a.png", "c.png"]
+
+def test_pages_with_the_same_title_keep_their_own_images(fake_graph, tmp_path):
+    fake_graph.downloads = {
+        resource_url("a"): PNG + b"first page",
+        resource_url("b"): PNG + b"second page"
+    }
+    downloader = PageResourceDownloader(fake_graph, fsync_policy="none")
+    first = Page(id="1-abc", title="Meeting notes", url="", section_id="s")
+    second = Page(id="1-def", title="Meeting notes", url="", section_id="s")
+
+    written = [
+        downloader.download(first, [ImageSource(url=resource_url("a"), content_type="image/png")], str(tmp_path)),
+        downloader.download(second, [ImageSource(url=resource_url("b"), content_type="image/png")], str(tmp_path))
+    ]
+
+    paths = [results[0].path for results in written]
+    assert paths[0] != paths[1]
+    assert open(paths[0], "rb").read() == PNG + b"first page"
+    assert open(paths[1], "rb").read() == PNG + b"second page"
+    assert downloader.image_filename(first, 1, ImageSource(url="x")) == paths[0].rsplit("/", 1)[1]
+
+def test_failed_images_are_left_out(fake_graph, tmp_path):
+    fake_graph.downloads = {resource_url("a"): JPEG + b"image"}
+    downloader = PageResourceDownloader(fake_graph, fsync_policy="none")
+    page = Page(id="p", title="Page", url="", section_id="s")
+    sources = [
+        ImageSource(url=resource_url("missing"), content_type="image/png"),
+        ImageSource(url=resource_url("a"), content_type="image/jpeg")
+    ]
+
+    results = downloader.download(page, sources, str(tmp_path))
+
+    assert len(results) == 1
+    assert results[0].path.endswith("_002.jpg")
+
+def test_known_resources_are_linked_instead_of_downloaded(fake_graph, tmp_path):
+    fake_graph.downloads = {resource_url("a"): PNG + b"shared"}
+    store = BlobStore(str(tmp_path / "blobs"))
+    downloader = PageResourceDownloader(fake_graph, fsync_policy="none", blob_store=store)
+    source = ImageSource(url=resource_url("a"), content_type="image/png")
+
+    first = downloader.download(Page(id="p1", title="One", url="", section_id="s"), [source], str(tmp_path / "one"))
+    second = downloader.download(Page(id="p2", title="Two", url="", section_id="s"), [source], str(tmp_path / "two"))
+
+    assert fake_graph.calls == [resource_url("a")]
+    assert first[0].sha256 == second[0].sha256
+    assert open(second[0].path, "rb").read() == PNG + b"shared"
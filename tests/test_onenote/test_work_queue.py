@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from src.utils.work_queue import DirectoryQueue, SQLiteQueue, open_queue
+
+@pytest.fixture(params=["directory", "sqlite"])
+def queue(request, tmp_path):
+    if request.param == "directory":
+        return DirectoryQueue(str(tmp_path / "queue"))
+    return SQLiteQueue(str(tmp_path / "queue.db"))
+
+def test_items_are_claimed_once_and_completed(queue):
+    queue.put("b", {"n": 2})
+    queue.put("a", {"n": 1})
+    queue.put("a", {"n": 99})
+
+    assert queue.claim("worker-1") == ("a", {"n": 1})
+    assert queue.claim("worker-2") == ("b", {"n": 2})
+    assert queue.claim("worker-1") is None
+
+    queue.complete("a", {"ok": True})
+    assert queue.counts() == {"pending": 0, "claimed": 1, "done": 1}
+    assert queue.results() == [{"ok": True}]
+
+def test_completed_items_are_not_queued_again(queue):
+    queue.put("a", {})
+    queue.claim("worker")
+    queue.complete("a", {})
+
+    queue.put("a", {})
+
+    assert queue.claim("worker") is None
+
+def test_stale_claims_are_handed_out_again(queue, monkeypatch):
+    queue.put("a", {"n": 1})
+    queue.claim("crashed-worker")
+    assert queue.requeue_stale(60) == 0
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert queue.requeue_stale(60) == 1
+    assert queue.claim("worker") == ("a", {"n": 1})
+
+def test_open_queue_picks_the_backend_by_extension(tmp_path):
+    assert isinstance(open_queue(str(tmp_path / "queue.db")), SQLiteQueue)
+    assert isinstance(open_queue(str(tmp_path / "queue")), DirectoryQueue)